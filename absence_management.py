@@ -1,11 +1,15 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QGroupBox, QFormLayout, QLabel, QComboBox, QPushButton, QDateEdit, QLineEdit, QTableView, QMessageBox
 from PyQt6.QtGui import QStandardItemModel, QStandardItem
-from PyQt6.QtCore import Qt, QDate
+from PyQt6.QtCore import Qt, QDate, pyqtSignal
 from typing import Optional
-import database
+import storage
+from employee_selector import EmployeeSelector
 
 # widget untuk mengelola ketidakhadiran karyawan
 class AbsenceManagementWidget(QWidget):
+    # Signal yang dipancarkan dengan tanggal (YYYY-MM-DD) setiap kali ketidakhadiran dicatat
+    attendance_changed = pyqtSignal(str)
+
     def __init__(self, parent: Optional[QWidget] = None) -> None:
         super().__init__(parent)
 
@@ -17,8 +21,8 @@ class AbsenceManagementWidget(QWidget):
         main_layout.addWidget(selection_group)
         form_layout = QFormLayout(selection_group)
 
-        # Dropdown untuk memilih karyawan
-        self.employee_combo = QComboBox()
+        # Dropdown untuk memilih karyawan (model bersama dengan pencarian)
+        self.employee_combo = EmployeeSelector()
         
         # Dropdown untuk memilih jenis ketidakhadiran (Sakit, Izin, Cuti)
         self.absence_type_combo = QComboBox()
@@ -67,39 +71,17 @@ class AbsenceManagementWidget(QWidget):
 
     def load_employees_into_combobox(self) -> None:
         """
-        Memuat daftar karyawan dari database ke dalam dropdown.
-        Jika tidak ada karyawan, widget akan dinonaktifkan.
+        Menyesuaikan status form dengan isi model karyawan bersama.
+        Daftar karyawan diperbarui secara inkremental oleh model bersama, sehingga
+        di sini hanya status aktif widget yang diatur. Jika tidak ada karyawan,
+        widget akan dinonaktifkan.
         """
-        # Mengosongkan dropdown sebelum memuat ulang
-        self.employee_combo.clear()
-        
-        # Membuat koneksi ke database dan mengambil data karyawan
-        conn = database.create_connection()
-        employees = []
-        if conn:
-            employees = database.get_all_employees(conn)
-            conn.close()
-
-        # Mengatur status widget berdasarkan ketersediaan data karyawan
-        if employees:
-            # Jika ada karyawan, aktifkan semua widget
-            self.employee_combo.setEnabled(True)
-            self.absence_type_combo.setEnabled(True)
-            self.date_entry.setEnabled(True)
-            self.reason_entry.setEnabled(True)
-            self.record_absence_button.setEnabled(True)
-            
-            # Menambahkan setiap karyawan ke dropdown dengan ID sebagai data
-            for employee in employees:
-                self.employee_combo.addItem(employee[1], userData=employee[0])
-        else:
-            # Jika tidak ada karyawan, nonaktifkan semua widget
-            self.employee_combo.addItem("Silakan tambahkan karyawan terlebih dahulu")
-            self.employee_combo.setEnabled(False)
-            self.absence_type_combo.setEnabled(False)
-            self.date_entry.setEnabled(False)
-            self.reason_entry.setEnabled(False)
-            self.record_absence_button.setEnabled(False)
+        has_employees = self.employee_combo.has_employees()
+        self.employee_combo.setEnabled(has_employees)
+        self.absence_type_combo.setEnabled(has_employees)
+        self.date_entry.setEnabled(has_employees)
+        self.reason_entry.setEnabled(has_employees)
+        self.record_absence_button.setEnabled(has_employees)
 
     def record_absence(self) -> None:
         """
@@ -107,9 +89,9 @@ class AbsenceManagementWidget(QWidget):
         Validasi input dilakukan sebelum menyimpan data.
         """
         # Mengambil ID karyawan yang dipilih
-        employee_id = self.employee_combo.currentData()
+        employee_id = self.employee_combo.current_employee_id()
         if employee_id is None:
-            QMessageBox.warning(self, "Kesalahan Pemilihan", "Silakan pilih karyawan.")
+            QMessageBox.warning(self, "Kesalahan Pemilihan", "Silakan pilih karyawan dari daftar.")
             return
 
         # Mengambil data dari form
@@ -119,15 +101,15 @@ class AbsenceManagementWidget(QWidget):
         status = absence_type
 
         # Menyimpan catatan ketidakhadiran ke database
-        conn = database.create_connection()
-        if conn:
+        backend = storage.app_backend()
+        if backend:
             record = (employee_id, None, None, status, date, reason) 
-            database.add_absence_record(conn, record)
-            conn.close()
+            backend.add_absence_record(record)
             
             # Menampilkan pesan sukses dan memuat ulang data
             QMessageBox.information(self, "Berhasil", f"Ketidakhadiran tercatat untuk {self.employee_combo.currentText()}.")
             self.load_absence_records()
+            self.attendance_changed.emit(date)
 
     def load_absence_records(self) -> None:
         """
@@ -140,10 +122,9 @@ class AbsenceManagementWidget(QWidget):
         self.absence_model.setHorizontalHeaderLabels(['Karyawan', 'Tanggal', 'Jenis', 'Alasan'])
         
         # Mengambil data ketidakhadiran dari database
-        conn = database.create_connection()
-        if conn:
-            records = database.get_all_absences(conn)
-            conn.close()
+        backend = storage.app_backend()
+        if backend:
+            records = backend.get_all_absences()
             
             # Menambahkan setiap baris data ke model tabel
             for row_data in records:
@@ -0,0 +1,271 @@
+import time
+from collections import deque
+from datetime import date as date_type
+from typing import Any, Optional
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel, QComboBox, QSpinBox,
+                             QPushButton, QTableView, QStyledItemDelegate, QStyleOptionViewItem, QStyle,
+                             QAbstractItemView, QHeaderView)
+from PyQt6.QtGui import QColor, QPainter
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSize, QTimer
+import storage
+from heatmap_data import HeatmapGrid, NOT_LOADED, NO_RECORD, PRESENT, PERMISSION, SICK, LEAVE, STATUS_LABELS
+
+# Warna sel per kode status
+STATUS_COLORS = {
+    NO_RECORD: QColor("#ebedf0"),
+    PRESENT: QColor("#40c463"),
+    PERMISSION: QColor("#f9d65c"),
+    SICK: QColor("#f08c4a"),
+    LEAVE: QColor("#5b8def"),
+    NOT_LOADED: QColor("#ffffff"),
+}
+# Ukuran sel heatmap dalam piksel
+CELL_SIZE = 12
+
+# model tabel heatmap: baris karyawan, kolom hari
+class HeatmapModel(QAbstractTableModel):
+    """
+    Model tabel untuk heatmap kalender. Data sel dibaca langsung dari HeatmapGrid;
+    model tidak membuat objek per sel.
+    """
+    def __init__(self, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.grid = HeatmapGrid([], date_type.today().replace(month=1, day=1).isoformat(), 0)
+        self._names: list[str] = []
+
+    def set_grid(self, grid: HeatmapGrid, names: list[str]) -> None:
+        """
+        Mengganti seluruh isi heatmap dalam satu kali reset model.
+        """
+        self.beginResetModel()
+        self.grid = grid
+        self._names = names
+        self.endResetModel()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.grid.rows
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.grid.days
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.UserRole:
+            return self.grid.status_at(index.row(), index.column())
+        if role == Qt.ItemDataRole.ToolTipRole:
+            code = self.grid.status_at(index.row(), index.column())
+            label = STATUS_LABELS.get(code, "Memuat...")
+            return f"{self._names[index.row()]}\n{self.grid.date_at(index.column()).isoformat()}: {label}"
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Vertical:
+            return self._names[section] if section < len(self._names) else None
+        day = self.grid.date_at(section)
+        # Hanya awal bulan yang diberi label agar header tetap terbaca
+        return day.strftime("%b") if day.day == 1 else ""
+
+    def notify_loaded(self, first_row: int, last_row: int, first_day: int, last_day: int) -> None:
+        """
+        Memberi tahu view bahwa sel pada rentang tersebut sudah dimuat.
+        """
+        self.dataChanged.emit(self.index(first_row, first_day), self.index(last_row, last_day),
+                              [Qt.ItemDataRole.UserRole])
+
+# delegate yang menggambar sel heatmap sebagai kotak berwarna
+class HeatmapDelegate(QStyledItemDelegate):
+    """
+    Delegate ringan untuk heatmap: setiap sel hanya berupa satu fillRect tanpa
+    teks atau elemen gaya lain. QTableView hanya memanggil paint untuk sel yang
+    terlihat, sehingga biaya satu frame bergantung pada ukuran viewport, bukan data.
+    """
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        code = index.data(Qt.ItemDataRole.UserRole)
+        painter.fillRect(option.rect.adjusted(0, 0, -1, -1), STATUS_COLORS.get(code, STATUS_COLORS[NO_RECORD]))
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.setPen(option.palette.highlight().color())
+            painter.drawRect(option.rect.adjusted(0, 0, -1, -1))
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        return QSize(CELL_SIZE, CELL_SIZE)
+
+# tabel heatmap yang mencatat waktu setiap frame
+class HeatmapView(QTableView):
+    """
+    QTableView untuk heatmap yang mencatat durasi paintEvent terakhir.
+    """
+    # Jumlah frame terakhir yang disimpan untuk statistik
+    FRAME_HISTORY = 240
+
+    def __init__(self, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.frame_times: deque[float] = deque(maxlen=self.FRAME_HISTORY)
+
+    def paintEvent(self, event) -> None:
+        start = time.perf_counter()
+        super().paintEvent(event)
+        self.frame_times.append((time.perf_counter() - start) * 1000)
+
+    def visible_range(self) -> tuple[int, int, int, int]:
+        """
+        Mengembalikan rentang sel yang terlihat: (baris_awal, baris_akhir, kolom_awal, kolom_akhir).
+        """
+        viewport = self.viewport().rect()
+        first_row = max(0, self.rowAt(viewport.top()))
+        last_row = self.rowAt(viewport.bottom())
+        first_day = max(0, self.columnAt(viewport.left()))
+        last_day = self.columnAt(viewport.right())
+        model = self.model()
+        if last_row < 0:
+            last_row = model.rowCount() - 1
+        if last_day < 0:
+            last_day = model.columnCount() - 1
+        return first_row, last_row, first_day, last_day
+
+    def frame_stats(self) -> dict:
+        """
+        Mengembalikan statistik waktu frame dalam milidetik: frames, avg, p95, max.
+        """
+        times = sorted(self.frame_times)
+        if not times:
+            return {"frames": 0, "avg": 0.0, "p95": 0.0, "max": 0.0}
+        return {"frames": len(times), "avg": sum(times) / len(times),
+                "p95": times[min(len(times) - 1, int(len(times) * 0.95))], "max": times[-1]}
+
+# widget tab heatmap kalender kehadiran
+class AttendanceHeatmapWidget(QWidget):
+    def __init__(self, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+
+        main_layout = QVBoxLayout(self)
+
+        # --- Bagian Filter ---
+        filter_group = QGroupBox("Kalender Kehadiran")
+        main_layout.addWidget(filter_group)
+        filter_layout = QHBoxLayout(filter_group)
+
+        # Tahun yang ditampilkan
+        self.year_spin = QSpinBox()
+        self.year_spin.setRange(2000, 2100)
+        self.year_spin.setValue(date_type.today().year)
+
+        # Filter departemen
+        self.department_combo = QComboBox()
+
+        self.refresh_button = QPushButton("Muat Ulang")
+        self.refresh_button.clicked.connect(self.load_heatmap)
+        self.year_spin.valueChanged.connect(self.load_heatmap)
+        self.department_combo.currentIndexChanged.connect(self.load_heatmap)
+
+        filter_layout.addWidget(QLabel("Tahun:"))
+        filter_layout.addWidget(self.year_spin)
+        filter_layout.addWidget(QLabel("Departemen:"))
+        filter_layout.addWidget(self.department_combo)
+        filter_layout.addWidget(self.refresh_button)
+        filter_layout.addStretch()
+
+        # Legenda warna status
+        legend_layout = QHBoxLayout()
+        for code in (PRESENT, PERMISSION, SICK, LEAVE, NO_RECORD):
+            swatch = QLabel()
+            swatch.setFixedSize(CELL_SIZE, CELL_SIZE)
+            swatch.setStyleSheet(f"background-color: {STATUS_COLORS[code].name()};")
+            legend_layout.addWidget(swatch)
+            legend_layout.addWidget(QLabel(STATUS_LABELS[code]))
+        legend_layout.addStretch()
+        self.frame_label = QLabel()
+        legend_layout.addWidget(self.frame_label)
+        main_layout.addLayout(legend_layout)
+
+        # --- Bagian Heatmap ---
+        self.heatmap_model = HeatmapModel(self)
+        self.heatmap_view = HeatmapView()
+        self.heatmap_view.setModel(self.heatmap_model)
+        self.heatmap_view.setItemDelegate(HeatmapDelegate(self.heatmap_view))
+        self.heatmap_view.setShowGrid(False)
+        self.heatmap_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.heatmap_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        # Ukuran sel tetap agar Qt tidak mengukur isi setiap baris/kolom
+        for header in (self.heatmap_view.horizontalHeader(), self.heatmap_view.verticalHeader()):
+            header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+            header.setMinimumSectionSize(CELL_SIZE)
+            header.setDefaultSectionSize(CELL_SIZE)
+        main_layout.addWidget(self.heatmap_view)
+
+        # Pemuatan viewport digabung: beberapa scroll dalam satu siklus event hanya memicu satu query
+        self._load_timer = QTimer(self)
+        self._load_timer.setSingleShot(True)
+        self._load_timer.setInterval(0)
+        self._load_timer.timeout.connect(self.load_visible_cells)
+        self.heatmap_view.horizontalScrollBar().valueChanged.connect(self._load_timer.start)
+        self.heatmap_view.verticalScrollBar().valueChanged.connect(self._load_timer.start)
+
+        self.load_departments()
+        self.load_heatmap()
+
+    def load_departments(self) -> None:
+        """
+        Memuat daftar departemen ke filter dengan mempertahankan pilihan saat ini.
+        """
+        current = self.department_combo.currentData()
+        self.department_combo.blockSignals(True)
+        self.department_combo.clear()
+        self.department_combo.addItem("Semua Departemen", None)
+        backend = storage.app_backend()
+        if backend:
+            for department_id, name in backend.get_all_departments():
+                self.department_combo.addItem(name, department_id)
+        self.department_combo.setCurrentIndex(max(0, self.department_combo.findData(current)))
+        self.department_combo.blockSignals(False)
+
+    def load_heatmap(self) -> None:
+        """
+        Menyiapkan heatmap untuk tahun dan departemen terpilih. Hanya daftar karyawan
+        yang diambil di sini; status harian dimuat per viewport oleh load_visible_cells.
+        """
+        year = self.year_spin.value()
+        department_id = self.department_combo.currentData()
+        employees = []
+        backend = storage.app_backend()
+        if backend:
+            if department_id is None:
+                employees = backend.get_all_employees()
+            else:
+                employees = backend.get_employees_by_department(department_id)
+
+        days = (date_type(year + 1, 1, 1) - date_type(year, 1, 1)).days
+        grid = HeatmapGrid([employee[0] for employee in employees], f"{year}-01-01", days)
+        self.heatmap_model.set_grid(grid, [employee[1] for employee in employees])
+        self._load_timer.start()
+
+    def load_visible_cells(self) -> None:
+        """
+        Memuat status harian untuk sel yang terlihat dengan satu query agregat.
+        """
+        first_row, last_row, first_day, last_day = self.heatmap_view.visible_range()
+        backend = storage.app_backend()
+        if not backend:
+            return
+        try:
+            loaded = self.heatmap_model.grid.ensure_loaded(backend, first_row, last_row, first_day, last_day)
+        except backend.Error as e:
+            print(e)
+            loaded = False
+        if loaded:
+            self.heatmap_model.notify_loaded(first_row, last_row, first_day, last_day)
+        stats = self.heatmap_view.frame_stats()
+        self.frame_label.setText(f"Frame: {stats['avg']:.1f} ms rata-rata, {stats['max']:.1f} ms maks")
+
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        self._load_timer.start()
+
+    def invalidate_date(self, date: str) -> None:
+        """
+        Memuat ulang kolom satu tanggal setelah ada catatan kehadiran baru.
+        """
+        self.heatmap_model.grid.invalidate_date(date)
+        self._load_timer.start()
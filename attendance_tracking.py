@@ -1,18 +1,46 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QGroupBox, QFormLayout, QLabel, QComboBox, QPushButton, QDateTimeEdit, QTableView, QMessageBox
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QGroupBox, QFormLayout, QLabel, QPushButton, QDateTimeEdit, QTableView, QMessageBox
 from PyQt6.QtGui import QStandardItemModel, QStandardItem
-from PyQt6.QtCore import Qt, QDateTime
+from PyQt6.QtCore import Qt, QDateTime, QThread, QTimer, pyqtSignal
 from typing import Optional
-import database
+import storage
+from employee_selector import EmployeeSelector, shared_employee_model
+from kiosk_journal import ReplayResult, SwipeJournal
+
+# thread latar untuk replay jurnal kiosk
+class JournalReplayThread(QThread):
+    """
+    Menjalankan SwipeJournal.replay di luar thread UI, sehingga kiosk tetap responsif
+    selama database pusat lambat, terkunci, atau tidak dapat dihubungi.
+    """
+    # Signal dengan ReplayResult, diterima di thread UI
+    replayed = pyqtSignal(object)
+
+    def __init__(self, journal: SwipeJournal, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.journal = journal
+
+    def run(self) -> None:
+        self.replayed.emit(self.journal.replay())
 
 # widget untuk melacak kehadiran karyawan
 class AttendanceTrackingWidget(QWidget):
     """
     Widget untuk melacak kehadiran harian karyawan.
     Memungkinkan pencatatan waktu masuk (check-in) dan keluar (check-out) karyawan.
+    Pada mode kiosk, swipe dicatat ke jurnal lokal lebih dulu lalu disinkronkan ke database pusat.
     """
-    def __init__(self, parent: Optional[QWidget] = None) -> None:
+    # Interval sinkronisasi jurnal kiosk ke database pusat (milidetik)
+    SYNC_INTERVAL_MS = 5000
+
+    # Signal yang dipancarkan dengan tanggal (YYYY-MM-DD) setiap kali catatan kehadiran ditulis
+    attendance_changed = pyqtSignal(str)
+
+    def __init__(self, parent: Optional[QWidget] = None, kiosk_journal: Optional[SwipeJournal] = None) -> None:
         super().__init__(parent)
 
+        # Jurnal lokal untuk mode kiosk, None jika swipe langsung ditulis ke database
+        self.kiosk_journal = kiosk_journal
+
         # Layout utama vertikal untuk widget
         main_layout = QVBoxLayout(self)
 
@@ -22,8 +50,8 @@ class AttendanceTrackingWidget(QWidget):
         main_layout.addWidget(selection_group)
         selection_layout = QFormLayout(selection_group)
 
-        # Dropdown untuk memilih karyawan
-        self.employee_combo = QComboBox()
+        # Dropdown untuk memilih karyawan (model bersama dengan pencarian)
+        self.employee_combo = EmployeeSelector()
         selection_layout.addRow(QLabel("Karyawan:"), self.employee_combo)
         
         # --- Bagian Aksi Kehadiran ---
@@ -44,6 +72,18 @@ class AttendanceTrackingWidget(QWidget):
         action_layout.addRow(self.check_in_button)
         action_layout.addRow(self.check_out_button)
 
+        # Status sinkronisasi jurnal dan timer replay berkala pada mode kiosk
+        if self.kiosk_journal is not None:
+            self.sync_status_label = QLabel()
+            action_layout.addRow(QLabel("Sinkronisasi:"), self.sync_status_label)
+            self.replay_thread = JournalReplayThread(self.kiosk_journal, self)
+            self.replay_thread.replayed.connect(self.on_journal_replayed)
+            # Permintaan sinkronisasi selama replay berjalan dijalankan setelah replay selesai
+            self.sync_pending = False
+            self.sync_timer = QTimer(self)
+            self.sync_timer.timeout.connect(self.sync_journal)
+            self.sync_timer.start(self.SYNC_INTERVAL_MS)
+
         # Memuat daftar karyawan ke dalam dropdown
         self.load_employees_into_combobox()
 
@@ -67,37 +107,21 @@ class AttendanceTrackingWidget(QWidget):
         # Memuat catatan kehadiran hari ini
         self.load_daily_records()
 
+        # Mengirim sisa jurnal dari sesi sebelumnya
+        if self.kiosk_journal is not None:
+            self.sync_journal()
+
     def load_employees_into_combobox(self) -> None:
         """
-        Memuat daftar karyawan dari database ke dalam dropdown.
-        Jika tidak ada karyawan, widget akan dinonaktifkan.
+        Menyesuaikan status dropdown karyawan dengan isi model bersama.
+        Daftar karyawan diperbarui secara inkremental oleh model bersama, sehingga
+        di sini hanya status aktif widget yang diatur. Jika tidak ada karyawan,
+        widget akan dinonaktifkan.
         """
-        # Mengosongkan dropdown sebelum memuat ulang
-        self.employee_combo.clear()
-        
-        # Membuat koneksi ke database dan mengambil data karyawan
-        conn = database.create_connection()
-        employees = []
-        if conn:
-            employees = database.get_all_employees(conn)
-            conn.close()
-
-        # Mengatur status widget berdasarkan ketersediaan data karyawan
-        if employees:
-            # Jika ada karyawan, aktifkan semua widget
-            self.employee_combo.setEnabled(True)
-            self.check_in_button.setEnabled(True)
-            self.check_out_button.setEnabled(True)
-            
-            # Menambahkan setiap karyawan ke dropdown dengan ID sebagai data
-            for employee in employees:
-                self.employee_combo.addItem(employee[1], userData=employee[0])
-        else:
-            # Jika tidak ada karyawan, nonaktifkan semua widget
-            self.employee_combo.addItem("Silakan tambahkan karyawan terlebih dahulu")
-            self.employee_combo.setEnabled(False)
-            self.check_in_button.setEnabled(False)
-            self.check_out_button.setEnabled(False)
+        has_employees = self.employee_combo.has_employees()
+        self.employee_combo.setEnabled(has_employees)
+        self.check_in_button.setEnabled(has_employees)
+        self.check_out_button.setEnabled(has_employees)
 
     def load_daily_records(self) -> None:
         """
@@ -114,10 +138,9 @@ class AttendanceTrackingWidget(QWidget):
         today_str = QDateTime.currentDateTime().toString("yyyy-MM-dd")
         
         # Mengambil catatan kehadiran hari ini dari database
-        conn = database.create_connection()
-        if conn:
-            records = database.get_todays_records(conn, today_str)
-            conn.close()
+        backend = storage.app_backend()
+        if backend:
+            records = backend.get_todays_records(today_str)
             
             # Memproses setiap catatan untuk menghitung jam kerja
             for row_data in records:
@@ -153,9 +176,9 @@ class AttendanceTrackingWidget(QWidget):
         Menggunakan waktu saat ini sebagai waktu masuk.
         """
         # Mengambil ID karyawan yang dipilih
-        employee_id = self.employee_combo.currentData()
+        employee_id = self.employee_combo.current_employee_id()
         if employee_id is None:
-            QMessageBox.warning(self, "Kesalahan Pemilihan", "Silakan pilih karyawan.")
+            QMessageBox.warning(self, "Kesalahan Pemilihan", "Silakan pilih karyawan dari daftar.")
             return
 
         # Mendapatkan waktu saat ini
@@ -164,16 +187,25 @@ class AttendanceTrackingWidget(QWidget):
         date = now.toString("yyyy-MM-dd")
         status = "Hadir"
 
+        # Pada mode kiosk, swipe dicatat ke jurnal lokal lalu disinkronkan
+        if self.kiosk_journal is not None:
+            self.kiosk_journal.append(employee_id, "in", check_in_time, date)
+            QMessageBox.information(self, "Berhasil", f"{self.employee_combo.currentText()} berhasil check-in.")
+            self.sync_journal()
+            return
+
         # Menyimpan catatan kehadiran ke database
-        conn = database.create_connection()
-        if conn:
+        backend = storage.app_backend()
+        if backend:
             record = (employee_id, check_in_time, status, date)
-            database.add_attendance_record(conn, record)
-            conn.close()
+            backend.add_attendance_record(record)
             
             # Menampilkan pesan sukses dan memuat ulang data
             QMessageBox.information(self, "Berhasil", f"{self.employee_combo.currentText()} berhasil check-in.")
             self.load_daily_records()
+            self.attendance_changed.emit(date)
+        else:
+            QMessageBox.warning(self, "Kesalahan Database", "Tidak dapat terhubung ke database. Check-in tidak tersimpan.")
 
     def check_out(self) -> None:
         """
@@ -181,9 +213,9 @@ class AttendanceTrackingWidget(QWidget):
         Mencari catatan check-in terakhir untuk diupdate dengan waktu keluar.
         """
         # Mengambil ID karyawan yang dipilih
-        employee_id = self.employee_combo.currentData()
+        employee_id = self.employee_combo.current_employee_id()
         if employee_id is None:
-            QMessageBox.warning(self, "Kesalahan Pemilihan", "Silakan pilih karyawan.")
+            QMessageBox.warning(self, "Kesalahan Pemilihan", "Silakan pilih karyawan dari daftar.")
             return
 
         # Mendapatkan waktu saat ini
@@ -191,20 +223,82 @@ class AttendanceTrackingWidget(QWidget):
         check_out_time = now.toString(Qt.DateFormat.ISODate)
         date = now.toString("yyyy-MM-dd")
 
+        # Pada mode kiosk, swipe dicatat ke jurnal dan dipasangkan saat replay
+        if self.kiosk_journal is not None:
+            self.kiosk_journal.append(employee_id, "out", check_out_time, date)
+            QMessageBox.information(self, "Berhasil", f"{self.employee_combo.currentText()} berhasil check-out.")
+            self.sync_journal()
+            return
+
         # Mencari dan mengupdate catatan check-in terakhir
-        conn = database.create_connection()
-        if conn:
+        backend = storage.app_backend()
+        if backend:
             # Mencari catatan check-in terakhir yang belum di-check-out
-            last_check_in = database.get_last_check_in_for_employee(conn, employee_id, date)
+            last_check_in = backend.get_last_check_in_for_employee(employee_id, date)
             
             if last_check_in:
                 # Jika ditemukan, update dengan waktu check-out
                 record_id = last_check_in[0]
-                database.check_out(conn, record_id, check_out_time)
+                backend.check_out(record_id, check_out_time)
                 QMessageBox.information(self, "Berhasil", f"{self.employee_combo.currentText()} berhasil check-out.")
                 self.load_daily_records()
+                self.attendance_changed.emit(date)
             else:
                 # Jika tidak ditemukan catatan check-in, tampilkan peringatan
                 QMessageBox.warning(self, "Kesalahan Check-out", "Tidak ditemukan catatan check-in untuk karyawan ini hari ini.")
             
-            conn.close()
+        else:
+            QMessageBox.warning(self, "Kesalahan Database", "Tidak dapat terhubung ke database. Check-out tidak tersimpan.")
+
+    def sync_journal(self) -> None:
+        """
+        Memulai pengiriman swipe dari jurnal kiosk ke database pusat di thread latar.
+        Jika database tidak tersedia, swipe tetap tersimpan di jurnal dan dicoba lagi nanti.
+        """
+        if self.replay_thread.isRunning():
+            self.sync_pending = True
+            return
+        self.sync_pending = False
+        self.replay_thread.start()
+
+    def stop_journal_sync(self) -> None:
+        """
+        Menghentikan sinkronisasi berkala dan menunggu replay yang sedang berjalan selesai,
+        agar jurnal dapat ditutup dengan aman.
+        """
+        if self.kiosk_journal is None:
+            return
+        self.sync_timer.stop()
+        self.sync_pending = False
+        self.replay_thread.wait()
+
+    def on_journal_replayed(self, result: ReplayResult) -> None:
+        """
+        Memperbarui status sinkronisasi setelah replay di thread latar selesai.
+        """
+        backlog = self.kiosk_journal.backlog_size()
+
+        if result.error:
+            self.sync_status_label.setText(f"Tertunda ({backlog} swipe belum terkirim): {result.error}")
+        elif result.processed:
+            status = f"{result.processed} swipe terkirim ({result.throughput:.0f}/detik), {backlog} tersisa"
+            if result.quarantined:
+                status += f", {result.quarantined} baris rusak dikarantina"
+            if result.rejected:
+                status += f", {result.rejected} ditolak (lihat karantina)"
+            self.sync_status_label.setText(status)
+        else:
+            self.sync_status_label.setText(f"{backlog} swipe belum terkirim")
+
+        if result.error is None and result.processed:
+            # Database kembali tersedia: daftar karyawan dari cache diganti data terbaru
+            employee_model = shared_employee_model()
+            if employee_model.from_cache:
+                employee_model.reload()
+                self.load_employees_into_combobox()
+        if result.applied:
+            self.load_daily_records()
+            for date in sorted(result.dates):
+                self.attendance_changed.emit(date)
+        if self.sync_pending and self.sync_timer.isActive():
+            self.sync_journal()
@@ -0,0 +1,157 @@
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional
+from storage import StorageBackend
+from shift_schedule import build_day_schedule
+
+# Jenis anomali catatan kehadiran
+OPEN_SESSION = "open-session"
+OVERLAP = "overlap"
+NEGATIVE_DURATION = "negative-duration"
+ABSENCE_CONFLICT = "absence-conflict"
+
+# Sesi yang masih terbuka lebih lama dari ini dianggap lupa check-out
+STALE_SESSION_HOURS = 16
+# Durasi sesi yang ditutup otomatis jika karyawan tidak memiliki jadwal shift
+AUTO_CLOSE_HOURS = 8
+# Alasan yang dicatat pada sesi yang ditutup otomatis
+AUTO_CLOSE_REASON = "Check-out otomatis"
+
+# satu anomali pada catatan kehadiran
+@dataclass
+class Anomaly:
+    """
+    Satu anomali yang ditemukan pada catatan kehadiran.
+    """
+    record_id: int
+    employee_id: int
+    date: str
+    kind: str
+    check_in_time: Optional[str]
+    check_out_time: Optional[str]
+    # Check-in sesi berikutnya, batas atas waktu penutupan sesi terbuka
+    next_check_in: Optional[str] = None
+
+# hasil satu kali pemindaian
+@dataclass
+class ValidationReport:
+    """
+    Hasil pemindaian anomali untuk satu rentang tanggal.
+    """
+    anomalies: list[Anomaly] = field(default_factory=list)
+    closed_sessions: int = 0
+    seconds: float = 0.0
+
+    def count(self, kind: str) -> int:
+        """
+        Menghitung jumlah anomali dengan jenis tertentu.
+        """
+        return sum(1 for anomaly in self.anomalies if anomaly.kind == kind)
+
+def scan_anomalies(backend: StorageBackend, start_date: str, end_date: str,
+                   now: Optional[datetime] = None) -> ValidationReport:
+    """
+    Memindai catatan kehadiran dalam rentang tanggal dan mengelompokkan anomalinya.
+    Pemindaian dilakukan dengan satu query berjendela; hanya catatan bermasalah yang
+    dikirim dari database, sehingga biayanya sebanding dengan jumlah catatan di rentang.
+
+    Args:
+        backend: Backend penyimpanan
+        start_date: Tanggal awal dalam format 'YYYY-MM-DD'
+        end_date: Tanggal akhir dalam format 'YYYY-MM-DD' (inklusif)
+        now: Waktu acuan untuk menentukan sesi basi, default waktu saat ini
+
+    Returns:
+        ValidationReport berisi daftar anomali. Satu catatan dapat memiliki beberapa anomali.
+    """
+    start = time.perf_counter()
+    now = now or datetime.now()
+    stale_before = (now - timedelta(hours=STALE_SESSION_HOURS)).isoformat(timespec="seconds")
+    report = ValidationReport()
+    rows = backend.get_attendance_anomaly_candidates(start_date, end_date, stale_before)
+    for (record_id, employee_id, date, status, check_in, check_out,
+         prev_check_out, next_check_in, presence_count, absence_count) in rows:
+        kinds = []
+        if check_in is not None and check_out is None and (check_in < stale_before or next_check_in is not None):
+            kinds.append(OPEN_SESSION)
+        if check_in is not None and check_out is not None and check_out < check_in:
+            kinds.append(NEGATIVE_DURATION)
+        if check_in is not None and prev_check_out is not None and prev_check_out > check_in:
+            kinds.append(OVERLAP)
+        if presence_count and absence_count:
+            kinds.append(ABSENCE_CONFLICT)
+        for kind in kinds:
+            report.anomalies.append(Anomaly(record_id, employee_id, date, kind, check_in, check_out, next_check_in))
+    report.seconds = time.perf_counter() - start
+    return report
+
+def _auto_close_time(anomaly: Anomaly, schedule: dict, now: datetime) -> str:
+    """
+    Menentukan waktu check-out otomatis: akhir shift jika karyawan dijadwalkan,
+    jika tidak check-in ditambah AUTO_CLOSE_HOURS, dan tidak melewati check-in berikutnya
+    maupun waktu saat ini (check-out tidak pernah dicatat di masa depan).
+    """
+    check_in = datetime.fromisoformat(anomaly.check_in_time)
+    naive_check_in = check_in.replace(tzinfo=None) if check_in.tzinfo is not None else check_in
+    window = schedule.get(anomaly.employee_id)
+    if window is not None and window[2] > naive_check_in:
+        close_at = window[2]
+    else:
+        close_at = naive_check_in + timedelta(hours=AUTO_CLOSE_HOURS)
+    if anomaly.next_check_in is not None:
+        next_check_in = datetime.fromisoformat(anomaly.next_check_in)
+        if next_check_in.tzinfo is not None:
+            next_check_in = next_check_in.replace(tzinfo=None)
+        close_at = min(close_at, next_check_in)
+    close_at = max(min(close_at, now.replace(tzinfo=None)), naive_check_in)
+    # Zona waktu check-in dipertahankan agar format waktu tetap konsisten
+    return close_at.replace(tzinfo=check_in.tzinfo).isoformat(timespec="seconds")
+
+def auto_close_stale_sessions(backend: StorageBackend, report: ValidationReport,
+                              now: Optional[datetime] = None) -> int:
+    """
+    Menutup otomatis sesi terbuka yang ditemukan pada pemindaian sesuai kebijakan
+    _auto_close_time, dengan alasan AUTO_CLOSE_REASON agar dapat ditelusuri.
+
+    Args:
+        backend: Backend penyimpanan
+        report: Hasil scan_anomalies
+        now: Batas atas waktu check-out otomatis, default waktu saat ini
+
+    Returns:
+        Jumlah sesi yang ditutup
+    """
+    now = now or datetime.now()
+    schedules: dict[str, dict] = {}
+    closings = []
+    for anomaly in report.anomalies:
+        if anomaly.kind != OPEN_SESSION:
+            continue
+        schedule = schedules.get(anomaly.date)
+        if schedule is None:
+            schedule = schedules[anomaly.date] = build_day_schedule(backend, anomaly.date)
+        closings.append((_auto_close_time(anomaly, schedule, now), AUTO_CLOSE_REASON, anomaly.record_id, anomaly.date))
+    report.closed_sessions = backend.close_open_sessions(closings) if closings else 0
+    return report.closed_sessions
+
+def validate_range(backend: StorageBackend, start_date: str, end_date: str, auto_close: bool = False,
+                   now: Optional[datetime] = None) -> ValidationReport:
+    """
+    Memindai anomali dalam rentang tanggal dan, jika diminta, menutup sesi terbuka yang basi.
+
+    Args:
+        backend: Backend penyimpanan
+        start_date: Tanggal awal dalam format 'YYYY-MM-DD'
+        end_date: Tanggal akhir dalam format 'YYYY-MM-DD' (inklusif)
+        auto_close: True untuk menutup otomatis sesi terbuka yang basi
+        now: Waktu acuan pemindaian dan penutupan, default waktu saat ini
+
+    Returns:
+        ValidationReport berisi anomali dan jumlah sesi yang ditutup
+    """
+    now = now or datetime.now()
+    report = scan_anomalies(backend, start_date, end_date, now)
+    if auto_close:
+        auto_close_stale_sessions(backend, report, now)
+    return report
@@ -0,0 +1,313 @@
+import atexit
+import getpass
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from typing import Optional
+
+# Jenis entitas yang dicatat
+EMPLOYEE = "employee"
+ATTENDANCE = "attendance"
+ROTATION = "rotation"
+SHIFT_ASSIGNMENT = "shift_assignment"
+CLASSIFICATION = "classification"
+
+def default_audit_path(db_file: str = "attendance.db") -> str:
+    """
+    Mengembalikan lokasi database audit untuk database utama, mis. attendance.db -> attendance_audit.db.
+    Untuk URL PostgreSQL, audit disimpan di attendance_audit.db pada direktori kerja.
+    """
+    if db_file.startswith(("postgresql://", "postgres://")):
+        return "attendance_audit.db"
+    if db_file.startswith("sqlite:///"):
+        db_file = db_file[len("sqlite:///"):]
+    root, _ = os.path.splitext(db_file)
+    return f"{root}_audit.db"
+
+def changed_columns(before: Optional[dict], after: Optional[dict]) -> Optional[tuple[dict, dict]]:
+    """
+    Membandingkan dua keadaan entitas dan mengambil kolom yang berubah saja.
+
+    Args:
+        before: Nilai kolom sebelum perubahan
+        after: Nilai kolom sesudah perubahan
+
+    Returns:
+        Tuple berisi (nilai sebelum, nilai sesudah) untuk kolom yang berubah,
+        None jika salah satu keadaan tidak ada atau tidak ada kolom yang berubah
+    """
+    if before is None or after is None:
+        return None
+    changed = [column for column in after if before.get(column) != after[column]]
+    if not changed:
+        return None
+    return {column: before.get(column) for column in changed}, {column: after[column] for column in changed}
+
+def _dumps(value: Optional[dict]) -> Optional[str]:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")) if value is not None else None
+
+# log audit append-only untuk perubahan data karyawan dan kehadiran
+class AuditLog:
+    """
+    Log audit append-only di database SQLite terpisah. Setiap perubahan dicatat sebagai
+    event (waktu, pelaku, entitas, aksi, nilai sebelum dan sesudah).
+
+    Event ditampung di memori dan ditulis per batch setiap flush_every event, atau oleh
+    thread latar paling lambat flush_interval detik setelah dicatat, sehingga biaya pada
+    jalur check-in hanya satu append ke list. Jika penulisan gagal (mis. database audit
+    terkunci), event tetap di buffer dan ditulis ulang pada flush berikutnya. Sisa buffer
+    ditulis oleh close(), yang juga dipanggil otomatis saat interpreter berhenti; hanya
+    event dari flush_interval detik terakhir yang hilang jika proses berhenti mendadak.
+
+    Nilai sebelum/sesudah hanya berisi kolom yang berubah; keadaan suatu entitas pada
+    waktu tertentu direkonstruksi dengan menerapkan event secara berurutan, dimulai dari
+    snapshot hasil compact() jika ada.
+    """
+    def __init__(self, path: str = "attendance_audit.db", actor: Optional[str] = None,
+                 flush_every: int = 256, flush_interval: float = 1.0) -> None:
+        self.path = path
+        self.actor = actor or getpass.getuser()
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._buffer: list[tuple] = []
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+
+        # Koneksi dipakai dari beberapa thread (mis. thread flush), akses dijaga oleh _lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS audit_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts TEXT NOT NULL,
+                actor TEXT,
+                entity TEXT NOT NULL,
+                entity_id INTEGER,
+                employee_id INTEGER,
+                action TEXT NOT NULL,
+                before TEXT,
+                after TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_audit_employee ON audit_events (employee_id, ts);
+            CREATE TABLE IF NOT EXISTS audit_snapshots (
+                entity TEXT NOT NULL,
+                entity_id INTEGER NOT NULL,
+                employee_id INTEGER,
+                ts TEXT NOT NULL,
+                state TEXT NOT NULL,
+                PRIMARY KEY (entity, entity_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_audit_snapshots_employee ON audit_snapshots (employee_id);
+        """)
+        self._conn.commit()
+
+        self._flusher = threading.Thread(target=self._flush_periodically, name="audit-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _flush_periodically(self) -> None:
+        """
+        Menulis buffer setiap flush_interval detik sampai log ditutup, agar event tidak
+        menunggu event berikutnya untuk ditulis.
+        """
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                # Event tetap di buffer dan dicoba lagi pada interval berikutnya
+                print(e, file=sys.stderr)
+
+    def record(self, entity: str, entity_id: Optional[int], employee_id: Optional[int], action: str,
+               before: Optional[dict], after: Optional[dict], actor: Optional[str] = None) -> None:
+        """
+        Mencatat satu perubahan. Event ditulis ke disk pada flush berikutnya.
+
+        Args:
+            entity: EMPLOYEE atau ATTENDANCE
+            entity_id: ID baris yang berubah
+            employee_id: ID karyawan pemilik data, untuk query per karyawan
+            action: Nama aksi, mis. 'create', 'update', 'deactivate', 'check-out'
+            before: Nilai kolom sebelum perubahan, None untuk baris baru
+            after: Nilai kolom sesudah perubahan
+            actor: Pelaku perubahan, default actor milik log
+        """
+        event = (datetime.now().isoformat(timespec="microseconds"), actor or self.actor,
+                 entity, entity_id, employee_id, action, before, after)
+        with self._lock:
+            self._buffer.append(event)
+            due = len(self._buffer) >= self.flush_every
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Menulis semua event di buffer dalam satu transaksi. Buffer baru dikosongkan setelah
+        commit berhasil; jika gagal, transaksi dibatalkan dan event disimpan untuk flush berikutnya.
+
+        Returns:
+            Jumlah event yang ditulis
+        """
+        with self._lock:
+            events = self._buffer
+            if not events:
+                return 0
+            try:
+                self._conn.executemany(
+                    "INSERT INTO audit_events(ts, actor, entity, entity_id, employee_id, action, before, after) "
+                    "VALUES(?,?,?,?,?,?,?,?)",
+                    [event[:6] + (_dumps(event[6]), _dumps(event[7])) for event in events])
+                self._conn.commit()
+            except sqlite3.Error:
+                self._conn.rollback()
+                raise
+            # record() menunggu _lock, jadi tidak ada event baru di antara penulisan dan pengosongan
+            self._buffer = []
+            return len(events)
+
+    def close(self) -> None:
+        """
+        Menghentikan thread flush, menulis sisa buffer dan menutup database audit. Database
+        tetap ditutup meskipun penulisan sisa buffer gagal. Pemanggilan berikutnya diabaikan.
+        """
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._flusher.join()
+        atexit.unregister(self.close)
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                self._conn.close()
+
+    def history(self, employee_id: int, start: Optional[str] = None, end: Optional[str] = None) -> list[tuple]:
+        """
+        Mengambil semua event milik satu karyawan (data karyawan dan kehadirannya).
+
+        Args:
+            employee_id: ID karyawan
+            start: Waktu awal ISO (inklusif), None untuk sejak awal
+            end: Waktu akhir ISO (inklusif), None untuk sampai sekarang
+
+        Returns:
+            List tuple berisi (waktu, pelaku, entitas, entity_id, aksi, sebelum, sesudah)
+            dengan sebelum/sesudah berupa dict
+        """
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT ts, actor, entity, entity_id, action, before, after FROM audit_events
+                WHERE employee_id = ? AND ts >= ? AND ts <= ?
+                ORDER BY id
+            """, (employee_id, start or "", end or "9999")).fetchall()
+        return [row[:5] + (json.loads(row[5]) if row[5] else None, json.loads(row[6]) if row[6] else None)
+                for row in rows]
+
+    def _fold(self, entity: str, timestamp: str, where: str, params: tuple) -> dict[int, dict]:
+        """
+        Merekonstruksi keadaan entitas pada waktu tertentu dari snapshot dan event.
+        """
+        self.flush()
+        with self._lock:
+            snapshots = self._conn.execute(
+                f"SELECT entity_id, ts, state FROM audit_snapshots WHERE entity = ? AND {where}",
+                (entity, *params)).fetchall()
+            events = self._conn.execute(
+                f"SELECT entity_id, ts, after FROM audit_events WHERE entity = ? AND {where} AND ts <= ? ORDER BY id",
+                (entity, *params, timestamp)).fetchall()
+
+        states: dict[int, dict] = {}
+        folded_until: dict[int, str] = {}
+        for entity_id, ts, state in snapshots:
+            if ts > timestamp:
+                raise ValueError(f"Riwayat {entity} {entity_id} sebelum {ts} sudah dipadatkan")
+            states[entity_id] = json.loads(state)
+            folded_until[entity_id] = ts
+        for entity_id, ts, after in events:
+            if entity_id is None or ts <= folded_until.get(entity_id, ""):
+                continue
+            states.setdefault(entity_id, {}).update(json.loads(after) if after else {})
+        return states
+
+    def employee_state_at(self, employee_id: int, timestamp: str) -> Optional[dict]:
+        """
+        Merekonstruksi data karyawan pada waktu tertentu.
+
+        Args:
+            employee_id: ID karyawan
+            timestamp: Waktu ISO
+
+        Returns:
+            Dict berisi full_name, position, department, active, terminated_at, badge_id
+            (kolom yang pernah dicatat), None jika karyawan belum ada pada waktu tersebut
+        """
+        # Event karyawan memiliki employee_id = entity_id sehingga indeks per karyawan terpakai
+        return self._fold(EMPLOYEE, timestamp, "employee_id = ? AND entity_id = ?",
+                          (employee_id, employee_id)).get(employee_id)
+
+    def attendance_state_at(self, employee_id: int, timestamp: str) -> dict[int, dict]:
+        """
+        Merekonstruksi semua catatan kehadiran karyawan pada waktu tertentu.
+
+        Args:
+            employee_id: ID karyawan
+            timestamp: Waktu ISO
+
+        Returns:
+            Dict berisi record_id -> kolom catatan (check_in_time, check_out_time, status, date, reason)
+        """
+        return self._fold(ATTENDANCE, timestamp, "employee_id = ?", (employee_id,))
+
+    def compact(self, older_than: str, vacuum: bool = False) -> int:
+        """
+        Memadatkan event yang lebih lama dari batas waktu menjadi satu snapshot per entitas.
+        Keadaan pada waktu setelah batas tetap dapat direkonstruksi; rincian event sebelum
+        batas dihapus.
+
+        Args:
+            older_than: Batas waktu ISO
+            vacuum: True untuk mengecilkan file database setelah pemadatan
+
+        Returns:
+            Jumlah event yang dipadatkan
+        """
+        self.flush()
+        with self._lock:
+            conn = self._conn
+            rows = conn.execute("""
+                SELECT entity, entity_id, employee_id, ts, after FROM audit_events
+                WHERE ts < ? AND entity_id IS NOT NULL
+                ORDER BY id
+            """, (older_than,)).fetchall()
+            snapshots: dict[tuple, list] = {}
+            for entity, entity_id, state_ts, state in conn.execute(
+                    "SELECT entity, entity_id, ts, state FROM audit_snapshots"):
+                snapshots[(entity, entity_id)] = [None, state_ts, json.loads(state)]
+            for entity, entity_id, employee_id, ts, after in rows:
+                snapshot = snapshots.setdefault((entity, entity_id), [employee_id, ts, {}])
+                if employee_id is not None:
+                    snapshot[0] = employee_id
+                snapshot[1] = ts
+                snapshot[2].update(json.loads(after) if after else {})
+
+            touched = {(row[0], row[1]) for row in rows}
+            try:
+                conn.executemany("""
+                    INSERT INTO audit_snapshots(entity, entity_id, employee_id, ts, state) VALUES(?,?,?,?,?)
+                    ON CONFLICT(entity, entity_id) DO UPDATE SET
+                        employee_id = COALESCE(excluded.employee_id, employee_id), ts = excluded.ts, state = excluded.state
+                """, [(entity, entity_id, snapshots[(entity, entity_id)][0], snapshots[(entity, entity_id)][1],
+                       _dumps(snapshots[(entity, entity_id)][2])) for entity, entity_id in touched])
+                deleted = conn.execute("DELETE FROM audit_events WHERE ts < ? AND entity_id IS NOT NULL",
+                                       (older_than,)).rowcount
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+            if vacuum:
+                conn.execute("VACUUM")
+            return deleted
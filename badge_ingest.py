@@ -0,0 +1,199 @@
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Optional
+from storage import StorageBackend
+
+# Punch berulang dari badge yang sama dalam rentang ini dianggap duplikat
+DEDUPE_SECONDS = 120
+# Sesi yang terbuka lebih lama dari ini tidak dipasangkan lagi (lupa check-out)
+MAX_SESSION_HOURS = 16
+# Jumlah sesi yang ditulis per transaksi
+BATCH_SIZE = 5000
+
+# Nilai kolom arah pada log terminal
+_DIRECTION_IN = {"i", "in", "0", "masuk"}
+_DIRECTION_OUT = {"o", "out", "1", "keluar"}
+
+# hasil satu kali impor log badge
+@dataclass
+class IngestResult:
+    """
+    Ringkasan hasil impor log punch dari terminal badge.
+    """
+    punches: int = 0
+    sessions: int = 0
+    closed_existing: int = 0
+    duplicates: int = 0
+    unknown_badges: int = 0
+    invalid_lines: int = 0
+    out_of_order: int = 0
+    unpaired_out: int = 0
+    seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """
+        Jumlah punch yang diproses per detik.
+        """
+        return self.punches / self.seconds if self.seconds > 0 else 0.0
+
+def parse_punch_log(lines: Iterable[str], result: IngestResult, delimiter: str = ",") -> Iterator[tuple[str, datetime, Optional[bool]]]:
+    """
+    Mem-parsing log punch baris demi baris tanpa memuat seluruh file ke memori.
+    Format baris: badge_id<delimiter>waktu[<delimiter>arah], waktu dalam format ISO
+    ('YYYY-MM-DD HH:MM:SS' atau 'YYYY-MM-DDTHH:MM:SS'), arah opsional (I/O, IN/OUT, 0/1).
+    Baris kosong, komentar (#), dan header dilewati; baris rusak dihitung sebagai invalid.
+
+    Yields:
+        Tuple berisi (badge_id, waktu, arah) dengan arah True untuk masuk, False untuk keluar,
+        None jika tidak diketahui
+    """
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] == "#":
+            continue
+        fields = line.split(delimiter)
+        if len(fields) < 2:
+            result.invalid_lines += 1
+            continue
+        try:
+            punched_at = datetime.fromisoformat(fields[1].strip())
+        except ValueError:
+            # Header kolom juga jatuh ke sini
+            result.invalid_lines += 1
+            continue
+        direction = None
+        if len(fields) > 2:
+            value = fields[2].strip().lower()
+            if value in _DIRECTION_IN:
+                direction = True
+            elif value in _DIRECTION_OUT:
+                direction = False
+        if punched_at.tzinfo is not None:
+            punched_at = punched_at.replace(tzinfo=None)
+        yield fields[0].strip(), punched_at, direction
+
+def ingest_punches(backend: StorageBackend, punches: Iterable[tuple[str, datetime, Optional[bool]]],
+                   result: Optional[IngestResult] = None, batch_size: int = BATCH_SIZE) -> IngestResult:
+    """
+    Memasangkan punch menjadi sesi check-in/check-out dalam satu kali lintasan dan menulisnya
+    ke database per batch. Punch harus berurutan waktu untuk setiap karyawan, seperti log terminal.
+
+    Punch tanpa arah dipasangkan bergantian (masuk, keluar, masuk, ...). Sesi yang masih terbuka
+    di database menjadi titik awal pemasangan, dan punch yang tidak lebih baru dari catatan
+    terakhir karyawan di database dilewati sehingga log yang sama aman diimpor ulang.
+
+    Args:
+        backend: Backend penyimpanan
+        punches: Iterable berisi (badge_id, waktu, arah)
+        result: IngestResult untuk diisi, dibuat baru jika None
+        batch_size: Jumlah sesi per transaksi
+
+    Returns:
+        IngestResult berisi statistik impor
+    """
+    result = result or IngestResult()
+    start = time.perf_counter()
+    badge_map = backend.get_badge_map()
+    max_session = timedelta(hours=MAX_SESSION_HOURS)
+    dedupe_window = timedelta(seconds=DEDUPE_SECONDS)
+
+    # Sesi terbuka per karyawan: (record_id atau None jika belum ditulis, waktu masuk)
+    open_sessions: dict[int, tuple[Optional[int], datetime]] = {}
+    # Waktu punch terakhir yang sudah diproses per karyawan
+    last_punch: dict[int, datetime] = {}
+    sessions: list[tuple] = []
+    closings: list[tuple] = []
+
+    def flush() -> None:
+        if sessions or closings:
+            inserted, duplicates, closed = backend.save_badge_sessions(sessions, closings)
+            result.sessions += inserted
+            result.duplicates += duplicates
+            result.closed_existing += closed
+            sessions.clear()
+            closings.clear()
+
+    def emit_session(employee_id: int, check_in: datetime, check_out: Optional[datetime]) -> None:
+        check_in_str = check_in.isoformat()
+        sessions.append((f"badge:{employee_id}:{check_in_str}", employee_id, check_in_str,
+                         check_out.isoformat() if check_out else None, check_in.date().isoformat()))
+        if len(sessions) >= batch_size:
+            flush()
+
+    first_punch = True
+    for badge_id, punched_at, direction in punches:
+        if first_punch:
+            # Sesi yang sudah ada sejak sehari sebelum punch pertama menjadi titik awal
+            since = (punched_at - timedelta(days=1)).date().isoformat()
+            for record_id, employee_id, check_in_time, check_out_time in backend.get_latest_sessions(since):
+                check_in = datetime.fromisoformat(check_in_time).replace(tzinfo=None)
+                if check_out_time is None:
+                    open_sessions[employee_id] = (record_id, check_in)
+                    last_punch[employee_id] = check_in
+                else:
+                    last_punch[employee_id] = datetime.fromisoformat(check_out_time).replace(tzinfo=None)
+            first_punch = False
+
+        result.punches += 1
+        employee_id = badge_map.get(badge_id)
+        if employee_id is None:
+            result.unknown_badges += 1
+            continue
+
+        previous = last_punch.get(employee_id)
+        if previous is not None:
+            if punched_at < previous - dedupe_window:
+                result.out_of_order += 1
+                continue
+            if punched_at - previous <= dedupe_window:
+                result.duplicates += 1
+                continue
+        last_punch[employee_id] = punched_at
+
+        session = open_sessions.get(employee_id)
+        if session is not None and (direction is True or punched_at - session[1] > max_session):
+            # Sesi lama dibiarkan terbuka (lupa check-out), punch ini memulai sesi baru
+            if session[0] is None:
+                emit_session(employee_id, session[1], None)
+            del open_sessions[employee_id]
+            session = None
+
+        if session is None:
+            if direction is False:
+                result.unpaired_out += 1
+            else:
+                open_sessions[employee_id] = (None, punched_at)
+            continue
+
+        record_id, check_in = open_sessions.pop(employee_id)
+        if record_id is None:
+            emit_session(employee_id, check_in, punched_at)
+        else:
+            closings.append((punched_at.isoformat(), record_id, check_in.date().isoformat()))
+
+    # Sesi yang belum ditutup pada akhir log ditulis tanpa waktu keluar
+    for employee_id, (record_id, check_in) in open_sessions.items():
+        if record_id is None:
+            emit_session(employee_id, check_in, None)
+    flush()
+    result.seconds = time.perf_counter() - start
+    return result
+
+def ingest_log_file(backend: StorageBackend, path: str, delimiter: str = ",", encoding: str = "utf-8") -> IngestResult:
+    """
+    Mengimpor satu file log punch dari terminal badge secara streaming.
+
+    Args:
+        backend: Backend penyimpanan
+        path: Lokasi file log
+        delimiter: Pemisah kolom pada log
+        encoding: Encoding file log
+
+    Returns:
+        IngestResult berisi statistik impor
+    """
+    result = IngestResult()
+    with open(path, "r", encoding=encoding, errors="replace") as f:
+        return ingest_punches(backend, parse_punch_log(f, result, delimiter), result)
@@ -0,0 +1,712 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from typing import Callable, Iterator, Optional
+import database
+from storage import StorageBackend, SQLiteBackend
+
+# Data sintetis untuk benchmark
+DEPARTMENTS = ["Keuangan", "Produksi", "Pemasaran", "Sumber Daya Manusia", "Teknologi Informasi",
+               "Gudang", "Logistik", "Penjualan", "Hukum", "Pengadaan"]
+POSITIONS = ["Staf", "Supervisor", "Manajer", "Operator", "Analis", "Teknisi"]
+
+def create_synthetic_database(db_file: str, employee_count: int, days: int, start: date = date(2024, 1, 1)) -> None:
+    """
+    Membuat database sintetis berisi karyawan dan catatan kehadiran harian.
+
+    Args:
+        db_file: Lokasi file database
+        employee_count: Jumlah karyawan
+        days: Jumlah hari catatan kehadiran per karyawan
+        start: Tanggal pertama catatan kehadiran
+    """
+    database.setup_database(db_file)
+    conn = sqlite3.connect(db_file)
+    rng = random.Random(7)
+
+    department_ids = [database.get_or_create_department(conn, name) for name in DEPARTMENTS]
+    position_ids = [database.get_or_create_position(conn, name) for name in POSITIONS]
+    conn.executemany(
+        "INSERT INTO employees(full_name, position_id, department_id) VALUES(?,?,?)",
+        ((f"Karyawan {i}", rng.choice(position_ids), rng.choice(department_ids)) for i in range(1, employee_count + 1)))
+
+    def attendance_rows():
+        for day in range(days):
+            current = start + timedelta(days=day)
+            if current.weekday() >= 5:
+                continue
+            date_str = current.isoformat()
+            for employee_id in range(1, employee_count + 1):
+                roll = rng.random()
+                if roll < 0.04:
+                    yield (employee_id, None, None, rng.choice(["Sakit", "Izin", "Cuti"]), date_str, "-")
+                else:
+                    check_in = f"{date_str}T{8 + int(roll * 2):02d}:{rng.randrange(60):02d}:00"
+                    check_out = f"{date_str}T{16 + int(roll * 3):02d}:{rng.randrange(60):02d}:00"
+                    yield (employee_id, check_in, check_out, "Hadir", date_str, None)
+
+    conn.executemany(
+        "INSERT INTO attendance_records(employee_id, check_in_time, check_out_time, status, date, reason) "
+        "VALUES(?,?,?,?,?,?)", attendance_rows())
+    conn.commit()
+    conn.close()
+
+def _synthetic_employees(count: int) -> list[tuple[int, str, str]]:
+    """
+    Membuat daftar karyawan sintetis (id, nama_lengkap, departemen) dengan nama yang bervariasi.
+    """
+    first_names = ["Andi", "Budi", "Citra", "Dewi", "Eka", "Fajar", "Gita", "Hadi", "Indah", "Joko",
+                   "Kartika", "Lestari", "Made", "Nur", "Putri", "Rizky", "Sari", "Taufik", "Wati", "Yusuf"]
+    last_names = ["Pratama", "Saputra", "Wijaya", "Santoso", "Hidayat", "Nugroho", "Kusuma", "Siregar",
+                  "Gunawan", "Setiawan", "Halim", "Utami", "Permana", "Lubis", "Sihombing"]
+    rng = random.Random(42)
+    return [(i, f"{rng.choice(first_names)} {rng.choice(last_names)} {i}", rng.choice(DEPARTMENTS))
+            for i in range(1, count + 1)]
+
+def _timed(label: str, func, rounds: int = 5) -> None:
+    """
+    Menjalankan fungsi beberapa kali dan mencetak rata-rata waktunya.
+    """
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = func()
+    elapsed_ms = (time.perf_counter() - start) / rounds * 1000
+    print(f"{label}: {elapsed_ms:.2f} ms ({len(result)} baris)")
+
+def benchmark_index(count: int = 100_000) -> None:
+    """
+    Mengukur waktu build indeks prefiks karyawan dan latensi pencariannya.
+    """
+    from employee_index import EmployeePrefixIndex
+
+    employees = _synthetic_employees(count)
+    index = EmployeePrefixIndex()
+    start = time.perf_counter()
+    index.build(employees)
+    print(f"Build indeks {count} karyawan: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    queries = ["a", "bu", "dewi", "pratama", "keu", "sumber daya", "12345", "rizky sir", "gudang put"]
+    for query in queries:
+        rounds = 200
+        start = time.perf_counter()
+        for _ in range(rounds):
+            hits = index.search(query)
+        latency_us = (time.perf_counter() - start) / rounds * 1_000_000
+        print(f"Cari {query!r}: {latency_us:.1f} us/query ({len(hits)} hasil)")
+
+    start = time.perf_counter()
+    for employee_id in range(count + 1, count + 1001):
+        index.add(employee_id, f"Karyawan Baru {employee_id}", "Produksi")
+    print(f"Tambah inkremental: {(time.perf_counter() - start) / 1000 * 1_000_000:.1f} us/karyawan")
+
+def benchmark_selector(count: int = 100_000) -> None:
+    """
+    Mengukur waktu pembuatan model dan latensi penyaringan pada pemilih karyawan (membutuhkan PyQt6).
+    """
+    from PyQt6.QtWidgets import QApplication
+    from employee_selector import EmployeeListModel, EmployeeSelector
+
+    app = QApplication([])
+    employees = _synthetic_employees(count)
+    model = EmployeeListModel()
+    start = time.perf_counter()
+    model.set_employees(employees)
+    print(f"Build model {count} karyawan: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    selector = EmployeeSelector(model=model)
+    print(f"Membuat EmployeeSelector: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for query in ["bu", "dewi pra", "keuangan", "4242"]:
+        rounds = 100
+        start = time.perf_counter()
+        for _ in range(rounds):
+            selector.update_suggestions(query)
+        print(f"Saring {query!r}: {(time.perf_counter() - start) / rounds * 1000:.2f} ms")
+    app.quit()
+
+def benchmark_departments(employee_count: int = 50_000, days: int = 60) -> None:
+    """
+    Mengukur query jumlah karyawan dan kehadiran per departemen.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        start = time.perf_counter()
+        create_synthetic_database(db_file, employee_count, days)
+        print(f"Membuat database sintetis: {time.perf_counter() - start:.1f} s")
+
+        conn = sqlite3.connect(db_file)
+        department_id = database.get_all_departments(conn)[0][0]
+        _timed("Jumlah karyawan per departemen", lambda: database.get_department_headcounts(conn))
+        _timed("Karyawan satu departemen", lambda: database.get_employees_by_department(conn, department_id))
+        _timed("Kehadiran satu departemen (1 hari)",
+               lambda: database.get_department_attendance(conn, department_id, "2024-01-15", "2024-01-15"))
+        _timed("Kehadiran satu departemen (1 bulan)",
+               lambda: database.get_department_attendance(conn, department_id, "2024-01-01", "2024-01-31"))
+        conn.close()
+
+def benchmark_kiosk(swipes: int = 100_000, employee_count: int = 1_000) -> None:
+    """
+    Mengukur jurnal kiosk terhadap database pengganti yang bergantian tersedia,
+    terkunci, dan tidak dapat dihubungi.
+    """
+    from kiosk_journal import SwipeJournal, replay_backend
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "central.db")
+        create_synthetic_database(db_file, employee_count, days=0)
+
+        # Database pengganti: None = tidak dapat dihubungi, "locked" = dikunci koneksi lain
+        state = {"mode": None}
+
+        # Backend yang sama dengan yang dipakai kiosk saat replay
+        def connect():
+            if state["mode"] is None:
+                return None
+            return replay_backend(db_file)
+
+        journal = SwipeJournal(os.path.join(tmp, "kiosk.jsonl"))
+        rng = random.Random(3)
+        start = time.perf_counter()
+        for i in range(swipes):
+            employee_id = rng.randrange(1, employee_count + 1)
+            day = f"2024-02-{1 + i * 28 // swipes:02d}"
+            journal.append(employee_id, "in" if i % 2 == 0 else "out", f"{day}T08:00:00", day)
+        journal.sync()
+        append_s = time.perf_counter() - start
+        print(f"Menulis {swipes} swipe ke jurnal: {append_s:.2f} s ({swipes / append_s:.0f} swipe/detik)")
+
+        result = journal.replay(connect)
+        print(f"Database tidak tersedia: error={result.error!r}, backlog={journal.backlog_size()}")
+
+        state["mode"] = "locked"
+        locker = sqlite3.connect(db_file)
+        locker.execute("BEGIN EXCLUSIVE")
+        result = journal.replay(connect)
+        print(f"Database terkunci: error={result.error!r}, backlog={journal.backlog_size()}, "
+              f"replay tertahan {result.seconds * 1000:.0f} ms")
+        locker.rollback()
+        locker.close()
+
+        # Salinan jurnal untuk mensimulasikan replay ulang setelah offset hilang
+        journal_copy = open(journal.path, "rb").read()
+
+        state["mode"] = "available"
+        result = journal.replay(connect)
+        print(f"Replay: {result.applied} diterapkan, {result.rejected} ditolak, {result.duplicates} duplikat "
+              f"dalam {result.seconds:.2f} s ({result.throughput:.0f} swipe/detik), backlog={journal.backlog_size()}")
+
+        # Replay ulang setelah offset hilang tidak boleh menggandakan data
+        journal.close()
+        with open(journal.path, "wb") as f:
+            f.write(journal_copy)
+        journal = SwipeJournal(journal.path)
+        result = journal.replay(connect)
+        print(f"Replay ulang: {result.applied} diterapkan, {result.duplicates} duplikat")
+        journal.close()
+
+def benchmark_shifts(employee_count: int = 50_000) -> None:
+    """
+    Mengukur klasifikasi kehadiran harian terhadap jadwal shift untuk banyak karyawan.
+    """
+    import shift_schedule
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        create_synthetic_database(db_file, employee_count, days=1)
+        backend = SQLiteBackend(db_file, setup=False)
+        conn = backend.conn
+
+        morning = database.add_shift(conn, ("Pagi", "08:00", "16:00", 10))
+        evening = database.add_shift(conn, ("Sore", "14:00", "22:00", 10))
+        night = database.add_shift(conn, ("Malam", "22:00", "06:00", 10))
+        rotation = database.add_rotation(conn, "Rotasi 4 hari", [morning, evening, night, None])
+        conn.executemany(
+            "INSERT INTO shift_assignments(employee_id, shift_id, rotation_id, start_date) VALUES(?,?,?,?)",
+            ((employee_id, morning if employee_id % 3 else None, None if employee_id % 3 else rotation,
+              "2023-12-30") for employee_id in range(1, employee_count + 1)))
+        conn.commit()
+
+        rounds = 5
+        start = time.perf_counter()
+        for _ in range(rounds):
+            schedule = shift_schedule.build_day_schedule(backend, "2024-01-01")
+        print(f"Lookup jadwal harian: {(time.perf_counter() - start) / rounds * 1000:.1f} ms "
+              f"({len(schedule)} karyawan terjadwal)")
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            count = shift_schedule.classify_day(backend, "2024-01-01")
+        print(f"Klasifikasi harian: {(time.perf_counter() - start) / rounds * 1000:.1f} ms ({count} catatan)")
+
+        summary = conn.execute("SELECT classification, COUNT(*) FROM attendance_classifications "
+                               "GROUP BY classification ORDER BY 2 DESC").fetchall()
+        print("Ringkasan:", ", ".join(f"{label}={count}" for label, count in summary))
+        backend.close()
+
+# Target waktu cold start CLI (proses baru hingga keluaran selesai)
+CLI_COLD_START_TARGET_MS = 150
+
+def benchmark_cli(runs: int = 10, employee_count: int = 10_000, days: int = 300) -> None:
+    """
+    Mengukur waktu cold start CLI pada database besar (sekitar 2 juta catatan) dan
+    memastikan PyQt6 tidak ikut diimpor.
+    """
+    import statistics
+    import subprocess
+    import sys
+
+    cli_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        create_synthetic_database(db_file, employee_count, days)
+        conn = sqlite3.connect(db_file)
+        record_count = conn.execute("SELECT COUNT(*) FROM attendance_records").fetchone()[0]
+        conn.close()
+        commands = {
+            "employee search": [sys.executable, cli_path, "--db", db_file, "employee", "search", "Karyawan 42"],
+            "check-in": [sys.executable, cli_path, "--db", db_file, "check-in", "1"],
+        }
+
+        medians = {}
+        for label, command in commands.items():
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                timings.append((time.perf_counter() - start) * 1000)
+            medians[label] = statistics.median(timings)
+        baseline = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", "pass"], check=True)
+            baseline.append((time.perf_counter() - start) * 1000)
+
+        check = subprocess.run(
+            [sys.executable, "-c", "import sys, cli; print('PyQt6' in sys.modules)"],
+            cwd=os.path.dirname(cli_path), capture_output=True, text=True, check=True)
+        print(f"Database: {employee_count} karyawan, {record_count} catatan kehadiran; "
+              f"interpreter kosong {statistics.median(baseline):.0f} ms, target {CLI_COLD_START_TARGET_MS} ms")
+        for label, median in medians.items():
+            print(f"Cold start {label!r}: median {median:.0f} ms: "
+                  f"{'OK' if median <= CLI_COLD_START_TARGET_MS else 'MELEBIHI TARGET'}")
+        print(f"PyQt6 diimpor oleh cli: {check.stdout.strip()}")
+
+def benchmark_parallel(employee_count: int = 12_000, days: int = 365) -> None:
+    """
+    Membandingkan laporan jam kerja satu tahun antara satu proses dan banyak proses.
+    Dengan nilai default, database sintetis berisi sekitar 3 juta catatan kehadiran.
+    """
+    import parallel_report
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        start = time.perf_counter()
+        create_synthetic_database(db_file, employee_count, days)
+        conn = sqlite3.connect(db_file)
+        record_count = conn.execute("SELECT COUNT(*) FROM attendance_records").fetchone()[0]
+        conn.close()
+        print(f"Membuat database sintetis: {time.perf_counter() - start:.1f} s ({record_count} catatan)")
+
+        cpu_count = os.cpu_count() or 1
+        for partition in ("month", "department"):
+            start = time.perf_counter()
+            single = parallel_report.hours_report(db_file, "2024-01-01", "2024-12-31", partition, workers=1)
+            single_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            parallel = parallel_report.hours_report(db_file, "2024-01-01", "2024-12-31", partition, workers=cpu_count)
+            parallel_s = time.perf_counter() - start
+
+            # Urutan penjumlahan berbeda antar partisi, jadi jam kerja dibandingkan dengan toleransi
+            same = len(single) == len(parallel) and all(
+                a[:3] == b[:3] and a[4:] == b[4:] and abs(a[3] - b[3]) < 0.01 for a, b in zip(single, parallel))
+            print(f"Partisi {partition}: 1 proses {single_s:.2f} s, {cpu_count} proses {parallel_s:.2f} s, "
+                  f"speedup {single_s / parallel_s:.2f}x ({len(single)} karyawan, hasil sama: {same})")
+
+def benchmark_cache(employee_count: int = 20_000, days: int = 30, refreshes: int = 50) -> None:
+    """
+    Mengukur refresh tab harian/ketidakhadiran dengan cache query dan efek invalidasi per tanggal.
+    """
+    from query_cache import default_cache, cache_stats
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        create_synthetic_database(db_file, employee_count, days)
+        conn = database.create_connection(db_file)
+        past_day, today = "2024-01-15", "2024-01-30"
+
+        def refresh() -> None:
+            database.get_todays_records(conn, past_day)
+            database.get_todays_records(conn, today)
+            database.get_all_absences(conn)
+
+        default_cache.clear()
+        start = time.perf_counter()
+        refresh()
+        print(f"Refresh pertama (miss): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        start = time.perf_counter()
+        for i in range(refreshes):
+            # Setiap refresh didahului satu check-in pada hari ini
+            database.add_attendance_record(conn, (1 + i, f"{today}T09:00:00", "Hadir", today))
+            refresh()
+        elapsed_ms = (time.perf_counter() - start) / refreshes * 1000
+        stats = cache_stats()
+        print(f"Refresh setelah check-in: {elapsed_ms:.1f} ms rata-rata")
+        print(f"Statistik cache: hits={stats['hits']} misses={stats['misses']} "
+              f"hit_rate={stats['hit_rate']:.0%} invalidations={stats['invalidations']} "
+              f"entries={stats['entries']} rows={stats['rows']}")
+
+        # Penulisan ke hari lampau dari proses lain (mis. replay jurnal kiosk) harus langsung terlihat
+        before = len(database.get_todays_records(conn, past_day))
+        other = sqlite3.connect(db_file)
+        other.execute("INSERT INTO attendance_records(employee_id, check_in_time, status, date) VALUES(1, ?, 'Hadir', ?)",
+                      (f"{past_day}T07:00:00", past_day))
+        other.commit()
+        other.close()
+        after = len(database.get_todays_records(conn, past_day))
+        print(f"Penulisan dari koneksi lain ke {past_day}: {before} -> {after} baris "
+              f"({'terlihat' if after == before + 1 else 'BASI'})")
+        database.forget_connection(conn)
+        conn.close()
+
+def benchmark_badge(punches: int = 1_000_000, employee_count: int = 50_000) -> None:
+    """
+    Mengukur throughput impor log punch badge dan memastikan impor ulang tidak menggandakan data.
+    """
+    from badge_ingest import ingest_log_file
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        create_synthetic_database(db_file, employee_count, 0)
+        backend = SQLiteBackend(db_file, setup=False)
+        conn = backend.conn
+        conn.executemany("UPDATE employees SET badge_id = ? WHERE id = ?",
+                         ((f"B{employee_id:06d}", employee_id) for employee_id in range(1, employee_count + 1)))
+        conn.commit()
+
+        # Log sintetis: punch masuk/keluar tanpa arah, sebagian punch terbaca dua kali
+        log_file = os.path.join(tmp, "punches.csv")
+        rng = random.Random(11)
+        written = 0
+        day = date(2024, 3, 1)
+        with open(log_file, "w", encoding="utf-8") as f:
+            f.write("badge_id,timestamp\n")
+            while written < punches:
+                employee_ids = range(1, employee_count + 1)
+                lines = []
+                for employee_id in employee_ids:
+                    minute = rng.randrange(120)
+                    lines.append((8 * 60 + minute, employee_id))
+                    lines.append((17 * 60 + minute, employee_id))
+                    if rng.random() < 0.05:
+                        lines.append((8 * 60 + minute, employee_id))
+                lines.sort()
+                for minute, employee_id in lines[:punches - written]:
+                    f.write(f"B{employee_id:06d},{day.isoformat()} {minute // 60:02d}:{minute % 60:02d}:00\n")
+                written += min(len(lines), punches - written)
+                day += timedelta(days=1)
+
+        result = ingest_log_file(backend, log_file)
+        print(f"Impor {result.punches} punch: {result.seconds:.1f} s ({result.throughput:,.0f} punch/s)")
+        print(f"  sesi={result.sessions} duplikat={result.duplicates} invalid={result.invalid_lines} "
+              f"badge_tidak_dikenal={result.unknown_badges} keluar_tanpa_masuk={result.unpaired_out}")
+
+        records = conn.execute("SELECT COUNT(*) FROM attendance_records").fetchone()[0]
+        result = ingest_log_file(backend, log_file)
+        print(f"Impor ulang: {result.seconds:.1f} s, sesi baru={result.sessions}, "
+              f"catatan {records} -> {conn.execute('SELECT COUNT(*) FROM attendance_records').fetchone()[0]}")
+        backend.close()
+
+def benchmark_anomalies(employee_count: int = 20_000, days: int = 90) -> None:
+    """
+    Mengukur throughput pemindaian anomali pada data kehadiran besar.
+    """
+    from attendance_validation import OPEN_SESSION, OVERLAP, NEGATIVE_DURATION, ABSENCE_CONFLICT, validate_range
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        create_synthetic_database(db_file, employee_count, days)
+        backend = SQLiteBackend(db_file, setup=False)
+        conn = backend.conn
+        end = (date(2024, 1, 1) + timedelta(days=days - 1)).isoformat()
+
+        # Anomali yang disisipkan: lupa check-out, durasi negatif, sesi tumpang tindih, konflik absen
+        rng = random.Random(3)
+        record_count = conn.execute("SELECT COUNT(*) FROM attendance_records").fetchone()[0]
+        sample = rng.sample(range(1, record_count + 1), 400)
+        conn.executemany("UPDATE attendance_records SET check_out_time = NULL WHERE id = ? AND status = 'Hadir'",
+                         ((record_id,) for record_id in sample[:100]))
+        conn.executemany("UPDATE attendance_records SET check_out_time = date || 'T07:00:00' "
+                         "WHERE id = ? AND status = 'Hadir'", ((record_id,) for record_id in sample[100:200]))
+        conn.executemany("INSERT INTO attendance_records(employee_id, check_in_time, check_out_time, status, date) "
+                         "SELECT employee_id, date || 'T12:00:00', date || 'T13:00:00', 'Hadir', date "
+                         "FROM attendance_records WHERE id = ? AND status = 'Hadir'",
+                         ((record_id,) for record_id in sample[200:300]))
+        conn.executemany("INSERT INTO attendance_records(employee_id, status, date, reason) "
+                         "SELECT employee_id, 'Sakit', date, '-' FROM attendance_records WHERE id = ? AND status = 'Hadir'",
+                         ((record_id,) for record_id in sample[300:]))
+        conn.commit()
+        record_count = conn.execute("SELECT COUNT(*) FROM attendance_records").fetchone()[0]
+
+        report = validate_range(backend, "2024-01-01", end)
+        print(f"Pemindaian {record_count} catatan: {report.seconds:.2f} s "
+              f"({record_count / report.seconds:,.0f} catatan/s)")
+        for kind in (OPEN_SESSION, NEGATIVE_DURATION, OVERLAP, ABSENCE_CONFLICT):
+            print(f"  {kind}: {report.count(kind)}")
+
+        start = time.perf_counter()
+        report = validate_range(backend, "2024-01-01", end, auto_close=True)
+        print(f"Pemindaian + tutup otomatis: {time.perf_counter() - start:.2f} s, {report.closed_sessions} sesi ditutup")
+        report = validate_range(backend, "2024-01-01", end)
+        print(f"Sesi terbuka setelah ditutup otomatis: {report.count(OPEN_SESSION)}")
+        backend.close()
+
+def benchmark_heatmap(employee_count: int = 500, viewport_rows: int = 50, viewport_days: int = 90) -> None:
+    """
+    Mengukur query agregat per viewport heatmap kalender dan ukuran cache selnya.
+    """
+    from heatmap_data import HeatmapGrid
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        create_synthetic_database(db_file, employee_count, 366)
+        backend = SQLiteBackend(db_file, setup=False)
+        employee_ids = [employee[0] for employee in backend.get_all_employees()]
+
+        grid = HeatmapGrid(employee_ids, "2024-01-01", 366)
+        viewports = [(row, day) for row in range(0, employee_count, viewport_rows)
+                     for day in range(0, 366, viewport_days)]
+        start = time.perf_counter()
+        for row, day in viewports:
+            grid.ensure_loaded(backend, row, row + viewport_rows - 1, day, day + viewport_days - 1)
+        elapsed = time.perf_counter() - start
+        print(f"Memuat {len(viewports)} viewport {viewport_rows}x{viewport_days}: {grid.queries} query, "
+              f"{elapsed / grid.queries * 1000:.1f} ms per query")
+
+        start = time.perf_counter()
+        for row, day in viewports:
+            grid.ensure_loaded(backend, row, row + viewport_rows - 1, day, day + viewport_days - 1)
+        print(f"Scroll ulang dari cache: {(time.perf_counter() - start) * 1000:.2f} ms total")
+        print(f"Cache sel {employee_count} karyawan x 366 hari: {grid.memory_bytes() / 1024:.0f} KB")
+        backend.close()
+
+def benchmark_heatmap_frames(employee_count: int = 500, frames: int = 200) -> None:
+    """
+    Mengukur waktu frame widget heatmap setahun saat di-scroll (membutuhkan PyQt6).
+    """
+    from PyQt6.QtWidgets import QApplication
+    import storage
+    from attendance_heatmap import AttendanceHeatmapWidget
+
+    app = QApplication([])
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        create_synthetic_database(db_file, employee_count, 366, start=date(2024, 1, 1))
+        # Widget memakai backend bersama aplikasi
+        storage.configure_app_backend(db_file)
+        try:
+            widget = AttendanceHeatmapWidget()
+            widget.year_spin.setValue(2024)
+            widget.resize(1200, 800)
+            widget.show()
+            app.processEvents()
+
+            view = widget.heatmap_view
+            view.frame_times.clear()
+            horizontal, vertical = view.horizontalScrollBar(), view.verticalScrollBar()
+            queries_before = widget.heatmap_model.grid.queries
+            start = time.perf_counter()
+            for frame in range(frames):
+                horizontal.setValue(horizontal.maximum() * frame // frames)
+                vertical.setValue(vertical.maximum() * frame // frames)
+                app.processEvents()
+                view.viewport().repaint()
+            elapsed = time.perf_counter() - start
+            stats = view.frame_stats()
+            grid = widget.heatmap_model.grid
+            print(f"{frames} frame scroll ({employee_count} karyawan x {grid.days} hari): {elapsed:.2f} s")
+            print(f"Waktu frame: rata-rata {stats['avg']:.2f} ms, p95 {stats['p95']:.2f} ms, maks {stats['max']:.2f} ms")
+            print(f"Query viewport: {grid.queries - queries_before}, cache sel: {grid.memory_bytes() / 1024:.0f} KB")
+        finally:
+            storage.close_app_backend()
+    app.quit()
+
+def benchmark_audit(check_ins: int = 20_000, employee_count: int = 1_000, rounds: int = 3) -> None:
+    """
+    Mengukur tambahan waktu log audit pada jalur check-in, lalu waktu rekonstruksi dan pemadatan.
+    """
+    from audit_log import AuditLog
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        create_synthetic_database(db_file, employee_count, 1)
+        conn = sqlite3.connect(db_file)
+        audit = AuditLog(os.path.join(tmp, "bench_audit.db"), actor="benchmark")
+
+        def check_in_all(day: int) -> float:
+            day_str = (date(2024, 2, 1) + timedelta(days=day)).isoformat()
+            start = time.perf_counter()
+            for i in range(check_ins):
+                database.add_attendance_record(conn, (i % employee_count + 1, f"{day_str}T08:00:00", "Hadir", day_str))
+            return time.perf_counter() - start
+
+        # Bergantian tanpa dan dengan audit agar pertumbuhan tabel tidak menguntungkan salah satunya
+        plain = audited = 0.0
+        for round_number in range(rounds):
+            database.set_audit_log(None)
+            plain += check_in_all(round_number * 2)
+            database.set_audit_log(audit)
+            audited += check_in_all(round_number * 2 + 1)
+            audit.flush()
+        database.set_audit_log(None)
+        total = check_ins * rounds
+        print(f"Check-in tanpa audit: {plain / total * 1e6:.1f} us/operasi")
+        print(f"Check-in dengan audit: {audited / total * 1e6:.1f} us/operasi "
+              f"(+{(audited - plain) / plain * 100:.1f}%)")
+
+        start = time.perf_counter()
+        for employee_id in range(1, 101):
+            audit.attendance_state_at(employee_id, "9999")
+        print(f"Rekonstruksi kehadiran per karyawan: {(time.perf_counter() - start) * 10:.2f} ms")
+
+        size = os.path.getsize(audit.path)
+        start = time.perf_counter()
+        compacted = audit.compact("9999", vacuum=True)
+        print(f"Pemadatan {compacted} event: {time.perf_counter() - start:.2f} s, "
+              f"{size / 1024 / 1024:.1f} MB -> {os.path.getsize(audit.path) / 1024 / 1024:.1f} MB")
+        audit.close()
+        conn.close()
+
+@contextlib.contextmanager
+def _temporary_backend(url: Optional[str]) -> Iterator[Callable[[], StorageBackend]]:
+    """
+    Menyediakan pembuat backend pada database sementara yang sama: file SQLite baru jika url
+    None, atau skema PostgreSQL sementara yang dihapus kembali setelah selesai.
+    """
+    if url is None:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_file = os.path.join(tmp, "backend.db")
+            yield lambda: SQLiteBackend(db_file)
+        return
+    import psycopg
+    from storage_postgres import PostgresBackend
+    schema = f"benchmark_{uuid.uuid4().hex[:12]}"
+    try:
+        yield lambda: PostgresBackend(url, max_size=4, schema=schema)
+    finally:
+        with psycopg.connect(url, autocommit=True) as conn:
+            conn.execute(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+
+def _benchmark_backend(url: Optional[str], employee_count: int, swipes: int, writers: int) -> None:
+    """
+    Mengukur satu backend pada database sementara; url None berarti file SQLite baru.
+    """
+    with _temporary_backend(url) as make_backend:
+        with contextlib.redirect_stdout(io.StringIO()):
+            backend = make_backend()
+        try:
+            start = time.perf_counter()
+            employee_ids = [backend.add_employee((f"Karyawan {i}", "Staf", f"Departemen {i % 10}"))
+                            for i in range(employee_count)]
+            print(f"  Tambah {employee_count} karyawan: {time.perf_counter() - start:.2f} s")
+
+            def swipe_batches(prefix: str, count: int):
+                batch = []
+                for i in range(count):
+                    employee_id = employee_ids[i % employee_count]
+                    day = f"2024-01-{1 + (i // employee_count) % 28:02d}"
+                    batch.append({"key": f"{prefix}-{i}", "employee_id": employee_id, "action": "in",
+                                  "time": f"{day}T08:00:00", "date": day})
+                    batch.append({"key": f"{prefix}-{i}-out", "employee_id": employee_id, "action": "out",
+                                  "time": f"{day}T16:00:00", "date": day})
+                    if len(batch) >= 1000:
+                        yield batch
+                        batch = []
+                if batch:
+                    yield batch
+
+            start = time.perf_counter()
+            for batch in swipe_batches("single", swipes // 2):
+                backend.apply_journal_swipes(batch)
+            elapsed = time.perf_counter() - start
+            print(f"  Swipe 1 penulis: {swipes / elapsed:,.0f} swipe/s")
+
+            # Beberapa instance aplikasi menulis bersamaan, masing-masing dengan backend sendiri
+            errors = []
+
+            def writer(index: int) -> None:
+                own_backend = make_backend()
+                try:
+                    for batch in swipe_batches(f"writer{index}", swipes // 2 // writers):
+                        own_backend.apply_journal_swipes(batch)
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    own_backend.close()
+
+            threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+            start = time.perf_counter()
+            # Pesan koneksi dari setiap penulis disembunyikan selama thread berjalan
+            with contextlib.redirect_stdout(io.StringIO()):
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            elapsed = time.perf_counter() - start
+            status = f", {len(errors)} penulis gagal ({type(errors[0]).__name__})" if errors else ""
+            print(f"  Swipe {writers} penulis bersamaan: {swipes / elapsed:,.0f} swipe/s{status}")
+
+            for label, query in (("Laporan jam kerja 1 bulan", lambda: backend.get_hours_aggregate("2024-01-01", "2024-01-31")),
+                                 ("Catatan harian", lambda: backend.get_todays_records("2024-01-05")),
+                                 ("Semua karyawan", lambda: backend.get_all_employees()),
+                                 ("Pemindaian anomali", lambda: backend.get_attendance_anomaly_candidates(
+                                     "2024-01-01", "2024-01-31", "2024-01-01T00:00:00"))):
+                start = time.perf_counter()
+                rows = list(query())
+                print(f"  {label}: {(time.perf_counter() - start) * 1000:.1f} ms ({len(rows)} baris)")
+        finally:
+            backend.close()
+
+def benchmark_backends(employee_count: int = 2_000, swipes: int = 40_000, writers: int = 4) -> None:
+    """
+    Mengukur operasi utama pada setiap backend penyimpanan: impor swipe per batch, penulisan
+    bersamaan oleh beberapa instance aplikasi, dan query laporan. PostgreSQL ikut diukur jika
+    variabel lingkungan ATTENDANCE_PG_URL berisi URL server.
+    """
+    for url in [None] + ([os.environ["ATTENDANCE_PG_URL"]] if os.environ.get("ATTENDANCE_PG_URL") else []):
+        print(f"Backend {url or 'sqlite (file sementara)'}")
+        _benchmark_backend(url, employee_count, swipes, writers)
+
+BENCHMARKS = {
+    "index": benchmark_index,
+    "selector": benchmark_selector,
+    "department": benchmark_departments,
+    "kiosk": benchmark_kiosk,
+    "shifts": benchmark_shifts,
+    "cli": benchmark_cli,
+    "parallel": benchmark_parallel,
+    "cache": benchmark_cache,
+    "badge": benchmark_badge,
+    "anomalies": benchmark_anomalies,
+    "heatmap": benchmark_heatmap,
+    "heatmap-frames": benchmark_heatmap_frames,
+    "audit": benchmark_audit,
+    "backends": benchmark_backends,
+}
+
+# Blok untuk menjalankan benchmark jika file ini dijalankan langsung
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark query database kehadiran.")
+    parser.add_argument("name", choices=sorted(BENCHMARKS), help="Nama benchmark")
+    args = parser.parse_args()
+    BENCHMARKS[args.name]()
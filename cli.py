@@ -0,0 +1,417 @@
+"""
+Antarmuka baris perintah tanpa Qt untuk skrip dan operasi batch.
+
+Contoh:
+    python cli.py init
+    python cli.py employee add --name "Budi" --position Staf --department Keuangan
+    python cli.py employee list --department Keuangan
+    python cli.py employee badge 1 B000123
+    python cli.py ingest punches.csv
+    python cli.py check-in 1
+    python cli.py report daily --date 2024-01-15
+    python cli.py report anomalies --start 2024-01-01 --end 2024-01-31 --auto-close
+    python cli.py bulk < operasi.jsonl
+    python cli.py audit state 1 --at 2024-01-15T12:00:00
+
+Semua keluaran berupa JSON lines (satu objek JSON per baris) di stdout.
+Modul ini sengaja tidak mengimpor PyQt6, dan modul lain diimpor saat dibutuhkan saja.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+from datetime import date as date_type, datetime, timedelta
+from typing import Iterable, Optional
+
+# Jumlah swipe bulk yang diterapkan per transaksi
+BULK_BATCH_SIZE = 1000
+
+# Jenis ketidakhadiran yang dapat dicatat
+ABSENCE_TYPES = ("Sakit", "Izin", "Cuti")
+
+# Rentang default pemindaian anomali (hari sebelum --end), jauh melebihi batas sesi basi
+# agar sesi yang terbuka sejak kemarin atau sebelum akhir pekan ikut terdeteksi
+ANOMALY_SCAN_DAYS = 7
+
+def _emit(obj: dict) -> None:
+    sys.stdout.write(json.dumps(obj, ensure_ascii=False) + "\n")
+
+def _emit_rows(columns: tuple[str, ...], rows: Iterable[tuple]) -> None:
+    for row in rows:
+        _emit(dict(zip(columns, row)))
+
+def _connect(url: str):
+    """
+    Membuka backend database yang sudah disiapkan dengan perintah init. Skema tidak
+    disentuh di sini agar setiap perintah tidak menjalankan DDL dan migrasi.
+    Pesan status dari modul database dialihkan ke stderr agar stdout hanya berisi JSON lines.
+    """
+    import storage
+    db_file = storage.sqlite_path(url)
+    if db_file is not None and not os.path.exists(db_file):
+        _fail(f"Database {db_file} belum ada. Jalankan 'cli.py --db {url} init' terlebih dahulu.")
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            return storage.open_backend(url, setup=False)
+    except Exception as e:
+        _fail(f"Tidak dapat terhubung ke database {url}: {e}")
+
+def _now() -> datetime:
+    return datetime.now().replace(microsecond=0)
+
+def _fail(message: str) -> None:
+    """
+    Menulis error dalam bentuk JSON yang sama dengan operasi bulk lalu keluar dengan kode 1.
+    Semua error perintah melewati fungsi ini agar stdout selalu berisi JSON lines.
+    """
+    _emit({"op": "error", "error": message})
+    raise SystemExit(1)
+
+def _parse_time(value: Optional[str]) -> datetime:
+    """
+    Mengurai waktu dalam format ISO, default waktu saat ini.
+
+    Raises:
+        ValueError: Jika waktu tidak valid
+    """
+    if not value:
+        return _now()
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Waktu tidak valid: {value!r}, gunakan format ISO mis. 2024-01-15T08:00:00") from None
+
+def _parse_date(value: Optional[str]) -> str:
+    """
+    Mengurai tanggal 'YYYY-MM-DD', default hari ini.
+
+    Raises:
+        ValueError: Jika tanggal tidak valid
+    """
+    if not value:
+        return _now().date().isoformat()
+    try:
+        return date_type.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        raise ValueError(f"Tanggal tidak valid: {value!r}, gunakan format 'YYYY-MM-DD' mis. 2024-01-15") from None
+
+def _parse_absence_type(value: Optional[str]) -> str:
+    """
+    Memastikan jenis ketidakhadiran dikenal.
+
+    Raises:
+        ValueError: Jika jenis tidak dikenal
+    """
+    if value not in ABSENCE_TYPES:
+        raise ValueError(f"Jenis ketidakhadiran tidak valid: {value!r}, pilih salah satu dari {', '.join(ABSENCE_TYPES)}")
+    return value
+
+def _require_active_employee(backend, employee_id: int) -> None:
+    """
+    Memastikan karyawan ada dan masih aktif sebelum mencatat kehadiran.
+    """
+    if backend.get_employee(employee_id) is None:
+        _fail(f"Karyawan {employee_id} tidak ditemukan atau sudah nonaktif")
+
+EMPLOYEE_COLUMNS = ("id", "full_name", "position", "department")
+
+def cmd_init(args: argparse.Namespace) -> None:
+    """
+    Membuat tabel, menjalankan migrasi, dan membuat indeks. Dijalankan sekali saat
+    database baru dibuat atau setelah pembaruan aplikasi.
+    """
+    import storage
+    with contextlib.redirect_stdout(sys.stderr):
+        # Membuka backend dengan setup bawaan membuat tabel, migrasi, dan indeks
+        storage.open_backend(args.db).close()
+    _emit({"db": args.db, "initialized": True})
+
+def cmd_employee_add(backend, args: argparse.Namespace) -> None:
+    employee_id = backend.add_employee((args.name, args.position, args.department))
+    _emit({"id": employee_id})
+
+def cmd_employee_list(backend, args: argparse.Namespace) -> None:
+    import database
+    if args.department:
+        wanted = database.lookup_key(args.department)
+        department_ids = [department_id for department_id, name in backend.get_all_departments()
+                          if database.lookup_key(name) == wanted]
+        rows = backend.get_employees_by_department(department_ids[0]) if department_ids else []
+    else:
+        rows = backend.get_all_employees()
+    _emit_rows(EMPLOYEE_COLUMNS, rows)
+
+def cmd_employee_search(backend, args: argparse.Namespace) -> None:
+    _emit_rows(EMPLOYEE_COLUMNS, backend.search_employees(args.term))
+
+def cmd_employee_badge(backend, args: argparse.Namespace) -> None:
+    _require_active_employee(backend, args.employee_id)
+    badge_id = args.badge_id or None
+    try:
+        backend.set_employee_badge(args.employee_id, badge_id)
+    except backend.Error as e:
+        _fail(f"Badge {badge_id} tidak dapat dipasang: {e}")
+    _emit({"employee_id": args.employee_id, "badge_id": badge_id})
+
+def cmd_check_in(backend, args: argparse.Namespace) -> None:
+    when = _parse_time(args.time)
+    _require_active_employee(backend, args.employee_id)
+    record_id = backend.add_attendance_record((args.employee_id, when.isoformat(), "Hadir", when.date().isoformat()))
+    _emit({"record_id": record_id, "employee_id": args.employee_id, "check_in_time": when.isoformat()})
+
+def cmd_check_out(backend, args: argparse.Namespace) -> None:
+    when = _parse_time(args.time)
+    _require_active_employee(backend, args.employee_id)
+    last_check_in = backend.get_last_check_in_for_employee(args.employee_id, when.date().isoformat(),
+                                                           when.isoformat())
+    if last_check_in is None:
+        _fail("Tidak ditemukan catatan check-in untuk karyawan ini pada tanggal tersebut.")
+    backend.check_out(last_check_in[0], when.isoformat())
+    _emit({"record_id": last_check_in[0], "employee_id": args.employee_id, "check_out_time": when.isoformat()})
+
+def cmd_absence(backend, args: argparse.Namespace) -> None:
+    date = _parse_date(args.date)
+    _require_active_employee(backend, args.employee_id)
+    record_id = backend.add_absence_record((args.employee_id, None, None, args.type, date, args.reason))
+    _emit({"record_id": record_id, "employee_id": args.employee_id, "status": args.type, "date": date})
+
+def _work_hours(check_in: Optional[str], check_out: Optional[str]) -> Optional[float]:
+    if not check_in or not check_out:
+        return None
+    seconds = (datetime.fromisoformat(check_out) - datetime.fromisoformat(check_in)).total_seconds()
+    return round(seconds / 3600.0, 2)
+
+def cmd_report_daily(backend, args: argparse.Namespace) -> None:
+    date = _parse_date(args.date)
+    for full_name, check_in, check_out, status in backend.get_todays_records(date):
+        _emit({"date": date, "full_name": full_name, "check_in_time": check_in, "check_out_time": check_out,
+               "work_hours": _work_hours(check_in, check_out), "status": status})
+
+def cmd_report_anomalies(backend, args: argparse.Namespace) -> None:
+    import attendance_validation
+    end = _parse_date(args.end)
+    if args.start:
+        start = _parse_date(args.start)
+    else:
+        start = (date_type.fromisoformat(end) - timedelta(days=ANOMALY_SCAN_DAYS)).isoformat()
+    report = attendance_validation.validate_range(backend, start, end, auto_close=args.auto_close)
+    for anomaly in report.anomalies:
+        _emit({"record_id": anomaly.record_id, "employee_id": anomaly.employee_id, "date": anomaly.date,
+               "kind": anomaly.kind, "check_in_time": anomaly.check_in_time, "check_out_time": anomaly.check_out_time})
+    if args.auto_close:
+        _emit({"op": "auto-close", "closed": report.closed_sessions})
+
+def cmd_ingest(backend, args: argparse.Namespace) -> None:
+    """
+    Mengimpor log punch terminal badge; log yang sama aman diimpor ulang.
+    """
+    import dataclasses
+    import badge_ingest
+    try:
+        result = badge_ingest.ingest_log_file(backend, args.logfile, args.delimiter, args.encoding)
+    except OSError as e:
+        _fail(f"Log {args.logfile} tidak dapat dibaca: {e}")
+    _emit({"op": "ingest", **dataclasses.asdict(result)})
+
+def cmd_bulk(backend, args: argparse.Namespace) -> None:
+    """
+    Menjalankan operasi dari stdin, satu objek JSON per baris. Operasi yang didukung:
+        {"op": "employee-add", "name": ..., "position": ..., "department": ...}
+        {"op": "check-in", "employee_id": ..., "time": ..., "key": ...}
+        {"op": "check-out", "employee_id": ..., "time": ..., "key": ...}
+        {"op": "absence", "employee_id": ..., "type": ..., "date": ..., "reason": ...}
+    Check-in/check-out dikumpulkan dan diterapkan per batch dalam satu transaksi;
+    "key" opsional dipakai sebagai kunci idempotensi sehingga input yang sama aman dijalankan ulang.
+    """
+    import uuid
+
+    swipes: list[dict] = []
+    # Karyawan aktif, agar swipe dan ketidakhadiran untuk karyawan nonaktif ditolak seperti perintah tunggal
+    active_ids = {employee[0] for employee in backend.get_all_employees()}
+
+    def require_active(employee_id: int) -> int:
+        if employee_id not in active_ids:
+            raise ValueError(f"Karyawan {employee_id} tidak ditemukan atau sudah nonaktif")
+        return employee_id
+
+    def flush_swipes() -> None:
+        if swipes:
+            try:
+                applied, duplicates, rejected = backend.apply_journal_swipes(swipes)
+                _emit({"op": "swipes", "applied": applied, "duplicates": duplicates, "rejected": rejected})
+            finally:
+                swipes.clear()
+
+    failures = 0
+    for line_number, line in enumerate(sys.stdin, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+            op = item["op"]
+            if op in ("check-in", "check-out"):
+                when = _parse_time(item.get("time"))
+                swipes.append({"key": item.get("key") or uuid.uuid4().hex, "employee_id": require_active(int(item["employee_id"])),
+                               "action": "in" if op == "check-in" else "out",
+                               "time": when.isoformat(), "date": when.date().isoformat()})
+                if len(swipes) >= BULK_BATCH_SIZE:
+                    flush_swipes()
+                continue
+
+            # Operasi lain bisa bergantung pada swipe sebelumnya, jadi swipe diterapkan dulu
+            flush_swipes()
+            if op == "employee-add":
+                employee_id = backend.add_employee((item["name"], item.get("position"), item.get("department")))
+                active_ids.add(employee_id)
+                _emit({"op": op, "line": line_number, "id": employee_id})
+            elif op == "absence":
+                record_id = backend.add_absence_record(
+                    (require_active(int(item["employee_id"])), None, None, _parse_absence_type(item.get("type")),
+                     _parse_date(item.get("date")), item.get("reason")))
+                _emit({"op": op, "line": line_number, "record_id": record_id})
+            else:
+                raise ValueError(f"Operasi tidak dikenal: {op}")
+        except (ValueError, KeyError, TypeError, backend.Error) as e:
+            failures += 1
+            _emit({"op": "error", "line": line_number, "error": str(e)})
+    flush_swipes()
+    if failures:
+        raise SystemExit(1)
+
+def cmd_cleanup_orphans(backend, args: argparse.Namespace) -> None:
+    # Pesan ringkasan backend ke stderr agar stdout tetap JSON lines
+    with contextlib.redirect_stdout(sys.stderr):
+        deleted = backend.cleanup_orphan_records()
+    _emit({"op": "cleanup-orphans", "deleted": deleted})
+
+def cmd_audit_history(backend, args: argparse.Namespace) -> None:
+    start = _parse_time(args.start).isoformat() if args.start else None
+    end = _parse_time(args.end).isoformat() if args.end else None
+    for ts, actor, entity, entity_id, action, before, after in args.audit_log.history(args.employee_id, start, end):
+        _emit({"ts": ts, "actor": actor, "entity": entity, "entity_id": entity_id,
+               "action": action, "before": before, "after": after})
+
+def cmd_audit_state(backend, args: argparse.Namespace) -> None:
+    at = _parse_time(args.at).isoformat()
+    employee = args.audit_log.employee_state_at(args.employee_id, at)
+    records = args.audit_log.attendance_state_at(args.employee_id, at)
+    _emit({"at": at, "employee": employee})
+    for record_id, record in sorted(records.items()):
+        _emit({"record_id": record_id, **record})
+
+def cmd_audit_compact(backend, args: argparse.Namespace) -> None:
+    _emit({"compacted": args.audit_log.compact(_parse_time(args.before).isoformat(), vacuum=args.vacuum)})
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Sistem Manajemen Kehadiran Karyawan (CLI)")
+    parser.add_argument("--db", default="attendance.db",
+                        help="Lokasi file SQLite atau URL postgresql://... (default: attendance.db)")
+    parser.add_argument("--audit-db", help="Lokasi database audit (default: <db>_audit.db)")
+    parser.add_argument("--actor", help="Nama pelaku perubahan untuk log audit (default: pengguna sistem)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    init = commands.add_parser("init", help="Siapkan skema database (tabel, migrasi, indeks)")
+    init.set_defaults(func=cmd_init)
+
+    employee = commands.add_parser("employee", help="Kelola data karyawan")
+    employee_commands = employee.add_subparsers(dest="employee_command", required=True)
+    add = employee_commands.add_parser("add", help="Tambah karyawan")
+    add.add_argument("--name", required=True)
+    add.add_argument("--position")
+    add.add_argument("--department")
+    add.set_defaults(func=cmd_employee_add)
+    listing = employee_commands.add_parser("list", help="Daftar karyawan aktif")
+    listing.add_argument("--department", help="Saring berdasarkan nama departemen")
+    listing.set_defaults(func=cmd_employee_list)
+    search = employee_commands.add_parser("search", help="Cari karyawan berdasarkan nama atau ID")
+    search.add_argument("term")
+    search.set_defaults(func=cmd_employee_search)
+    badge = employee_commands.add_parser("badge", help="Pasang atau hapus ID badge karyawan")
+    badge.add_argument("employee_id", type=int)
+    badge.add_argument("badge_id", nargs="?", help="ID badge pada terminal, kosongkan untuk menghapus badge")
+    badge.set_defaults(func=cmd_employee_badge)
+
+    for name, func, help_text in (("check-in", cmd_check_in, "Catat waktu masuk"),
+                                  ("check-out", cmd_check_out, "Catat waktu keluar")):
+        swipe = commands.add_parser(name, help=help_text)
+        swipe.add_argument("employee_id", type=int)
+        swipe.add_argument("--time", help="Waktu dalam format ISO, default waktu saat ini")
+        swipe.set_defaults(func=func)
+
+    absence = commands.add_parser("absence", help="Catat ketidakhadiran")
+    absence.add_argument("employee_id", type=int)
+    absence.add_argument("--type", required=True, choices=ABSENCE_TYPES)
+    absence.add_argument("--date", help="Tanggal 'YYYY-MM-DD', default hari ini")
+    absence.add_argument("--reason", default="")
+    absence.set_defaults(func=cmd_absence)
+
+    report = commands.add_parser("report", help="Laporan kehadiran")
+    report_commands = report.add_subparsers(dest="report_command", required=True)
+    daily = report_commands.add_parser("daily", help="Catatan kehadiran harian")
+    daily.add_argument("--date", help="Tanggal 'YYYY-MM-DD', default hari ini")
+    daily.set_defaults(func=cmd_report_daily)
+    anomalies = report_commands.add_parser("anomalies", help="Sesi terbuka, tumpang tindih, dan catatan bertentangan")
+    anomalies.add_argument("--start", help=f"Tanggal awal 'YYYY-MM-DD', default {ANOMALY_SCAN_DAYS} hari sebelum --end")
+    anomalies.add_argument("--end", help="Tanggal akhir 'YYYY-MM-DD', default hari ini")
+    anomalies.add_argument("--auto-close", action="store_true", help="Tutup otomatis sesi terbuka yang basi")
+    anomalies.set_defaults(func=cmd_report_anomalies)
+
+    ingest = commands.add_parser("ingest", help="Impor log punch dari terminal badge")
+    ingest.add_argument("logfile", help="File log: badge_id,waktu[,arah] per baris")
+    ingest.add_argument("--delimiter", default=",", help="Pemisah kolom (default: koma)")
+    ingest.add_argument("--encoding", default="utf-8", help="Encoding file log (default: utf-8)")
+    ingest.set_defaults(func=cmd_ingest)
+
+    bulk = commands.add_parser("bulk", help="Jalankan operasi JSON lines dari stdin")
+    bulk.set_defaults(func=cmd_bulk)
+
+    cleanup = commands.add_parser("cleanup-orphans",
+                                  help="Hapus catatan kehadiran milik karyawan yang sudah tidak ada (dicatat ke log audit)")
+    cleanup.set_defaults(func=cmd_cleanup_orphans)
+
+    audit = commands.add_parser("audit", help="Riwayat perubahan data karyawan dan kehadiran")
+    audit_commands = audit.add_subparsers(dest="audit_command", required=True)
+    history = audit_commands.add_parser("history", help="Semua perubahan untuk satu karyawan")
+    history.add_argument("employee_id", type=int)
+    history.add_argument("--start", help="Waktu awal ISO")
+    history.add_argument("--end", help="Waktu akhir ISO")
+    history.set_defaults(func=cmd_audit_history)
+    state = audit_commands.add_parser("state", help="Data karyawan dan kehadirannya pada waktu tertentu")
+    state.add_argument("employee_id", type=int)
+    state.add_argument("--at", help="Waktu ISO, default waktu saat ini")
+    state.set_defaults(func=cmd_audit_state)
+    compact = audit_commands.add_parser("compact", help="Padatkan event lama menjadi snapshot")
+    compact.add_argument("--before", required=True, help="Batas waktu ISO")
+    compact.add_argument("--vacuum", action="store_true", help="Kecilkan file database audit")
+    compact.set_defaults(func=cmd_audit_compact)
+    return parser
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """
+    Fungsi utama CLI.
+    """
+    from audit_log import AuditLog, default_audit_path
+    args = build_parser().parse_args(argv)
+    if args.func is cmd_init:
+        try:
+            cmd_init(args)
+        except Exception as e:
+            _fail(f"Database {args.db} tidak dapat disiapkan: {e}")
+        return
+    backend = _connect(args.db)
+    args.audit_log = AuditLog(args.audit_db or default_audit_path(args.db), actor=args.actor)
+    backend.set_audit_log(args.audit_log)
+    try:
+        args.func(backend, args)
+    except (ValueError, backend.Error) as e:
+        # Input tidak valid dan error database dilaporkan dalam bentuk JSON seperti error lain
+        _fail(str(e))
+    finally:
+        backend.set_audit_log(None)
+        args.audit_log.close()
+        backend.close()
+
+# Blok untuk menjalankan CLI jika file ini dijalankan langsung
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,172 @@
 import sqlite3
+import sys
+import unicodedata
 from sqlite3 import Error, Connection
+from datetime import datetime
 from typing import Optional
+from query_cache import default_cache
+from audit_log import EMPLOYEE, ATTENDANCE, ROTATION, SHIFT_ASSIGNMENT, CLASSIFICATION, changed_columns
 
-def create_connection(db_file: str = "attendance.db") -> Optional[Connection]:
+# Log audit aktif (lihat audit_log.AuditLog), None jika perubahan tidak dicatat
+_audit_log = None
+
+def set_audit_log(audit_log) -> None:
+    """
+    Memasang log audit yang menerima setiap perubahan data karyawan dan kehadiran.
+
+    Args:
+        audit_log: Objek dengan metode record() seperti audit_log.AuditLog, None untuk menonaktifkan
+    """
+    global _audit_log
+    _audit_log = audit_log
+
+def create_connection(db_file: str = "attendance.db", timeout: float = 5.0, uri: bool = False) -> Optional[Connection]:
     """ 
     Membuat koneksi ke database SQLite.
+
+    Args:
+        db_file: Lokasi file database
+        timeout: Lama menunggu (detik) jika database sedang dikunci koneksi lain
+        uri: True jika db_file berupa URI 'file:...' (mis. dengan ?mode=ro)
     
     Returns:
         Objek Connection jika berhasil, None jika gagal
     """
     conn: Optional[Connection] = None
     try:
-        conn = sqlite3.connect(db_file)
+        conn = sqlite3.connect(db_file, timeout=timeout, uri=uri)
+        # Menegakkan integritas referensial (nonaktif secara default di SQLite)
+        conn.execute("PRAGMA foreign_keys = ON")
         print(f"Connected to {db_file}, SQLite version: {sqlite3.version}")
         return conn
     except Error as e:
         print(e)
     return conn
 
+def _cache_scope(conn: Connection) -> Optional[str]:
+    """
+    Mengembalikan lokasi file database sebagai lingkup cache query, None untuk database di memori.
+    """
+    row = conn.execute("PRAGMA database_list").fetchone()
+    return row[2] or None
+
+def _data_version(conn: Connection) -> int:
+    """
+    Membaca PRAGMA data_version dari koneksi yang tetap terbuka. Nilainya berubah setiap kali
+    koneksi lain (di proses ini atau proses lain) melakukan commit, juga pada mode WAL yang
+    tidak memperbarui change counter di header file, dan tidak berubah oleh commit koneksi
+    itu sendiri (yang sudah meng-invalidate cache per tanggal).
+    """
+    return conn.execute("PRAGMA data_version").fetchone()[0]
+
+def _cached_rows(conn: Connection, scope: str, key: tuple) -> Optional[list]:
+    """
+    Mengambil hasil query dari cache setelah memastikan tidak ada penulisan dari koneksi lain.
+    """
+    default_cache.check_version(scope, _data_version(conn), source=id(conn))
+    return default_cache.get(key)
+
+def forget_connection(conn: Connection) -> None:
+    """
+    Melupakan versi database yang tercatat untuk koneksi yang akan ditutup, agar koneksi
+    baru yang kebetulan mendapat id objek yang sama tidak dianggap sudah sinkron.
+
+    Args:
+        conn: Koneksi database
+    """
+    scope = _cache_scope(conn)
+    if scope is not None:
+        default_cache.forget_source(scope, id(conn))
+
+def _invalidate_dates(conn: Connection, dates: set[str], status: Optional[str] = None) -> None:
+    """
+    Meng-invalidate hasil query cache untuk tanggal-tanggal yang baru ditulis.
+    """
+    scope = _cache_scope(conn)
+    if scope is not None:
+        for date in dates:
+            default_cache.invalidate_date(scope, date, status)
+
+def _invalidate_all(conn: Connection) -> None:
+    """
+    Meng-invalidate semua hasil query cache untuk database ini (mis. setelah data karyawan berubah).
+    """
+    scope = _cache_scope(conn)
+    if scope is not None:
+        default_cache.invalidate_scope(scope)
+
+def _employee_image(conn: Connection, id: int) -> Optional[dict]:
+    """
+    Mengambil data karyawan dalam bentuk dict untuk log audit.
+    """
+    row = conn.execute("""
+        SELECT e.full_name, p.name, d.name, e.active, e.terminated_at, e.badge_id
+        FROM employees e
+        LEFT JOIN positions p ON e.position_id = p.id
+        LEFT JOIN departments d ON e.department_id = d.id
+        WHERE e.id = ?
+    """, (id,)).fetchone()
+    if row is None:
+        return None
+    return dict(zip(("full_name", "position", "department", "active", "terminated_at", "badge_id"), row))
+
+def _audit(entity: str, entity_id: Optional[int], employee_id: Optional[int], action: str,
+           before: Optional[dict], after: Optional[dict]) -> None:
+    """
+    Mencatat satu event ke log audit aktif. Dipanggil setelah commit, sehingga kegagalan
+    menulis log audit hanya dicetak: perubahan data sudah tersimpan dan event tetap di
+    buffer log audit untuk ditulis ulang.
+    """
+    if _audit_log is None:
+        return
+    try:
+        _audit_log.record(entity, entity_id, employee_id, action, before, after)
+    except Exception as e:
+        # Ke stderr agar keluaran data (mis. JSON lines CLI) di stdout tidak tercampur
+        print(e, file=sys.stderr)
+
+def _audit_employee_change(id: int, action: str, before: Optional[dict], after: Optional[dict]) -> None:
+    """
+    Mencatat perubahan data karyawan ke log audit, hanya kolom yang berubah.
+    """
+    changes = changed_columns(before, after)
+    if changes is not None:
+        _audit(EMPLOYEE, id, id, action, *changes)
+
+def _record_owners(cur, record_ids: list[int]) -> dict[int, int]:
+    """
+    Mengambil ID karyawan pemilik catatan kehadiran untuk log audit.
+    """
+    owners: dict[int, int] = {}
+    for i in range(0, len(record_ids), 500):
+        chunk = record_ids[i:i + 500]
+        cur.execute(f"SELECT id, employee_id FROM attendance_records WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+        owners.update(cur.fetchall())
+    return owners
+
+def classification_events(classifications: list[tuple], previous: set[int], owners: dict[int, int]) -> list[tuple]:
+    """
+    Menyusun event log audit untuk hasil klasifikasi satu tanggal. Dipakai oleh semua backend.
+
+    Args:
+        classifications: Klasifikasi baru, tuple seperti pada save_attendance_classifications
+        previous: ID catatan yang sudah diklasifikasikan sebelum disimpan ulang
+        owners: ID karyawan pemilik setiap catatan
+
+    Returns:
+        List tuple berisi (entitas, record_id, employee_id, aksi, sebelum, sesudah): satu event
+        'classify' per catatan dan satu event 'unclassify' per klasifikasi lama yang terhapus
+    """
+    events = []
+    for record_id, shift_id, classification, late, early_leave, overtime in classifications:
+        events.append((CLASSIFICATION, record_id, owners.get(record_id), "classify", None,
+                       {"shift_id": shift_id, "classification": classification, "late_minutes": late,
+                        "early_leave_minutes": early_leave, "overtime_minutes": overtime}))
+    classified = {row[0] for row in classifications}
+    for record_id in sorted(previous - classified):
+        events.append((CLASSIFICATION, record_id, owners.get(record_id), "unclassify", None, None))
+    return events
+
 def create_table(conn: Connection, create_table_sql: str) -> None:
     try:
         c = conn.cursor()
@@ -25,19 +174,39 @@ def create_table(conn: Connection, create_table_sql: str) -> None:
     except Error as e:
         print(e)
 
-def setup_database() -> None:
+def setup_database(database_file: str = "attendance.db") -> None:
     """ 
     Membuat database dan tabel-tabel yang diperlukan jika belum ada. dipanggil saat aplikasi pertama kali dijalankan.
+    Database lama dengan kolom posisi/departemen berupa teks akan dimigrasikan ke tabel referensi.
+    """
+    # SQL untuk membuat tabel referensi departemen dan posisi
+    sql_create_departments_table: str = """
+    CREATE TABLE IF NOT EXISTS departments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+        name_key TEXT
+    );
+    """
+    sql_create_positions_table: str = """
+    CREATE TABLE IF NOT EXISTS positions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+        name_key TEXT
+    );
     """
-    database_file: str = "attendance.db"
 
     # SQL untuk membuat tabel karyawan
     sql_create_employees_table: str = """
     CREATE TABLE IF NOT EXISTS employees (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         full_name TEXT NOT NULL,
-        position TEXT,
-        department TEXT
+        position_id INTEGER,
+        department_id INTEGER,
+        active INTEGER NOT NULL DEFAULT 1,
+        terminated_at TEXT,
+        badge_id TEXT,
+        FOREIGN KEY (position_id) REFERENCES positions (id),
+        FOREIGN KEY (department_id) REFERENCES departments (id)
     );
     """
 
@@ -55,17 +224,406 @@ def setup_database() -> None:
     );
     """
 
+    # SQL untuk membuat tabel kunci idempotensi swipe dari jurnal kiosk
+    sql_create_journal_applied_table: str = """
+    CREATE TABLE IF NOT EXISTS journal_applied (
+        key TEXT PRIMARY KEY,
+        applied_at TEXT
+    ) WITHOUT ROWID;
+    """
+
+    # SQL untuk membuat tabel shift, rotasi, dan penugasan shift karyawan
+    # Shift dengan end_time <= start_time dianggap melewati tengah malam
+    sql_create_shifts_table: str = """
+    CREATE TABLE IF NOT EXISTS shifts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        start_time TEXT NOT NULL,
+        end_time TEXT NOT NULL,
+        grace_minutes INTEGER NOT NULL DEFAULT 0
+    );
+    """
+    sql_create_rotations_table: str = """
+    CREATE TABLE IF NOT EXISTS rotations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        cycle_days INTEGER NOT NULL CHECK (cycle_days > 0)
+    );
+    """
+    # shift_id NULL pada langkah rotasi berarti hari libur
+    sql_create_rotation_steps_table: str = """
+    CREATE TABLE IF NOT EXISTS rotation_steps (
+        rotation_id INTEGER NOT NULL,
+        day_index INTEGER NOT NULL,
+        shift_id INTEGER,
+        PRIMARY KEY (rotation_id, day_index),
+        FOREIGN KEY (rotation_id) REFERENCES rotations (id),
+        FOREIGN KEY (shift_id) REFERENCES shifts (id)
+    );
+    """
+    # Penugasan memakai shift tetap (shift_id) atau rotasi (rotation_id) mulai start_date
+    sql_create_shift_assignments_table: str = """
+    CREATE TABLE IF NOT EXISTS shift_assignments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        employee_id INTEGER NOT NULL,
+        shift_id INTEGER,
+        rotation_id INTEGER,
+        start_date TEXT NOT NULL,
+        end_date TEXT,
+        CHECK ((shift_id IS NULL) != (rotation_id IS NULL)),
+        FOREIGN KEY (employee_id) REFERENCES employees (id),
+        FOREIGN KEY (shift_id) REFERENCES shifts (id),
+        FOREIGN KEY (rotation_id) REFERENCES rotations (id)
+    );
+    """
+    # Hasil klasifikasi kehadiran terhadap jadwal shift
+    sql_create_attendance_classifications_table: str = """
+    CREATE TABLE IF NOT EXISTS attendance_classifications (
+        record_id INTEGER PRIMARY KEY,
+        shift_id INTEGER,
+        classification TEXT NOT NULL,
+        late_minutes INTEGER NOT NULL DEFAULT 0,
+        early_leave_minutes INTEGER NOT NULL DEFAULT 0,
+        overtime_minutes INTEGER NOT NULL DEFAULT 0,
+        FOREIGN KEY (record_id) REFERENCES attendance_records (id),
+        FOREIGN KEY (shift_id) REFERENCES shifts (id)
+    );
+    """
+
     # Membuat koneksi dan tabel-tabel
     conn: Optional[Connection] = create_connection(database_file)
 
     if conn is not None:
+        create_table(conn, sql_create_departments_table)
+        create_table(conn, sql_create_positions_table)
         create_table(conn, sql_create_employees_table)
         create_table(conn, sql_create_attendance_records_table)
+        create_table(conn, sql_create_journal_applied_table)
+        create_table(conn, sql_create_shifts_table)
+        create_table(conn, sql_create_rotations_table)
+        create_table(conn, sql_create_rotation_steps_table)
+        create_table(conn, sql_create_shift_assignments_table)
+        create_table(conn, sql_create_attendance_classifications_table)
+        migrate_lookup_keys(conn)
+        migrate_employee_lookups(conn)
+        migrate_employee_status(conn)
+        migrate_employee_badge(conn)
+        create_indexes(conn)
         conn.close()
         print("Database and tables are set up.")
     else:
         print("Error! cannot create the database connection.")
 
+def create_indexes(conn: Connection) -> None:
+    """
+    Membuat indeks untuk query per departemen dan per tanggal.
+    Indeks parsial pada karyawan aktif dipakai oleh query yang menyaring active = 1:
+    daftar karyawan aktif dibaca berurutan nama langsung dari indeks nama tanpa langkah sort.
+
+    Args:
+        conn: Koneksi database
+    """
+    sql_indexes = [
+        "CREATE INDEX IF NOT EXISTS idx_employees_department ON employees (department_id)",
+        "CREATE INDEX IF NOT EXISTS idx_employees_position ON employees (position_id)",
+        # Indeks lama pada id tidak pernah dipakai (pencarian id sudah memakai primary key)
+        "DROP INDEX IF EXISTS idx_employees_active",
+        "CREATE INDEX IF NOT EXISTS idx_employees_active_name ON employees (full_name) WHERE active = 1",
+        "CREATE INDEX IF NOT EXISTS idx_employees_active_department ON employees (department_id) WHERE active = 1",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_departments_key ON departments (name_key)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_positions_key ON positions (name_key)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_employees_badge ON employees (badge_id) WHERE badge_id IS NOT NULL",
+        "CREATE INDEX IF NOT EXISTS idx_attendance_employee_date ON attendance_records (employee_id, date)",
+        "CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance_records (date)",
+        "CREATE INDEX IF NOT EXISTS idx_shift_assignments_dates ON shift_assignments (start_date, end_date)",
+        "CREATE INDEX IF NOT EXISTS idx_shift_assignments_employee ON shift_assignments (employee_id, start_date)",
+    ]
+    try:
+        c = conn.cursor()
+        for sql in sql_indexes:
+            c.execute(sql)
+        conn.commit()
+    except Error as e:
+        print(e)
+
+def normalize_lookup_name(name: Optional[str]) -> Optional[str]:
+    """
+    Merapikan nama departemen/posisi: menyeragamkan bentuk Unicode (NFKC, mis. huruf
+    lebar penuh dan ligatur) lalu menghapus spasi berlebih di awal, akhir, dan tengah.
+
+    Returns:
+        Nama yang sudah dirapikan, None jika kosong
+    """
+    if name is None:
+        return None
+    normalized = " ".join(unicodedata.normalize("NFKC", name).split())
+    return normalized or None
+
+def lookup_key(name: Optional[str]) -> Optional[str]:
+    """
+    Membuat kunci pembanding nama departemen/posisi. Nama yang dirapikan di-casefold sehingga
+    perbedaan huruf besar/kecil di luar ASCII (mis. 'Straße' dan 'STRASSE') juga dianggap sama.
+
+    Returns:
+        Kunci nama, None jika nama kosong
+    """
+    normalized = normalize_lookup_name(name)
+    if normalized is None:
+        return None
+    return unicodedata.normalize("NFKC", normalized.casefold())
+
+def plan_lookup_keys(rows: list[tuple]) -> tuple[list[tuple[str, int]], list[tuple[int, int]]]:
+    """
+    Menghitung kunci nama untuk baris tabel referensi yang belum memilikinya. Baris yang
+    kuncinya sama dengan baris lain digabungkan ke baris yang sudah berkunci atau ber-ID terkecil.
+
+    Args:
+        rows: List tuple berisi (id, nama, kunci_nama) diurutkan berdasarkan ID
+
+    Returns:
+        Tuple berisi (list (kunci_nama, id) yang perlu diisi, list (id_tujuan, id_duplikat))
+    """
+    canonical = {key: id for id, _, key in rows if key is not None}
+    keys: list[tuple[str, int]] = []
+    merges: list[tuple[int, int]] = []
+    for id, name, key in rows:
+        if key is not None:
+            continue
+        key = lookup_key(name) or name
+        if key in canonical:
+            merges.append((canonical[key], id))
+        else:
+            canonical[key] = id
+            keys.append((key, id))
+    return keys, merges
+
+def migrate_lookup_keys(conn: Connection) -> None:
+    """
+    Menambahkan kolom kunci nama pada tabel departemen dan posisi di database lama dan
+    mengisinya. Nama yang sebelumnya dianggap berbeda namun kuncinya sama digabungkan:
+    karyawan dipindahkan ke baris tujuan dan baris duplikat dihapus.
+
+    Args:
+        conn: Koneksi database
+    """
+    cur = conn.cursor()
+    try:
+        for table, id_column in (("departments", "department_id"), ("positions", "position_id")):
+            columns = {row[1] for row in cur.execute(f"PRAGMA table_info({table})")}
+            if "name_key" not in columns:
+                cur.execute(f"ALTER TABLE {table} ADD COLUMN name_key TEXT")
+            elif cur.execute(f"SELECT 1 FROM {table} WHERE name_key IS NULL LIMIT 1").fetchone() is None:
+                continue
+            keys, merges = plan_lookup_keys(cur.execute(f"SELECT id, name, name_key FROM {table} ORDER BY id").fetchall())
+            cur.executemany(f"UPDATE employees SET {id_column} = ? WHERE {id_column} = ?", merges)
+            cur.executemany(f"DELETE FROM {table} WHERE id = ?", [(duplicate,) for _, duplicate in merges])
+            cur.executemany(f"UPDATE {table} SET name_key = ? WHERE id = ?", keys)
+            if merges:
+                print(f"Merged {len(merges)} duplicate {table}.")
+        conn.commit()
+    except Error as e:
+        conn.rollback()
+        print(e)
+
+def migrate_employee_lookups(conn: Connection) -> None:
+    """
+    Memigrasikan kolom teks posisi dan departemen pada database lama ke tabel referensi.
+    Nilai teks dirapikan dan diduplikasi berdasarkan lookup_key; ejaan yang paling sering
+    dipakai menjadi nama resmi. Kolom teks lama dibiarkan apa adanya.
+
+    Args:
+        conn: Koneksi database
+    """
+    cur = conn.cursor()
+    columns = {row[1] for row in cur.execute("PRAGMA table_info(employees)")}
+    if "department" not in columns or "department_id" in columns:
+        return
+
+    try:
+        cur.execute("ALTER TABLE employees ADD COLUMN position_id INTEGER REFERENCES positions (id)")
+        cur.execute("ALTER TABLE employees ADD COLUMN department_id INTEGER REFERENCES departments (id)")
+
+        for text_column, id_column, table in (("position", "position_id", "positions"),
+                                              ("department", "department_id", "departments")):
+            # Mengelompokkan variasi penulisan berdasarkan nama yang sudah dirapikan
+            variants: dict[str, list[tuple[str, int]]] = {}
+            cur.execute(f"SELECT {text_column}, COUNT(*) FROM employees "
+                        f"WHERE {text_column} IS NOT NULL GROUP BY {text_column}")
+            for raw_value, count in cur.fetchall():
+                key = lookup_key(raw_value)
+                if key is not None:
+                    variants.setdefault(key, []).append((raw_value, count))
+
+            for group in variants.values():
+                # Ejaan paling sering menjadi nama resmi di tabel referensi
+                canonical = normalize_lookup_name(max(group, key=lambda variant: variant[1])[0])
+                lookup_id = _get_or_create_lookup(conn, table, canonical)
+                cur.executemany(f"UPDATE employees SET {id_column} = ? WHERE {text_column} = ?",
+                                [(lookup_id, raw_value) for raw_value, _ in group])
+        conn.commit()
+        print("Migrated employee positions and departments to lookup tables.")
+    except Error as e:
+        conn.rollback()
+        print(e)
+
+def migrate_employee_status(conn: Connection) -> None:
+    """
+    Menambahkan kolom status aktif dan tanggal berhenti pada database lama.
+
+    Args:
+        conn: Koneksi database
+    """
+    cur = conn.cursor()
+    columns = {row[1] for row in cur.execute("PRAGMA table_info(employees)")}
+    if "active" in columns:
+        return
+
+    try:
+        cur.execute("ALTER TABLE employees ADD COLUMN active INTEGER NOT NULL DEFAULT 1")
+        cur.execute("ALTER TABLE employees ADD COLUMN terminated_at TEXT")
+        conn.commit()
+        print("Added active/terminated_at columns to employees.")
+    except Error as e:
+        conn.rollback()
+        print(e)
+
+def migrate_employee_badge(conn: Connection) -> None:
+    """
+    Menambahkan kolom ID badge (kartu/biometrik) pada database lama.
+
+    Args:
+        conn: Koneksi database
+    """
+    cur = conn.cursor()
+    columns = {row[1] for row in cur.execute("PRAGMA table_info(employees)")}
+    if "badge_id" in columns:
+        return
+
+    try:
+        cur.execute("ALTER TABLE employees ADD COLUMN badge_id TEXT")
+        conn.commit()
+        print("Added badge_id column to employees.")
+    except Error as e:
+        conn.rollback()
+        print(e)
+
+def cleanup_orphan_records(conn: Connection) -> int:
+    """
+    Menghapus catatan kehadiran yang merujuk ke karyawan yang sudah tidak ada.
+    Catatan seperti ini tersisa dari penghapusan permanen sebelum foreign key ditegakkan.
+    Karena menghapus data, fungsi ini tidak dijalankan oleh setup_database melainkan
+    secara eksplisit lewat 'cli.py cleanup-orphans'. Isi setiap catatan yang dihapus
+    dicatat ke log audit sehingga dapat dipulihkan.
+
+    Args:
+        conn: Koneksi database
+
+    Returns:
+        Jumlah catatan yatim yang dihapus
+    """
+    columns = ("employee_id", "check_in_time", "check_out_time", "status", "date", "reason")
+    sql = f''' SELECT id, {", ".join(columns)} FROM attendance_records
+               WHERE NOT EXISTS (SELECT 1 FROM employees e WHERE e.id = attendance_records.employee_id) '''
+    try:
+        cur = conn.cursor()
+        orphans = cur.execute(sql).fetchall()
+        if not orphans:
+            return 0
+        cur.executemany("DELETE FROM attendance_records WHERE id = ?", [(row[0],) for row in orphans])
+        conn.commit()
+    except Error as e:
+        conn.rollback()
+        print(e)
+        return 0
+    _invalidate_all(conn)
+    for row in orphans:
+        _audit(ATTENDANCE, row[0], row[1], "cleanup-orphan", dict(zip(columns[1:], row[2:])), None)
+    print(f"Removed {len(orphans)} orphan attendance records.")
+    return len(orphans)
+
+def _get_or_create_lookup(conn: Connection, table: str, name: Optional[str]) -> Optional[int]:
+    """
+    Mengambil ID dari tabel referensi (departments/positions), menambahkannya jika belum ada.
+    """
+    name = normalize_lookup_name(name)
+    if name is None:
+        return None
+    key = lookup_key(name)
+    cur = conn.cursor()
+    cur.execute(f"SELECT id FROM {table} WHERE name_key = ?", (key,))
+    row = cur.fetchone()
+    if row:
+        return row[0]
+    cur.execute(f"INSERT INTO {table}(name, name_key) VALUES(?,?)", (name, key))
+    return cur.lastrowid
+
+def get_or_create_department(conn: Connection, name: Optional[str]) -> Optional[int]:
+    """
+    Mengambil ID departemen berdasarkan nama, menambahkannya jika belum ada.
+
+    Args:
+        conn: Koneksi database
+        name: Nama departemen
+
+    Returns:
+        ID departemen, None jika nama kosong
+    """
+    return _get_or_create_lookup(conn, "departments", name)
+
+def get_or_create_position(conn: Connection, name: Optional[str]) -> Optional[int]:
+    """
+    Mengambil ID posisi berdasarkan nama, menambahkannya jika belum ada.
+
+    Args:
+        conn: Koneksi database
+        name: Nama posisi
+
+    Returns:
+        ID posisi, None jika nama kosong
+    """
+    return _get_or_create_lookup(conn, "positions", name)
+
+def get_all_departments(conn: Connection) -> list[tuple]:
+    """
+    Mengambil semua departemen dari tabel referensi.
+
+    Args:
+        conn: Koneksi database
+
+    Returns:
+        List tuple berisi (id, nama) diurutkan berdasarkan nama
+    """
+    cur = conn.cursor()
+    cur.execute("SELECT id, name FROM departments ORDER BY name")
+    rows = cur.fetchall()
+    return rows
+
+def get_all_positions(conn: Connection) -> list[tuple]:
+    """
+    Mengambil semua posisi dari tabel referensi.
+
+    Args:
+        conn: Koneksi database
+
+    Returns:
+        List tuple berisi (id, nama) diurutkan berdasarkan nama
+    """
+    cur = conn.cursor()
+    cur.execute("SELECT id, name FROM positions ORDER BY name")
+    rows = cur.fetchall()
+    return rows
+
+# Kolom karyawan dengan nama posisi dan departemen dari tabel referensi
+_EMPLOYEE_COLUMNS = """
+    SELECT e.id, e.full_name, p.name, d.name
+    FROM employees e
+    LEFT JOIN positions p ON e.position_id = p.id
+    LEFT JOIN departments d ON e.department_id = d.id
+"""
+
+# Query karyawan aktif; kondisi active = 1 ditulis literal agar indeks parsial terpakai
+_ACTIVE_EMPLOYEE_COLUMNS = _EMPLOYEE_COLUMNS + " WHERE e.active = 1"
+
 def add_employee(conn: Connection, employee: tuple[str, str, str]) -> int:
     """
     Menambahkan karyawan baru ke dalam tabel employees.
@@ -77,28 +635,58 @@ def add_employee(conn: Connection, employee: tuple[str, str, str]) -> int:
     Returns:
         ID karyawan yang baru ditambahkan
     """
-    sql = ''' INSERT INTO employees(full_name,position,department)
+    full_name, position, department = employee
+    position_id = get_or_create_position(conn, position)
+    department_id = get_or_create_department(conn, department)
+    sql = ''' INSERT INTO employees(full_name,position_id,department_id)
               VALUES(?,?,?) '''
     cur = conn.cursor()
-    cur.execute(sql, employee)
+    cur.execute(sql, (full_name, position_id, department_id))
     conn.commit()
+    if _audit_log is not None:
+        _audit(EMPLOYEE, cur.lastrowid, cur.lastrowid, "create", None, _employee_image(conn, cur.lastrowid))
     return cur.lastrowid
 
-def get_all_employees(conn: Connection) -> list[tuple]:
+def get_all_employees(conn: Connection, include_inactive: bool = False) -> list[tuple]:
     """
-    Mengambil semua data karyawan dari tabel employees.
+    Mengambil semua data karyawan aktif dari tabel employees, diurutkan berdasarkan nama.
     
     Args:
         conn: Koneksi database
+        include_inactive: True untuk ikut mengambil karyawan yang sudah dinonaktifkan
     
     Returns:
-        List tuple berisi semua data karyawan
+        List tuple berisi (id, nama_lengkap, posisi, departemen) untuk semua karyawan aktif
     """
     cur = conn.cursor()
-    cur.execute("SELECT * FROM employees")
+    if include_inactive:
+        cur.execute(_EMPLOYEE_COLUMNS)
+    else:
+        # Urutan nama dibaca langsung dari indeks parsial idx_employees_active_name
+        cur.execute(_ACTIVE_EMPLOYEE_COLUMNS + " ORDER BY e.full_name")
     rows = cur.fetchall()
     return rows
 
+def get_employee(conn: Connection, id: int, include_inactive: bool = False) -> Optional[tuple]:
+    """
+    Mengambil data satu karyawan berdasarkan ID.
+
+    Args:
+        conn: Koneksi database
+        id: ID karyawan
+        include_inactive: True untuk ikut mengambil karyawan yang sudah dinonaktifkan
+
+    Returns:
+        Tuple berisi data karyawan jika ditemukan, None jika tidak ada
+    """
+    cur = conn.cursor()
+    if include_inactive:
+        cur.execute(_EMPLOYEE_COLUMNS + " WHERE e.id = ?", (id,))
+    else:
+        cur.execute(_ACTIVE_EMPLOYEE_COLUMNS + " AND e.id = ?", (id,))
+    row = cur.fetchone()
+    return row
+
 def update_employee(conn: Connection, employee: tuple[str, str, str, int]) -> None:
     """
     Memperbarui data karyawan berdasarkan ID.
@@ -107,27 +695,45 @@ def update_employee(conn: Connection, employee: tuple[str, str, str, int]) -> No
         conn: Koneksi database
         employee: Tuple berisi (nama_lengkap, posisi, departemen, id)
     """
+    full_name, position, department, id = employee
+    before = _employee_image(conn, id) if _audit_log is not None else None
+    position_id = get_or_create_position(conn, position)
+    department_id = get_or_create_department(conn, department)
     sql = ''' UPDATE employees
               SET full_name = ? ,
-                  position = ? ,
-                  department = ?
+                  position_id = ? ,
+                  department_id = ?
               WHERE id = ?'''
     cur = conn.cursor()
-    cur.execute(sql, employee)
+    cur.execute(sql, (full_name, position_id, department_id, id))
     conn.commit()
+    _invalidate_all(conn)
+    if _audit_log is not None:
+        _audit_employee_change(id, "update", before, _employee_image(conn, id))
 
-def delete_employee(conn: Connection, id: int) -> None:
+def delete_employee(conn: Connection, id: int, terminated_at: Optional[str] = None) -> None:
     """
-    Menghapus karyawan berdasarkan ID.
+    Menonaktifkan karyawan berdasarkan ID (soft delete).
+    Data karyawan dan catatan kehadirannya tetap disimpan untuk riwayat.
     
     Args:
         conn: Koneksi database
         id: ID karyawan yang akan dihapus
+        terminated_at: Waktu berhenti dalam format ISO, default waktu saat ini
     """
-    sql = 'DELETE FROM employees WHERE id=?'
+    if terminated_at is None:
+        terminated_at = datetime.now().isoformat(timespec="seconds")
+    sql = ''' UPDATE employees
+              SET active = 0 ,
+                  terminated_at = ?
+              WHERE id = ? AND active = 1'''
     cur = conn.cursor()
-    cur.execute(sql, (id,))
+    cur.execute(sql, (terminated_at, id))
     conn.commit()
+    _invalidate_all(conn)
+    if _audit_log is not None and cur.rowcount:
+        _audit(EMPLOYEE, id, id, "deactivate", {"active": 1, "terminated_at": None},
+               {"active": 0, "terminated_at": terminated_at})
 
 def add_attendance_record(conn: Connection, record: tuple) -> int:
     """
@@ -145,11 +751,16 @@ def add_attendance_record(conn: Connection, record: tuple) -> int:
     cur = conn.cursor()
     cur.execute(sql, record)
     conn.commit()
+    _invalidate_dates(conn, {record[3]}, record[2])
+    if _audit_log is not None:
+        _audit(ATTENDANCE, cur.lastrowid, record[0], "check-in", None,
+               {"check_in_time": record[1], "check_out_time": None, "status": record[2], "date": record[3]})
     return cur.lastrowid
 
 def get_todays_records(conn: Connection, date: str) -> list[tuple]:
     """
-    Mengambil semua catatan kehadiran untuk tanggal tertentu.
+    Mengambil semua catatan kehadiran karyawan aktif untuk tanggal tertentu.
+    Hasil disimpan di cache query dan di-invalidate saat tanggal tersebut ditulis.
     
     Args:
         conn: Koneksi database
@@ -158,17 +769,27 @@ def get_todays_records(conn: Connection, date: str) -> list[tuple]:
     Returns:
         List tuple berisi catatan kehadiran untuk tanggal tersebut
     """
+    scope = _cache_scope(conn)
+    key = (scope, "get_todays_records", date)
+    if scope is not None:
+        cached = _cached_rows(conn, scope, key)
+        if cached is not None:
+            return list(cached)
+
     cur = conn.cursor()
     cur.execute("""
         SELECT e.full_name, ar.check_in_time, ar.check_out_time, ar.status
         FROM attendance_records ar
         JOIN employees e ON ar.employee_id = e.id
-        WHERE ar.date = ?
+        WHERE ar.date = ? AND e.active = 1
     """, (date,))
     rows = cur.fetchall()
-    return rows
+    if scope is not None:
+        default_cache.put(key, rows, dates=[date])
+    return list(rows)
 
-def get_last_check_in_for_employee(conn: Connection, employee_id: int, date: str) -> Optional[tuple]:
+def get_last_check_in_for_employee(conn: Connection, employee_id: int, date: str,
+                                   until: Optional[str] = None) -> Optional[tuple]:
     """
     Mencari catatan check-in terakhir untuk karyawan pada tanggal tertentu yang belum di-check-out.
     
@@ -176,11 +797,21 @@ def get_last_check_in_for_employee(conn: Connection, employee_id: int, date: str
         conn: Koneksi database
         employee_id: ID karyawan
         date: Tanggal dalam format 'YYYY-MM-DD'
+        until: Waktu check-out dalam format ISO; jika diisi, hanya check-in pada atau sebelum
+            waktu ini yang dipertimbangkan agar durasi sesi tidak negatif
     
     Returns:
         Tuple berisi ID catatan jika ditemukan, None jika tidak ada
     """
     cur = conn.cursor()
+    if until is not None:
+        cur.execute("""
+            SELECT id FROM attendance_records
+            WHERE employee_id = ? AND date = ? AND check_out_time IS NULL AND check_in_time <= ?
+            ORDER BY check_in_time DESC
+            LIMIT 1
+        """, (employee_id, date, until))
+        return cur.fetchone()
     cur.execute("""
         SELECT id FROM attendance_records
         WHERE employee_id = ? AND date = ? AND check_out_time IS NULL
@@ -203,8 +834,88 @@ def check_out(conn: Connection, record_id: int, check_out_time: str) -> None:
               SET check_out_time = ?
               WHERE id = ?'''
     cur = conn.cursor()
+    # Dibaca sebelum update agar nilai lama tersedia untuk log audit
+    row = cur.execute("SELECT date, status, employee_id, check_out_time FROM attendance_records WHERE id = ?",
+                      (record_id,)).fetchone()
     cur.execute(sql, (check_out_time, record_id))
     conn.commit()
+    if row:
+        _invalidate_dates(conn, {row[0]}, row[1])
+        if _audit_log is not None:
+            _audit(ATTENDANCE, record_id, row[2], "check-out",
+                   {"check_out_time": row[3]}, {"check_out_time": check_out_time})
+
+def apply_journal_swipes(conn: Connection, swipes: list[dict],
+                         rejected_swipes: Optional[list[dict]] = None) -> tuple[int, int, int]:
+    """
+    Menerapkan sekumpulan swipe dari jurnal kiosk dalam satu transaksi.
+    Swipe yang kunci idempotensinya sudah tercatat dilewati sebagai duplikat, dan swipe
+    untuk karyawan yang tidak ada ditolak agar tidak menggagalkan seluruh batch.
+    
+    Args:
+        conn: Koneksi database
+        swipes: List dict berisi key, employee_id, action ('in'/'out'), time, date
+        rejected_swipes: Jika diberikan, swipe yang ditolak ditambahkan ke list ini
+            (mis. untuk dikarantina oleh jurnal kiosk)
+    
+    Returns:
+        Tuple berisi (jumlah diterapkan, jumlah duplikat, jumlah ditolak)
+    """
+    applied = duplicates = rejected = 0
+    touched_dates: set[str] = set()
+    audit_events: list[tuple] = []
+    cur = conn.cursor()
+    employee_ids = list({swipe["employee_id"] for swipe in swipes})
+    known_ids: set[int] = set()
+    # Dicek per potongan agar jumlah parameter tidak melebihi batas SQLite
+    for i in range(0, len(employee_ids), 500):
+        chunk = employee_ids[i:i + 500]
+        cur.execute(f"SELECT id FROM employees WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+        known_ids.update(row[0] for row in cur.fetchall())
+    try:
+        for swipe in swipes:
+            if swipe["employee_id"] not in known_ids:
+                rejected += 1
+                if rejected_swipes is not None:
+                    rejected_swipes.append(swipe)
+                continue
+            cur.execute("INSERT OR IGNORE INTO journal_applied(key, applied_at) VALUES(?, ?)",
+                        (swipe["key"], swipe["time"]))
+            if cur.rowcount == 0:
+                duplicates += 1
+                continue
+            touched_dates.add(swipe["date"])
+
+            if swipe["action"] == "in":
+                cur.execute(''' INSERT INTO attendance_records(employee_id,check_in_time,status,date)
+                                 VALUES(?,?,?,?) ''', (swipe["employee_id"], swipe["time"], "Hadir", swipe["date"]))
+                applied += 1
+                if _audit_log is not None:
+                    audit_events.append((cur.lastrowid, swipe["employee_id"], "check-in", None,
+                                         {"check_in_time": swipe["time"], "check_out_time": None,
+                                          "status": "Hadir", "date": swipe["date"]}))
+                continue
+
+            row = get_last_check_in_for_employee(conn, swipe["employee_id"], swipe["date"], swipe["time"])
+            if row is None:
+                # Tidak ada check-in terbuka sebelum check-out ini untuk dipasangkan
+                rejected += 1
+                if rejected_swipes is not None:
+                    rejected_swipes.append(swipe)
+                continue
+            cur.execute("UPDATE attendance_records SET check_out_time = ? WHERE id = ?", (swipe["time"], row[0]))
+            applied += 1
+            if _audit_log is not None:
+                audit_events.append((row[0], swipe["employee_id"], "check-out",
+                                     {"check_out_time": None}, {"check_out_time": swipe["time"]}))
+        conn.commit()
+    except Error:
+        conn.rollback()
+        raise
+    _invalidate_dates(conn, touched_dates, "Hadir")
+    for record_id, employee_id, action, before, after in audit_events:
+        _audit(ATTENDANCE, record_id, employee_id, action, before, after)
+    return applied, duplicates, rejected
 
 def add_absence_record(conn: Connection, record: tuple) -> int:
     """
@@ -222,11 +933,16 @@ def add_absence_record(conn: Connection, record: tuple) -> int:
     cur = conn.cursor()
     cur.execute(sql, record)
     conn.commit()
+    _invalidate_dates(conn, {record[4]}, record[3])
+    if _audit_log is not None:
+        _audit(ATTENDANCE, cur.lastrowid, record[0], "absence", None,
+               dict(zip(("check_in_time", "check_out_time", "status", "date", "reason"), record[1:])))
     return cur.lastrowid
 
 def get_all_absences(conn: Connection) -> list[tuple]:
     """
-    Mengambil semua catatan ketidakhadiran (status: Sakit, Izin, Cuti).
+    Mengambil semua catatan ketidakhadiran (status: Sakit, Izin, Cuti) milik karyawan aktif.
+    Hasil disimpan di cache query dan hanya di-invalidate oleh penulisan catatan ketidakhadiran.
     
     Args:
         conn: Koneksi database
@@ -234,33 +950,565 @@ def get_all_absences(conn: Connection) -> list[tuple]:
     Returns:
         List tuple berisi semua catatan ketidakhadiran diurutkan berdasarkan tanggal terbaru
     """
+    scope = _cache_scope(conn)
+    key = (scope, "get_all_absences")
+    if scope is not None:
+        cached = _cached_rows(conn, scope, key)
+        if cached is not None:
+            return list(cached)
+
     cur = conn.cursor()
     cur.execute("""
         SELECT e.full_name, ar.date, ar.status, ar.reason
         FROM attendance_records ar
         JOIN employees e ON ar.employee_id = e.id
-        WHERE ar.status IN ('Sakit', 'Izin', 'Cuti')
+        WHERE ar.status IN ('Sakit', 'Izin', 'Cuti') AND e.active = 1
         ORDER BY ar.date DESC
     """)
     rows = cur.fetchall()
-    return rows
+    if scope is not None:
+        default_cache.put(key, rows, dates=None, absence_only=True)
+    return list(rows)
 
-def search_employees(conn: Connection, term: str) -> list[tuple]:
+def search_employees(conn: Connection, term: str, department_id: Optional[int] = None) -> list[tuple]:
     """
-    Mencari karyawan berdasarkan nama atau ID.
+    Mencari karyawan aktif berdasarkan nama atau ID.
     
     Args:
         conn: Koneksi database
         term: Kata kunci pencarian (nama atau ID)
+        department_id: ID departemen untuk menyaring hasil, None untuk semua departemen
     
     Returns:
         List tuple berisi data karyawan yang sesuai dengan pencarian
     """
+    sql = _ACTIVE_EMPLOYEE_COLUMNS + " AND (e.full_name LIKE ? OR e.id = ?)"
+    params: list = ['%' + term + '%', term]
+    if department_id is not None:
+        sql += " AND e.department_id = ?"
+        params.append(department_id)
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    rows = cur.fetchall()
+    return rows
+
+def get_employees_by_department(conn: Connection, department_id: int) -> list[tuple]:
+    """
+    Mengambil semua karyawan aktif pada departemen tertentu.
+
+    Args:
+        conn: Koneksi database
+        department_id: ID departemen
+
+    Returns:
+        List tuple berisi (id, nama_lengkap, posisi, departemen)
+    """
+    cur = conn.cursor()
+    cur.execute(_ACTIVE_EMPLOYEE_COLUMNS + " AND e.department_id = ?", (department_id,))
+    rows = cur.fetchall()
+    return rows
+
+def get_department_headcounts(conn: Connection) -> list[tuple]:
+    """
+    Menghitung jumlah karyawan aktif per departemen.
+
+    Args:
+        conn: Koneksi database
+
+    Returns:
+        List tuple berisi (id_departemen, nama_departemen, jumlah_karyawan)
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT d.id, d.name, COUNT(e.id)
+        FROM departments d
+        LEFT JOIN employees e ON e.department_id = d.id AND e.active = 1
+        GROUP BY d.id
+        ORDER BY d.name
+    """)
+    rows = cur.fetchall()
+    return rows
+
+def get_department_attendance(conn: Connection, department_id: int, start_date: str, end_date: str) -> list[tuple]:
+    """
+    Merekap catatan kehadiran karyawan aktif per tanggal dan status untuk satu departemen.
+
+    Args:
+        conn: Koneksi database
+        department_id: ID departemen
+        start_date: Tanggal awal dalam format 'YYYY-MM-DD'
+        end_date: Tanggal akhir dalam format 'YYYY-MM-DD' (inklusif)
+
+    Returns:
+        List tuple berisi (tanggal, status, jumlah) diurutkan berdasarkan tanggal
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT ar.date, ar.status, COUNT(*)
+        FROM employees e
+        JOIN attendance_records ar ON ar.employee_id = e.id
+        WHERE e.department_id = ? AND e.active = 1 AND ar.date BETWEEN ? AND ?
+        GROUP BY ar.date, ar.status
+        ORDER BY ar.date
+    """, (department_id, start_date, end_date))
+    rows = cur.fetchall()
+    return rows
+
+def get_hours_aggregate(conn: Connection, start_date: str, end_date: str,
+                        department_id: Optional[int] = None, unassigned: bool = False) -> list[tuple]:
+    """
+    Menghitung agregat jam kerja per karyawan untuk rentang tanggal (inklusif).
+    Hasilnya berupa agregat parsial yang bisa dijumlahkan dengan hasil rentang lain.
+
+    Args:
+        conn: Koneksi database
+        start_date: Tanggal awal dalam format 'YYYY-MM-DD'
+        end_date: Tanggal akhir dalam format 'YYYY-MM-DD'
+        department_id: ID departemen untuk membatasi karyawan, None untuk semua departemen
+        unassigned: True untuk hanya menghitung karyawan tanpa departemen
+
+    Returns:
+        List tuple berisi (employee_id, total_jam, jumlah_hadir, jumlah_tidak_hadir)
+    """
+    sql = """
+        SELECT ar.employee_id,
+               COALESCE(SUM((julianday(ar.check_out_time) - julianday(ar.check_in_time)) * 24.0), 0),
+               SUM(ar.status = 'Hadir'),
+               SUM(ar.status IN ('Sakit', 'Izin', 'Cuti'))
+        FROM attendance_records ar
+        WHERE ar.date BETWEEN ? AND ?
+    """
+    params: list = [start_date, end_date]
+    if unassigned:
+        sql += " AND ar.employee_id IN (SELECT id FROM employees WHERE department_id IS NULL)"
+    elif department_id is not None:
+        sql += " AND ar.employee_id IN (SELECT id FROM employees WHERE department_id = ?)"
+        params.append(department_id)
+    sql += " GROUP BY ar.employee_id"
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    rows = cur.fetchall()
+    return rows
+
+def add_shift(conn: Connection, shift: tuple[str, str, str, int]) -> int:
+    """
+    Menambahkan template shift baru.
+
+    Args:
+        conn: Koneksi database
+        shift: Tuple berisi (nama, jam_mulai 'HH:MM', jam_selesai 'HH:MM', toleransi_menit)
+
+    Returns:
+        ID shift yang baru ditambahkan
+    """
+    sql = ''' INSERT INTO shifts(name,start_time,end_time,grace_minutes)
+              VALUES(?,?,?,?) '''
+    cur = conn.cursor()
+    cur.execute(sql, shift)
+    conn.commit()
+    return cur.lastrowid
+
+def get_all_shifts(conn: Connection) -> list[tuple]:
+    """
+    Mengambil semua template shift.
+
+    Args:
+        conn: Koneksi database
+
+    Returns:
+        List tuple berisi (id, nama, jam_mulai, jam_selesai, toleransi_menit)
+    """
+    cur = conn.cursor()
+    cur.execute("SELECT id, name, start_time, end_time, grace_minutes FROM shifts ORDER BY start_time")
+    rows = cur.fetchall()
+    return rows
+
+def add_rotation(conn: Connection, name: str, shift_ids: list[Optional[int]]) -> int:
+    """
+    Menambahkan rotasi shift. Urutan shift diulang setiap len(shift_ids) hari.
+
+    Args:
+        conn: Koneksi database
+        name: Nama rotasi
+        shift_ids: ID shift untuk setiap hari dalam siklus, None untuk hari libur
+
+    Returns:
+        ID rotasi yang baru ditambahkan
+    """
+    cur = conn.cursor()
+    cur.execute("INSERT INTO rotations(name, cycle_days) VALUES(?,?)", (name, len(shift_ids)))
+    rotation_id = cur.lastrowid
+    cur.executemany("INSERT INTO rotation_steps(rotation_id, day_index, shift_id) VALUES(?,?,?)",
+                    [(rotation_id, day_index, shift_id) for day_index, shift_id in enumerate(shift_ids)])
+    conn.commit()
+    _audit(ROTATION, rotation_id, None, "create", None, {"name": name, "shift_ids": list(shift_ids)})
+    return rotation_id
+
+def assign_shift(conn: Connection, employee_id: int, start_date: str, shift_id: Optional[int] = None,
+                 rotation_id: Optional[int] = None, end_date: Optional[str] = None) -> int:
+    """
+    Menugaskan shift tetap atau rotasi kepada karyawan mulai tanggal tertentu.
+    Jika beberapa penugasan berlaku pada hari yang sama, penugasan dengan tanggal mulai terbaru yang dipakai.
+
+    Args:
+        conn: Koneksi database
+        employee_id: ID karyawan
+        start_date: Tanggal mulai dalam format 'YYYY-MM-DD' (juga hari pertama siklus rotasi)
+        shift_id: ID shift tetap
+        rotation_id: ID rotasi, diisi jika shift_id tidak diisi
+        end_date: Tanggal akhir (inklusif), None jika berlaku seterusnya
+
+    Returns:
+        ID penugasan yang baru ditambahkan
+    """
+    sql = ''' INSERT INTO shift_assignments(employee_id,shift_id,rotation_id,start_date,end_date)
+              VALUES(?,?,?,?,?) '''
+    cur = conn.cursor()
+    cur.execute(sql, (employee_id, shift_id, rotation_id, start_date, end_date))
+    conn.commit()
+    _audit(SHIFT_ASSIGNMENT, cur.lastrowid, employee_id, "assign", None,
+           {"shift_id": shift_id, "rotation_id": rotation_id, "start_date": start_date, "end_date": end_date})
+    return cur.lastrowid
+
+def get_day_schedule(conn: Connection, date: str) -> list[tuple]:
+    """
+    Mengambil jadwal shift semua karyawan aktif untuk satu tanggal dalam satu query.
+    Hanya penugasan terbaru yang berlaku pada tanggal itu yang dipakai untuk setiap karyawan.
+    Hari ke-n rotasi dihitung dari selisih tanggal terhadap tanggal mulai penugasan;
+    karyawan yang sedang libur rotasi tidak dijadwalkan.
+
+    Args:
+        conn: Koneksi database
+        date: Tanggal dalam format 'YYYY-MM-DD'
+
+    Returns:
+        List tuple berisi (employee_id, shift_id, jam_mulai, jam_selesai, toleransi_menit),
+        satu baris per karyawan yang dijadwalkan
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT a.employee_id, s.id, s.start_time, s.end_time, s.grace_minutes
+        FROM (
+            SELECT a.employee_id, a.shift_id, a.rotation_id, a.start_date,
+                   ROW_NUMBER() OVER (PARTITION BY a.employee_id ORDER BY a.start_date DESC, a.id DESC) AS rn
+            FROM shift_assignments a
+            JOIN employees e ON e.id = a.employee_id AND e.active = 1
+            WHERE a.start_date <= :date AND (a.end_date IS NULL OR a.end_date >= :date)
+        ) a
+        LEFT JOIN rotations r ON r.id = a.rotation_id
+        LEFT JOIN rotation_steps rs ON rs.rotation_id = a.rotation_id
+            AND rs.day_index = CAST(julianday(:date) - julianday(a.start_date) AS INTEGER) % r.cycle_days
+        LEFT JOIN shifts s ON s.id = COALESCE(a.shift_id, rs.shift_id)
+        -- Shift NULL berarti hari libur rotasi: penugasan lama tidak boleh menggantikannya
+        WHERE a.rn = 1 AND s.id IS NOT NULL
+        ORDER BY a.employee_id
+    """, {"date": date})
+    rows = cur.fetchall()
+    return rows
+
+def get_presence_records(conn: Connection, date: str) -> list[tuple]:
+    """
+    Mengambil catatan kehadiran berstatus 'Hadir' pada tanggal tertentu untuk diklasifikasikan.
+
+    Args:
+        conn: Koneksi database
+        date: Tanggal dalam format 'YYYY-MM-DD'
+
+    Returns:
+        List tuple berisi (id, employee_id, check_in_time, check_out_time)
+    """
     cur = conn.cursor()
-    cur.execute("SELECT * FROM employees WHERE full_name LIKE ? OR id = ?", ('%' + term + '%', term))
+    cur.execute("""
+        SELECT id, employee_id, check_in_time, check_out_time
+        FROM attendance_records
+        WHERE date = ? AND status = 'Hadir' AND check_in_time IS NOT NULL
+    """, (date,))
     rows = cur.fetchall()
     return rows
 
+def save_attendance_classifications(conn: Connection, date: str, classifications: list[tuple]) -> None:
+    """
+    Menyimpan hasil klasifikasi kehadiran satu tanggal dalam satu transaksi, menggantikan
+    seluruh hasil sebelumnya untuk tanggal itu. Klasifikasi lama milik catatan yang tidak
+    lagi diklasifikasikan (mis. berubah menjadi ketidakhadiran) ikut terhapus.
+
+    Args:
+        conn: Koneksi database
+        date: Tanggal catatan kehadiran dalam format 'YYYY-MM-DD'
+        classifications: List tuple berisi (record_id, shift_id, klasifikasi, menit_terlambat,
+            menit_pulang_cepat, menit_lembur)
+    """
+    sql = ''' INSERT OR REPLACE INTO attendance_classifications(record_id,shift_id,classification,
+                  late_minutes,early_leave_minutes,overtime_minutes)
+              VALUES(?,?,?,?,?,?) '''
+    cur = conn.cursor()
+    previous: set[int] = set()
+    if _audit_log is not None:
+        cur.execute("""
+            SELECT ac.record_id FROM attendance_classifications ac
+            JOIN attendance_records ar ON ar.id = ac.record_id
+            WHERE ar.date = ?
+        """, (date,))
+        previous = {row[0] for row in cur.fetchall()}
+    cur.execute("""
+        DELETE FROM attendance_classifications
+        WHERE record_id IN (SELECT id FROM attendance_records WHERE date = ?)
+    """, (date,))
+    cur.executemany(sql, classifications)
+    conn.commit()
+    if _audit_log is not None:
+        owners = _record_owners(cur, list(previous | {row[0] for row in classifications}))
+        for event in classification_events(classifications, previous, owners):
+            _audit(*event)
+
+def set_employee_badge(conn: Connection, employee_id: int, badge_id: Optional[str]) -> None:
+    """
+    Mengatur ID badge karyawan. Satu badge hanya boleh dimiliki satu karyawan.
+
+    Args:
+        conn: Koneksi database
+        employee_id: ID karyawan
+        badge_id: ID badge pada terminal, None untuk menghapus badge
+    """
+    before = _employee_image(conn, employee_id) if _audit_log is not None else None
+    cur = conn.cursor()
+    cur.execute("UPDATE employees SET badge_id = ? WHERE id = ?", (badge_id, employee_id))
+    conn.commit()
+    if _audit_log is not None:
+        _audit_employee_change(employee_id, "badge", before, {"badge_id": badge_id})
+
+def get_badge_map(conn: Connection) -> dict[str, int]:
+    """
+    Mengambil peta ID badge ke ID karyawan untuk semua karyawan aktif yang memiliki badge.
+
+    Args:
+        conn: Koneksi database
+
+    Returns:
+        Dict berisi badge_id -> employee_id
+    """
+    cur = conn.cursor()
+    cur.execute("SELECT badge_id, id FROM employees WHERE active = 1 AND badge_id IS NOT NULL")
+    return dict(cur.fetchall())
+
+def get_latest_sessions(conn: Connection, since_date: str) -> list[tuple]:
+    """
+    Mengambil catatan kehadiran terakhir setiap karyawan sejak tanggal tertentu.
+    Dipakai sebagai titik awal saat memasangkan punch badge dengan catatan yang sudah ada.
+
+    Args:
+        conn: Koneksi database
+        since_date: Tanggal awal dalam format 'YYYY-MM-DD'
+
+    Returns:
+        List tuple berisi (record_id, employee_id, check_in_time, check_out_time)
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT id, employee_id, check_in_time, check_out_time
+        FROM (
+            SELECT id, employee_id, check_in_time, check_out_time,
+                   ROW_NUMBER() OVER (PARTITION BY employee_id ORDER BY check_in_time DESC) AS rn
+            FROM attendance_records
+            WHERE date >= ? AND status = 'Hadir' AND check_in_time IS NOT NULL
+        )
+        WHERE rn = 1
+    """, (since_date,))
+    rows = cur.fetchall()
+    return rows
+
+def save_badge_sessions(conn: Connection, sessions: list[tuple], closings: list[tuple]) -> tuple[int, int, int]:
+    """
+    Menyimpan sesi hasil impor log badge dalam satu transaksi.
+    Setiap sesi memiliki kunci idempotensi sehingga log yang sama aman diimpor ulang.
+
+    Args:
+        conn: Koneksi database
+        sessions: List tuple berisi (kunci, employee_id, check_in_time, check_out_time atau None, tanggal)
+        closings: List tuple berisi (check_out_time, record_id, tanggal) untuk menutup catatan yang sudah ada
+
+    Returns:
+        Tuple berisi (jumlah sesi baru, jumlah sesi duplikat, jumlah catatan yang benar-benar
+        ditutup). Catatan yang sudah ditutup oleh proses lain tidak ikut dihitung.
+    """
+    cur = conn.cursor()
+    closed = 0
+    try:
+        # Kunci yang sudah pernah diterapkan dicari per potongan, lalu sisanya disisipkan sekaligus
+        existing: set[str] = set()
+        keys = [session[0] for session in sessions]
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            cur.execute(f"SELECT key FROM journal_applied WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+            existing.update(row[0] for row in cur.fetchall())
+        new_sessions = [session for session in sessions if session[0] not in existing]
+
+        cur.executemany("INSERT OR IGNORE INTO journal_applied(key, applied_at) VALUES(?, ?)",
+                        [(session[0], session[2]) for session in new_sessions])
+        insert_sql = ''' INSERT INTO attendance_records(employee_id,check_in_time,check_out_time,status,date)
+                         VALUES(?,?,?,'Hadir',?) '''
+        close_sql = "UPDATE attendance_records SET check_out_time = ? WHERE id = ? AND check_out_time IS NULL"
+        if _audit_log is None:
+            cur.executemany(insert_sql, [session[1:] for session in new_sessions])
+            cur.executemany(close_sql, [closing[:2] for closing in closings])
+            # rowcount executemany adalah jumlah baris yang berubah dari semua parameter
+            closed = max(cur.rowcount, 0)
+        else:
+            # Dengan audit aktif setiap baris ditulis terpisah agar ID catatan baru dan
+            # catatan yang benar-benar ditutup diketahui
+            audit_events: list[tuple] = []
+            for _, employee_id, check_in_time, check_out_time, date in new_sessions:
+                cur.execute(insert_sql, (employee_id, check_in_time, check_out_time, date))
+                audit_events.append((cur.lastrowid, employee_id, "check-in", None,
+                                     {"check_in_time": check_in_time, "check_out_time": check_out_time,
+                                      "status": "Hadir", "date": date}))
+            owners = _record_owners(cur, [closing[1] for closing in closings])
+            for check_out_time, record_id, _ in closings:
+                cur.execute(close_sql, (check_out_time, record_id))
+                if cur.rowcount:
+                    closed += 1
+                    audit_events.append((record_id, owners.get(record_id), "check-out",
+                                         {"check_out_time": None}, {"check_out_time": check_out_time}))
+        conn.commit()
+    except Error:
+        conn.rollback()
+        raise
+    if _audit_log is not None:
+        for record_id, employee_id, action, before, after in audit_events:
+            _audit(ATTENDANCE, record_id, employee_id, action, before, after)
+    _invalidate_dates(conn, {session[4] for session in new_sessions} | {closing[2] for closing in closings}, "Hadir")
+    return len(new_sessions), len(sessions) - len(new_sessions), closed
+
+def get_attendance_classifications(conn: Connection, date: str) -> list[tuple]:
+    """
+    Mengambil hasil klasifikasi kehadiran karyawan aktif untuk tanggal tertentu.
+
+    Args:
+        conn: Koneksi database
+        date: Tanggal dalam format 'YYYY-MM-DD'
+
+    Returns:
+        List tuple berisi (nama_lengkap, klasifikasi, menit_terlambat, menit_pulang_cepat, menit_lembur)
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT e.full_name, ac.classification, ac.late_minutes, ac.early_leave_minutes, ac.overtime_minutes
+        FROM attendance_records ar
+        JOIN attendance_classifications ac ON ac.record_id = ar.id
+        JOIN employees e ON ar.employee_id = e.id
+        WHERE ar.date = ? AND e.active = 1
+    """, (date,))
+    rows = cur.fetchall()
+    return rows
+
+def get_daily_status_codes(conn: Connection, employee_ids: list[int], start_date: str, end_date: str) -> list[tuple]:
+    """
+    Mengambil status harian sekelompok karyawan dalam rentang tanggal sebagai kode ringkas,
+    dengan satu query agregat. Jika satu hari memiliki beberapa catatan, status
+    ketidakhadiran didahulukan dari 'Hadir'.
+
+    Args:
+        conn: Koneksi database
+        employee_ids: ID karyawan yang ditampilkan
+        start_date: Tanggal awal dalam format 'YYYY-MM-DD'
+        end_date: Tanggal akhir dalam format 'YYYY-MM-DD' (inklusif)
+
+    Returns:
+        List tuple berisi (employee_id, tanggal, kode_status) dengan kode 1 = Hadir,
+        2 = Izin, 3 = Sakit, 4 = Cuti
+    """
+    if not employee_ids:
+        return []
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT employee_id, date,
+               MAX(CASE status WHEN 'Hadir' THEN 1 WHEN 'Izin' THEN 2 WHEN 'Sakit' THEN 3 WHEN 'Cuti' THEN 4 ELSE 0 END)
+        FROM attendance_records
+        WHERE employee_id IN ({','.join('?' * len(employee_ids))}) AND date BETWEEN ? AND ?
+        GROUP BY employee_id, date
+    """, (*employee_ids, start_date, end_date))
+    rows = cur.fetchall()
+    return rows
+
+def get_attendance_anomaly_candidates(conn: Connection, start_date: str, end_date: str, stale_before: str) -> list[tuple]:
+    """
+    Memindai catatan kehadiran dalam rentang tanggal dengan satu query berjendela dan hanya
+    mengembalikan catatan yang berpotensi bermasalah: sesi terbuka yang sudah basi atau
+    diikuti sesi lain, sesi tumpang tindih, durasi negatif, serta ketidakhadiran dan
+    kehadiran pada karyawan dan tanggal yang sama. Tumpang tindih dibandingkan dengan
+    check-out terbesar dari semua sesi sebelumnya (bukan hanya sesi tepat sebelumnya),
+    sehingga sesi yang berada di dalam sesi panjang tetap terdeteksi.
+    Catatan pertama dalam rentang tidak dibandingkan dengan catatan sebelum start_date.
+
+    Args:
+        conn: Koneksi database
+        start_date: Tanggal awal dalam format 'YYYY-MM-DD'
+        end_date: Tanggal akhir dalam format 'YYYY-MM-DD' (inklusif)
+        stale_before: Waktu ISO; sesi terbuka dengan check-in sebelum waktu ini dianggap basi
+
+    Returns:
+        List tuple berisi (id, employee_id, tanggal, status, check_in_time, check_out_time,
+        check_out_terbesar_sebelumnya, check_in_berikutnya, jumlah_hadir_di_tanggal, jumlah_absen_di_tanggal)
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT id, employee_id, date, status, check_in_time, check_out_time,
+               prev_check_out, next_check_in, presence_count, absence_count
+        FROM (
+            SELECT id, employee_id, date, status, check_in_time, check_out_time,
+                   MAX(check_out_time) OVER earlier_sessions AS prev_check_out,
+                   LEAD(check_in_time) OVER sessions AS next_check_in,
+                   SUM(status = 'Hadir') OVER days AS presence_count,
+                   SUM(status <> 'Hadir') OVER days AS absence_count
+            FROM attendance_records
+            WHERE date BETWEEN ? AND ?
+            WINDOW sessions AS (PARTITION BY employee_id, check_in_time IS NULL ORDER BY check_in_time, id),
+                   earlier_sessions AS (sessions ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING),
+                   days AS (PARTITION BY employee_id, date)
+        )
+        WHERE (check_in_time IS NOT NULL AND check_out_time IS NULL
+               AND (check_in_time < ? OR next_check_in IS NOT NULL))
+           OR check_out_time < check_in_time
+           OR prev_check_out > check_in_time
+           OR (presence_count > 0 AND absence_count > 0)
+        ORDER BY employee_id, date, id
+    """, (start_date, end_date, stale_before))
+    rows = cur.fetchall()
+    return rows
+
+def close_open_sessions(conn: Connection, closings: list[tuple]) -> int:
+    """
+    Menutup sesi kehadiran yang masih terbuka dalam satu transaksi. Catatan yang sudah
+    di-check-out di antara pemindaian dan penutupan tidak diubah.
+
+    Args:
+        conn: Koneksi database
+        closings: List tuple berisi (check_out_time, alasan, record_id, tanggal)
+
+    Returns:
+        Jumlah catatan yang ditutup
+    """
+    cur = conn.cursor()
+    closed = 0
+    audit_events: list[tuple] = []
+    owners = _record_owners(cur, [closing[2] for closing in closings]) if _audit_log is not None else {}
+    try:
+        for check_out_time, reason, record_id, _ in closings:
+            cur.execute(""" UPDATE attendance_records SET check_out_time = ?, reason = ?
+                            WHERE id = ? AND check_out_time IS NULL """, (check_out_time, reason, record_id))
+            closed += cur.rowcount
+            if cur.rowcount and _audit_log is not None:
+                audit_events.append((record_id, owners.get(record_id), {"check_out_time": None},
+                                     {"check_out_time": check_out_time, "reason": reason}))
+        conn.commit()
+    except Error:
+        conn.rollback()
+        raise
+    _invalidate_dates(conn, {closing[3] for closing in closings}, "Hadir")
+    for record_id, employee_id, before, after in audit_events:
+        _audit(ATTENDANCE, record_id, employee_id, "auto-close", before, after)
+    return closed
+
 # Blok untuk menjalankan setup database jika file ini dijalankan langsung
 if __name__ == '__main__':
     setup_database()
@@ -0,0 +1,156 @@
+import bisect
+from typing import Optional
+
+# indeks prefiks untuk pencarian karyawan (tanpa ketergantungan Qt)
+class EmployeePrefixIndex:
+    """
+    Indeks prefiks terurut untuk mencari karyawan berdasarkan nama, ID, atau departemen.
+    Setiap karyawan dipecah menjadi beberapa kunci (kata pada nama, nama lengkap, ID,
+    departemen) yang disimpan dalam list terurut sehingga pencarian prefiks cukup
+    memakai bisect, dan penambahan/penghapusan dapat dilakukan secara inkremental.
+    """
+    def __init__(self) -> None:
+        # List terurut berisi pasangan (kunci, id_karyawan)
+        self._entries: list[tuple[str, int]] = []
+        # Kunci-kunci milik setiap karyawan yang diindeks: id -> kunci
+        self._tokens_by_id: dict[int, frozenset[str]] = {}
+        # Nama lengkap ternormalisasi setiap karyawan: id -> nama
+        self._name_by_id: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._tokens_by_id)
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """
+        Menyeragamkan huruf kecil dan spasi agar teks ketikan dapat dibandingkan dengan kunci.
+        """
+        return " ".join((text or "").lower().split())
+
+    @classmethod
+    def _tokens(cls, employee_id: int, full_name: str, department: str) -> frozenset[str]:
+        """
+        Menghasilkan kunci-kunci pencarian untuk satu karyawan.
+        """
+        name = cls._normalize(full_name)
+        dept = cls._normalize(department)
+        tokens = {str(employee_id)}
+        if name:
+            tokens.add(name)
+            tokens.update(name.split())
+        if dept:
+            tokens.add(dept)
+            tokens.update(dept.split())
+        return frozenset(tokens)
+
+    def build(self, employees: list[tuple[int, str, str]]) -> None:
+        """
+        Membangun ulang indeks dari awal.
+
+        Args:
+            employees: List tuple berisi (id, nama_lengkap, departemen)
+        """
+        entries: list[tuple[str, int]] = []
+        self._tokens_by_id = {}
+        self._name_by_id = {}
+        for employee_id, full_name, department in employees:
+            tokens = self._tokens(employee_id, full_name, department)
+            self._tokens_by_id[employee_id] = tokens
+            self._name_by_id[employee_id] = self._normalize(full_name)
+            entries.extend((token, employee_id) for token in tokens)
+        entries.sort()
+        self._entries = entries
+
+    def add(self, employee_id: int, full_name: str, department: str) -> None:
+        """
+        Menambahkan atau memperbarui satu karyawan di dalam indeks.
+        """
+        if employee_id in self._tokens_by_id:
+            self.remove(employee_id)
+        tokens = self._tokens(employee_id, full_name, department)
+        self._tokens_by_id[employee_id] = tokens
+        self._name_by_id[employee_id] = self._normalize(full_name)
+        for token in tokens:
+            bisect.insort(self._entries, (token, employee_id))
+
+    def remove(self, employee_id: int) -> None:
+        """
+        Menghapus satu karyawan dari indeks.
+        """
+        tokens = self._tokens_by_id.pop(employee_id, None)
+        if tokens is None:
+            return
+        del self._name_by_id[employee_id]
+        for token in tokens:
+            entry = (token, employee_id)
+            pos = bisect.bisect_left(self._entries, entry)
+            if pos < len(self._entries) and self._entries[pos] == entry:
+                del self._entries[pos]
+
+    def search(self, text: str, limit: Optional[int] = 50) -> list[int]:
+        """
+        Mencari karyawan yang cocok dengan teks pencarian.
+        Kata terpanjang (paling selektif) dicari lewat indeks prefiks, kata lainnya
+        harus menjadi prefiks dari salah satu kunci karyawan yang sama.
+
+        Args:
+            text: Teks pencarian (nama, ID, atau departemen)
+            limit: Jumlah maksimum hasil, None untuk semua hasil
+
+        Returns:
+            List ID karyawan yang cocok, diurutkan berdasarkan kunci yang cocok
+        """
+        words = text.lower().split()
+        if not words:
+            return []
+        words.sort(key=len, reverse=True)
+        first, rest = words[0], words[1:]
+
+        results: list[int] = []
+        seen: set[int] = set()
+        entries = self._entries
+        pos = bisect.bisect_left(entries, (first,))
+        while pos < len(entries) and entries[pos][0].startswith(first):
+            employee_id = entries[pos][1]
+            pos += 1
+            if employee_id in seen:
+                continue
+            seen.add(employee_id)
+            if rest:
+                tokens = self._tokens_by_id[employee_id]
+                if not all(any(token.startswith(word) for token in tokens) for word in rest):
+                    continue
+            results.append(employee_id)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def resolve(self, text: str) -> Optional[int]:
+        """
+        Mencari satu karyawan yang dimaksud oleh teks ketikan. Nama lengkap yang sama persis
+        (tanpa membedakan huruf besar/kecil) diutamakan, lalu ID yang sama persis, lalu
+        karyawan tunggal yang cocok dengan pencarian prefiks.
+
+        Args:
+            text: Teks yang diketik pengguna
+
+        Returns:
+            ID karyawan, None jika tidak ada atau lebih dari satu karyawan yang cocok
+        """
+        name = self._normalize(text)
+        if not name:
+            return None
+        entries = self._entries
+        exact: list[int] = []
+        pos = bisect.bisect_left(entries, (name,))
+        while pos < len(entries) and entries[pos][0] == name:
+            employee_id = entries[pos][1]
+            if self._name_by_id[employee_id] == name:
+                exact.append(employee_id)
+            pos += 1
+        if exact:
+            return exact[0] if len(exact) == 1 else None
+        if name.isdigit() and int(name) in self._tokens_by_id:
+            return int(name)
+        matches = self.search(name, 2)
+        return matches[0] if len(matches) == 1 else None
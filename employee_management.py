@@ -1,8 +1,8 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QGroupBox, QFormLayout, QLabel, QLineEdit, QPushButton, QTableView, QMessageBox
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QGroupBox, QFormLayout, QLabel, QLineEdit, QPushButton, QTableView, QMessageBox, QComboBox, QCompleter
 from PyQt6.QtGui import QStandardItemModel, QStandardItem
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, QStringListModel
 from typing import Optional
-import database
+import storage
 
 # widget untuk mengelola data karyawan
 class EmployeeManagementWidget(QWidget):
@@ -12,6 +12,9 @@ class EmployeeManagementWidget(QWidget):
     """
     # Signal yang dipancarkan ketika data karyawan berubah
     employees_changed = pyqtSignal()
+    # Signal dengan ID karyawan yang ditambahkan/diperbarui atau dihapus
+    employee_upserted = pyqtSignal(int)
+    employee_removed = pyqtSignal(int)
 
     def __init__(self, parent: Optional[QWidget] = None) -> None:
         super().__init__(parent)
@@ -31,6 +34,14 @@ class EmployeeManagementWidget(QWidget):
         self.position_entry = QLineEdit()
         self.department_entry = QLineEdit()
 
+        # Completer dari tabel referensi agar ejaan posisi/departemen konsisten
+        self.position_completer = QCompleter([], self)
+        self.position_completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.position_entry.setCompleter(self.position_completer)
+        self.department_completer = QCompleter([], self)
+        self.department_completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.department_entry.setCompleter(self.department_completer)
+
         # Menambahkan label dan input field ke form
         form_layout.addRow(QLabel("Nama Lengkap:"), self.name_entry)
         form_layout.addRow(QLabel("Posisi:"), self.position_entry)
@@ -73,7 +84,13 @@ class EmployeeManagementWidget(QWidget):
         self.clear_search_button = QPushButton("Bersihkan")
         self.clear_search_button.clicked.connect(self.clear_search)
         
+        # Dropdown untuk menyaring karyawan berdasarkan departemen
+        self.department_filter_combo = QComboBox()
+        self.department_filter_combo.addItem("Semua Departemen", userData=None)
+        self.department_filter_combo.currentIndexChanged.connect(self.search_employees)
+
         # Menambahkan widget pencarian ke layout
+        search_layout.addRow(QLabel("Departemen:"), self.department_filter_combo)
         search_layout.addRow(QLabel("Cari berdasarkan Nama atau ID:"), self.search_entry)
         search_layout.addRow(self.search_button, self.clear_search_button)
 
@@ -99,25 +116,53 @@ class EmployeeManagementWidget(QWidget):
 
     def load_employees(self) -> None:
         """
-        Memuat semua data karyawan dari database ke dalam tabel.
+        Memuat data karyawan dari database ke dalam tabel.
+        Jika filter departemen dipilih, hanya karyawan departemen tersebut yang dimuat.
         """
         # Menghapus data lama dari model tabel
         self.model.removeRows(0, self.model.rowCount()) 
         
         # Mengambil data karyawan dari database
-        conn = database.create_connection()
-        if conn:
-            employees = database.get_all_employees(conn)
-            conn.close()
+        backend = storage.app_backend()
+        if backend:
+            department_id = self.department_filter_combo.currentData()
+            if department_id is None:
+                employees = backend.get_all_employees()
+            else:
+                employees = backend.get_employees_by_department(department_id)
+            self.load_lookup_options(backend)
 
             # Menambahkan setiap karyawan ke dalam tabel
             for row_data in employees:
-                items = [QStandardItem(str(field)) for field in row_data]
+                items = [QStandardItem(str(field) if field is not None else "") for field in row_data]
                 self.model.appendRow(items)
             
             # Menyesuaikan ukuran kolom dengan konten
             self.employee_table.resizeColumnsToContents()
 
+    def load_lookup_options(self, backend: storage.StorageBackend) -> None:
+        """
+        Memuat daftar departemen dan posisi ke dropdown filter dan completer form.
+        Pilihan filter departemen yang sedang aktif dipertahankan.
+        """
+        departments = backend.get_all_departments()
+        positions = backend.get_all_positions()
+
+        # Memperbarui dropdown filter tanpa memicu pencarian ulang
+        selected_department_id = self.department_filter_combo.currentData()
+        self.department_filter_combo.blockSignals(True)
+        self.department_filter_combo.clear()
+        self.department_filter_combo.addItem("Semua Departemen", userData=None)
+        for department_id, name in departments:
+            self.department_filter_combo.addItem(name, userData=department_id)
+        selected_index = self.department_filter_combo.findData(selected_department_id)
+        self.department_filter_combo.setCurrentIndex(max(selected_index, 0))
+        self.department_filter_combo.blockSignals(False)
+
+        # Memperbarui completer agar input mengikuti nama yang sudah ada
+        self.department_completer.setModel(QStringListModel([name for _, name in departments], self.department_completer))
+        self.position_completer.setModel(QStringListModel([name for _, name in positions], self.position_completer))
+
     def on_row_selected(self, selected, deselected):
         indexes = selected.indexes()
         if not indexes:
@@ -152,11 +197,10 @@ class EmployeeManagementWidget(QWidget):
             return
 
         # Menyimpan karyawan baru ke database
-        conn = database.create_connection()
-        if conn:
+        backend = storage.app_backend()
+        if backend:
             employee_data = (name, position, department)
-            database.add_employee(conn, employee_data)
-            conn.close()
+            employee_id = backend.add_employee(employee_data)
             
             # Menampilkan pesan sukses dan memuat ulang data
             QMessageBox.information(self, "Berhasil", f"Karyawan '{name}' berhasil ditambahkan.")
@@ -164,6 +208,7 @@ class EmployeeManagementWidget(QWidget):
             self.load_employees()
             
             # Memicu signal bahwa data karyawan telah berubah
+            self.employee_upserted.emit(employee_id)
             self.employees_changed.emit()
 
     def update_employee(self) -> None:
@@ -186,11 +231,11 @@ class EmployeeManagementWidget(QWidget):
             return
 
         # Memperbarui data karyawan di database
-        conn = database.create_connection()
-        if conn:
-            employee_data = (name, position, department, self.selected_employee_id)
-            database.update_employee(conn, employee_data)
-            conn.close()
+        backend = storage.app_backend()
+        if backend:
+            employee_id = self.selected_employee_id
+            employee_data = (name, position, department, employee_id)
+            backend.update_employee(employee_data)
             
             # Menampilkan pesan sukses dan memuat ulang data
             QMessageBox.information(self, "Berhasil", f"Karyawan '{name}' berhasil diperbarui.")
@@ -198,6 +243,7 @@ class EmployeeManagementWidget(QWidget):
             self.load_employees()
             
             # Memicu signal bahwa data karyawan telah berubah
+            self.employee_upserted.emit(employee_id)
             self.employees_changed.emit()
 
     def delete_employee(self) -> None:
@@ -212,16 +258,16 @@ class EmployeeManagementWidget(QWidget):
 
         # Konfirmasi penghapusan
         reply = QMessageBox.question(self, 'Konfirmasi Hapus', 
-                                     f"Apakah Anda yakin ingin menghapus karyawan {self.name_entry.text()}?",
+                                     f"Apakah Anda yakin ingin menghapus karyawan {self.name_entry.text()}?\nRiwayat kehadirannya tetap disimpan.",
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, 
                                      QMessageBox.StandardButton.No)
 
         # Jika dikonfirmasi, hapus karyawan
         if reply == QMessageBox.StandardButton.Yes:
-            conn = database.create_connection()
-            if conn:
-                database.delete_employee(conn, self.selected_employee_id)
-                conn.close()
+            backend = storage.app_backend()
+            if backend:
+                employee_id = self.selected_employee_id
+                backend.delete_employee(employee_id)
                 
                 # Menampilkan pesan sukses dan memuat ulang data
                 QMessageBox.information(self, "Berhasil", "Karyawan berhasil dihapus.")
@@ -229,6 +275,7 @@ class EmployeeManagementWidget(QWidget):
                 self.load_employees()
                 
                 # Memicu signal bahwa data karyawan telah berubah
+                self.employee_removed.emit(employee_id)
                 self.employees_changed.emit()
 
     def clear_form(self) -> None:
@@ -243,8 +290,8 @@ class EmployeeManagementWidget(QWidget):
 
     def search_employees(self) -> None:
         """
-        Mencari karyawan berdasarkan nama atau ID.
-        Jika tidak ada kata kunci, tampilkan semua karyawan.
+        Mencari karyawan berdasarkan nama atau ID pada departemen yang dipilih.
+        Jika tidak ada kata kunci, tampilkan semua karyawan departemen tersebut.
         """
         search_term = self.search_entry.text()
         if not search_term:
@@ -253,15 +300,15 @@ class EmployeeManagementWidget(QWidget):
             return
 
         # Melakukan pencarian di database
-        conn = database.create_connection()
-        if conn:
-            employees = database.search_employees(conn, search_term)
-            conn.close()
+        backend = storage.app_backend()
+        if backend:
+            department_id = self.department_filter_combo.currentData()
+            employees = backend.search_employees(search_term, department_id)
 
             # Menampilkan hasil pencarian di tabel
             self.model.removeRows(0, self.model.rowCount())
             for row_data in employees:
-                items = [QStandardItem(str(field)) for field in row_data]
+                items = [QStandardItem(str(field) if field is not None else "") for field in row_data]
                 self.model.appendRow(items)
 
     def clear_search(self) -> None:
@@ -0,0 +1,265 @@
+from PyQt6.QtWidgets import QWidget, QComboBox, QCompleter
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QStringListModel
+from typing import Any, Optional
+import storage
+from employee_index import EmployeePrefixIndex
+from kiosk_journal import load_employee_cache, save_employee_cache
+
+# model daftar karyawan yang dipakai bersama oleh semua pemilih karyawan
+class EmployeeListModel(QAbstractListModel):
+    """
+    Model daftar karyawan bersama untuk semua dropdown pemilih karyawan.
+    Dimuat sekali dari database, lalu diperbarui secara inkremental ketika
+    karyawan ditambah, diubah, atau dihapus.
+    """
+    def __init__(self, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+
+        # Data karyawan dalam urutan tampilan: (id, nama_lengkap, departemen)
+        self._rows: list[tuple[int, str, str]] = []
+        # Peta ID karyawan ke nomor baris pada model
+        self._row_by_id: dict[int, int] = {}
+        # Indeks prefiks untuk pencarian nama/ID/departemen
+        self.search_index = EmployeePrefixIndex()
+        self._loaded = False
+        # File cache lokal daftar karyawan (mode kiosk), None jika tidak dipakai
+        self.cache_path: Optional[str] = None
+        # True jika isi model berasal dari cache karena database tidak tersedia
+        self.from_cache = False
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        employee_id, full_name, department = self._rows[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return full_name
+        if role == Qt.ItemDataRole.UserRole:
+            return employee_id
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"ID: {employee_id} - {department}" if department else f"ID: {employee_id}"
+        return None
+
+    def ensure_loaded(self) -> None:
+        """
+        Memuat data karyawan dari database jika belum pernah dimuat.
+        """
+        if not self._loaded:
+            self.reload()
+
+    def reload(self) -> None:
+        """
+        Memuat ulang seluruh data karyawan dari database dalam satu kali reset model.
+        Jika cache_path diatur, daftar disalin ke cache setiap kali berhasil dimuat, dan
+        cache dipakai jika database tidak tersedia.
+        """
+        backend = storage.app_backend()
+        employees = None
+        if backend:
+            try:
+                employees = [(employee[0], employee[1], employee[3] or "") for employee in backend.get_all_employees()]
+            except backend.Error as e:
+                print(e)
+        self.from_cache = False
+        if employees is not None and self.cache_path is not None:
+            try:
+                save_employee_cache(self.cache_path, employees)
+            except OSError as e:
+                print(e)
+        elif employees is None and self.cache_path is not None:
+            employees = load_employee_cache(self.cache_path)
+            self.from_cache = employees is not None
+        self.set_employees(employees or [])
+
+    def set_employees(self, employees: list[tuple[int, str, str]]) -> None:
+        """
+        Mengganti seluruh isi model dan indeks pencarian.
+
+        Args:
+            employees: List tuple berisi (id, nama_lengkap, departemen)
+        """
+        self.beginResetModel()
+        self._rows = list(employees)
+        self._row_by_id = {row[0]: i for i, row in enumerate(self._rows)}
+        self.search_index.build(self._rows)
+        self._loaded = True
+        self.endResetModel()
+
+    def employee_at(self, row: int) -> tuple[int, str, str]:
+        """
+        Mengembalikan data karyawan (id, nama_lengkap, departemen) pada baris tertentu.
+        """
+        return self._rows[row]
+
+    def row_for_id(self, employee_id: int) -> int:
+        """
+        Mengembalikan nomor baris untuk ID karyawan, atau -1 jika tidak ada.
+        """
+        return self._row_by_id.get(employee_id, -1)
+
+    def upsert_employee(self, employee_id: int) -> None:
+        """
+        Menambahkan atau memperbarui satu karyawan berdasarkan data terbaru di database.
+        """
+        backend = storage.app_backend()
+        employee = None
+        if backend:
+            employee = backend.get_employee(employee_id)
+        if employee is None:
+            self.remove_employee(employee_id)
+            return
+
+        row_data = (employee[0], employee[1], employee[3] or "")
+        self.search_index.add(*row_data)
+        row = self._row_by_id.get(employee_id)
+        if row is None:
+            # Karyawan baru selalu memiliki ID terbesar sehingga ditambahkan di akhir
+            row = len(self._rows)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._rows.append(row_data)
+            self._row_by_id[employee_id] = row
+            self.endInsertRows()
+        else:
+            self._rows[row] = row_data
+            model_index = self.index(row)
+            self.dataChanged.emit(model_index, model_index)
+
+    def remove_employee(self, employee_id: int) -> None:
+        """
+        Menghapus satu karyawan dari model tanpa memuat ulang seluruh data.
+        """
+        row = self._row_by_id.pop(employee_id, None)
+        if row is None:
+            return
+        self.search_index.remove(employee_id)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        self.endRemoveRows()
+        # Memperbarui nomor baris untuk karyawan setelah baris yang dihapus
+        for i in range(row, len(self._rows)):
+            self._row_by_id[self._rows[i][0]] = i
+
+# Instance model bersama, dibuat saat pertama kali dibutuhkan
+_shared_model: Optional[EmployeeListModel] = None
+
+def enable_employee_cache(path: str) -> None:
+    """
+    Mengaktifkan cache lokal daftar karyawan pada model bersama. Dipanggil sebelum
+    model pertama kali dimuat agar kiosk dapat dijalankan saat database pusat tidak tersedia.
+
+    Args:
+        path: Lokasi file cache, mis. SwipeJournal.employee_cache_path
+    """
+    global _shared_model
+    if _shared_model is None:
+        _shared_model = EmployeeListModel()
+    _shared_model.cache_path = path
+
+def shared_employee_model() -> EmployeeListModel:
+    """
+    Mengembalikan model daftar karyawan bersama, dimuat dari database sekali saja.
+    """
+    global _shared_model
+    if _shared_model is None:
+        _shared_model = EmployeeListModel()
+    _shared_model.ensure_loaded()
+    return _shared_model
+
+# dropdown pemilih karyawan dengan pencarian ketik-untuk-menyaring
+class EmployeeSelector(QComboBox):
+    """
+    Dropdown pemilih karyawan yang memakai model bersama dan QCompleter.
+    Teks yang diketik dicocokkan dengan nama, ID, atau departemen melalui indeks prefiks.
+    """
+    # Jumlah maksimum saran yang ditampilkan pada completer
+    MAX_SUGGESTIONS = 50
+
+    def __init__(self, parent: Optional[QWidget] = None, model: Optional[EmployeeListModel] = None) -> None:
+        super().__init__(parent)
+
+        self.employee_model = model if model is not None else shared_employee_model()
+        self.setModel(self.employee_model)
+        self.setEditable(True)
+        self.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+        self.setPlaceholderText("Silakan tambahkan karyawan terlebih dahulu")
+
+        # Completer memakai model saran kecil yang diisi dari indeks prefiks
+        self._suggestion_ids: list[int] = []
+        self._suggestion_model = QStringListModel(self)
+        self._completer = QCompleter(self._suggestion_model, self)
+        self._completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self._completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self._completer.activated[QModelIndex].connect(self._on_suggestion_activated)
+        self.setCompleter(self._completer)
+
+        # True jika teks diketik setelah karyawan terakhir dipilih, sehingga indeks
+        # dropdown saat ini belum tentu sesuai dengan teks yang tampil
+        self._text_edited = False
+        self.activated.connect(self._on_item_activated)
+        self.lineEdit().textEdited.connect(self.update_suggestions)
+
+    def update_suggestions(self, text: str) -> None:
+        """
+        Memperbarui daftar saran berdasarkan teks yang diketik.
+        """
+        self._text_edited = True
+        self._suggestion_ids = self.employee_model.search_index.search(text, self.MAX_SUGGESTIONS)
+        labels = []
+        for employee_id in self._suggestion_ids:
+            row = self.employee_model.row_for_id(employee_id)
+            _, full_name, department = self.employee_model.employee_at(row)
+            labels.append(f"{full_name} (ID: {employee_id}, {department})" if department
+                          else f"{full_name} (ID: {employee_id})")
+        self._suggestion_model.setStringList(labels)
+        if labels:
+            self._completer.complete()
+
+    def _on_suggestion_activated(self, index: QModelIndex) -> None:
+        """
+        Memilih karyawan pada dropdown sesuai saran yang dipilih.
+        """
+        if 0 <= index.row() < len(self._suggestion_ids):
+            self.set_current_employee(self._suggestion_ids[index.row()])
+
+    def _on_item_activated(self, row: int) -> None:
+        """
+        Menandai pilihan dari daftar dropdown sebagai sesuai dengan teks yang tampil.
+        """
+        self._text_edited = False
+
+    def set_current_employee(self, employee_id: int) -> None:
+        """
+        Memilih karyawan berdasarkan ID.
+        """
+        row = self.employee_model.row_for_id(employee_id)
+        self.setCurrentIndex(row)
+        if row >= 0:
+            self.setEditText(self.employee_model.employee_at(row)[1])
+        self._text_edited = False
+
+    def current_employee_id(self) -> Optional[int]:
+        """
+        Mengembalikan ID karyawan yang sesuai dengan teks pada dropdown.
+        Jika teks diketik tanpa memilih saran, nama lengkap yang sama persis diutamakan,
+        selebihnya teks hanya diterima bila tepat satu karyawan yang cocok (lihat
+        EmployeePrefixIndex.resolve).
+
+        Returns:
+            ID karyawan, None jika tidak ada atau lebih dari satu karyawan yang cocok
+        """
+        if not self._text_edited:
+            return self.currentData()
+        employee_id = self.employee_model.search_index.resolve(self.currentText())
+        if employee_id is not None:
+            self.set_current_employee(employee_id)
+        return employee_id
+
+    def has_employees(self) -> bool:
+        """
+        Mengembalikan True jika ada karyawan yang bisa dipilih.
+        """
+        return self.employee_model.rowCount() > 0
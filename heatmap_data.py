@@ -0,0 +1,118 @@
+from datetime import date as date_type, timedelta
+from storage import StorageBackend
+
+# Kode status per sel, sesuai database.get_daily_status_codes
+NO_RECORD = 0
+PRESENT = 1
+PERMISSION = 2
+SICK = 3
+LEAVE = 4
+# Sel yang belum dimuat dari database
+NOT_LOADED = 255
+
+STATUS_LABELS = {NO_RECORD: "Tidak ada catatan", PRESENT: "Hadir", PERMISSION: "Izin", SICK: "Sakit", LEAVE: "Cuti"}
+
+# Ukuran blok pemuatan: sekian karyawan x sekian hari dimuat bersama
+BLOCK_ROWS = 32
+BLOCK_DAYS = 32
+
+# grid status harian karyawan yang disimpan dalam satu bytearray
+class HeatmapGrid:
+    """
+    Cache status harian untuk heatmap kalender: satu byte per sel (karyawan x hari),
+    disimpan baris demi baris dalam satu bytearray. Setahun untuk 500 karyawan hanya
+    sekitar 180 KB.
+
+    Sel dimuat per blok BLOCK_ROWS x BLOCK_DAYS. Blok yang belum dimuat dan terlihat
+    pada viewport digabung menjadi satu persegi dan diambil dengan satu query agregat.
+    """
+    def __init__(self, employee_ids: list[int], start_date: str, days: int) -> None:
+        self.employee_ids = list(employee_ids)
+        self.start = date_type.fromisoformat(start_date)
+        self.days = days
+        self._cells = bytearray([NOT_LOADED]) * (len(self.employee_ids) * days)
+        self._row_by_id = {employee_id: row for row, employee_id in enumerate(self.employee_ids)}
+        self._loaded_blocks: set[tuple[int, int]] = set()
+        self.queries = 0
+
+    @property
+    def rows(self) -> int:
+        return len(self.employee_ids)
+
+    def date_at(self, day: int) -> date_type:
+        """
+        Mengembalikan tanggal untuk kolom ke-day.
+        """
+        return self.start + timedelta(days=day)
+
+    def status_at(self, row: int, day: int) -> int:
+        """
+        Mengembalikan kode status sel, NOT_LOADED jika belum dimuat.
+        """
+        return self._cells[row * self.days + day]
+
+    def ensure_loaded(self, backend: StorageBackend, first_row: int, last_row: int, first_day: int, last_day: int) -> bool:
+        """
+        Memastikan semua sel pada viewport (inklusif) sudah dimuat.
+
+        Args:
+            backend: Backend penyimpanan
+            first_row, last_row: Rentang baris karyawan yang terlihat
+            first_day, last_day: Rentang kolom hari yang terlihat
+
+        Returns:
+            True jika query dijalankan, False jika viewport sudah ada di cache
+        """
+        first_row, last_row = max(0, first_row), min(self.rows - 1, last_row)
+        first_day, last_day = max(0, first_day), min(self.days - 1, last_day)
+        if first_row > last_row or first_day > last_day:
+            return False
+
+        missing = [(row_block, day_block)
+                   for row_block in range(first_row // BLOCK_ROWS, last_row // BLOCK_ROWS + 1)
+                   for day_block in range(first_day // BLOCK_DAYS, last_day // BLOCK_DAYS + 1)
+                   if (row_block, day_block) not in self._loaded_blocks]
+        if not missing:
+            return False
+
+        # Persegi terkecil yang mencakup semua blok yang belum dimuat
+        row_blocks = [block[0] for block in missing]
+        day_blocks = [block[1] for block in missing]
+        row_start = min(row_blocks) * BLOCK_ROWS
+        row_end = min(self.rows, (max(row_blocks) + 1) * BLOCK_ROWS)
+        day_start = min(day_blocks) * BLOCK_DAYS
+        day_end = min(self.days, (max(day_blocks) + 1) * BLOCK_DAYS)
+
+        rows = backend.get_daily_status_codes(self.employee_ids[row_start:row_end],
+                                              self.date_at(day_start).isoformat(),
+                                              self.date_at(day_end - 1).isoformat())
+        self.queries += 1
+
+        # Sel tanpa catatan diisi NO_RECORD, lalu ditimpa hasil query
+        for row in range(row_start, row_end):
+            offset = row * self.days
+            self._cells[offset + day_start:offset + day_end] = bytes(day_end - day_start)
+        start_ordinal = self.start.toordinal()
+        for employee_id, date, code in rows:
+            day = date_type.fromisoformat(date).toordinal() - start_ordinal
+            self._cells[self._row_by_id[employee_id] * self.days + day] = code
+
+        for row_block in range(row_start // BLOCK_ROWS, (row_end - 1) // BLOCK_ROWS + 1):
+            for day_block in range(day_start // BLOCK_DAYS, (day_end - 1) // BLOCK_DAYS + 1):
+                self._loaded_blocks.add((row_block, day_block))
+        return True
+
+    def invalidate_date(self, date: str) -> None:
+        """
+        Menandai kolom satu tanggal agar dimuat ulang (mis. setelah check-in baru).
+        """
+        day = date_type.fromisoformat(date).toordinal() - self.start.toordinal()
+        if 0 <= day < self.days:
+            day_block = day // BLOCK_DAYS
+            self._loaded_blocks = {block for block in self._loaded_blocks if block[1] != day_block}
+
+    def memory_bytes(self) -> int:
+        """
+        Mengembalikan ukuran data sel dalam byte.
+        """
+        return len(self._cells)
@@ -0,0 +1,322 @@
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+import storage
+from storage import StorageBackend
+
+# Batas tunggu kunci database saat replay (detik). Replay berjalan di thread latar,
+# tetapi database yang terkunci tetap segera dilaporkan agar status sinkronisasi kiosk
+# akurat; swipe tetap di jurnal dan dicoba lagi pada sinkronisasi berikutnya.
+REPLAY_BUSY_TIMEOUT = 0.1
+
+def replay_backend(url: Optional[str] = None) -> Optional[StorageBackend]:
+    """
+    Membuka backend database pusat untuk replay jurnal dengan batas tunggu yang pendek.
+
+    Args:
+        url: URL atau lokasi database, default database aplikasi (storage.app_backend_url)
+
+    Returns:
+        Backend penyimpanan, None jika database tidak dapat dibuka
+    """
+    try:
+        return storage.open_backend(url or storage.app_backend_url(), setup=False, timeout=REPLAY_BUSY_TIMEOUT)
+    except Exception as e:
+        print(e)
+        return None
+
+def save_employee_cache(path: str, employees: list[tuple[int, str, str]]) -> None:
+    """
+    Menyimpan daftar karyawan ke file lokal agar kiosk tetap dapat dipakai saat database
+    pusat tidak tersedia. Ditulis ke file sementara lalu diganti agar tidak setengah tertulis.
+
+    Args:
+        path: Lokasi file cache
+        employees: List tuple berisi (id, nama_lengkap, departemen)
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(employees, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def load_employee_cache(path: str) -> Optional[list[tuple[int, str, str]]]:
+    """
+    Membaca daftar karyawan yang disimpan oleh save_employee_cache.
+
+    Returns:
+        List tuple berisi (id, nama_lengkap, departemen), None jika file belum ada atau rusak
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return [(int(row[0]), str(row[1]), str(row[2])) for row in json.load(f)]
+    except (OSError, ValueError, TypeError, IndexError):
+        return None
+
+# Kolom wajib pada setiap baris jurnal
+_SWIPE_KEYS = frozenset({"key", "employee_id", "action", "time", "date"})
+
+def _parse_swipe(line: bytes) -> Optional[dict]:
+    """
+    Mengurai satu baris jurnal, None jika baris rusak (mis. terpotong saat listrik padam).
+    """
+    try:
+        swipe = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(swipe, dict) or not _SWIPE_KEYS <= swipe.keys() or swipe["action"] not in ("in", "out"):
+        return None
+    return swipe
+
+# hasil satu kali replay jurnal ke database pusat
+@dataclass
+class ReplayResult:
+    """
+    Ringkasan hasil replay jurnal ke database pusat.
+    """
+    applied: int = 0
+    duplicates: int = 0
+    # Swipe yang ditolak database, juga disalin ke file karantina
+    rejected: int = 0
+    # Baris rusak yang dipindahkan ke file karantina
+    quarantined: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    # Tanggal swipe yang diterapkan, untuk menyegarkan tampilan yang bergantung padanya
+    dates: set[str] = field(default_factory=set)
+
+    @property
+    def processed(self) -> int:
+        return self.applied + self.duplicates + self.rejected + self.quarantined
+
+    @property
+    def throughput(self) -> float:
+        """
+        Jumlah swipe yang diproses per detik.
+        """
+        return self.processed / self.seconds if self.seconds > 0 else 0.0
+
+# jurnal lokal append-only untuk mode kiosk
+class SwipeJournal:
+    """
+    Jurnal lokal append-only untuk swipe masuk/keluar pada mode kiosk.
+    Setiap swipe ditulis sebagai satu baris JSON dengan kunci idempotensi, lalu
+    di-replay ke database pusat dalam transaksi per batch. Posisi replay disimpan
+    di file <jurnal>.offset sehingga replay dapat dilanjutkan setelah aplikasi ditutup.
+    Baris yang tidak dapat diurai dan swipe yang ditolak database (mis. karyawan tidak ada,
+    check-out tanpa check-in) dipindahkan ke <jurnal>.quarantine tanpa menghentikan replay.
+    Replay boleh berjalan di thread lain selama append dipanggil dari thread UI.
+    """
+    def __init__(self, path: str = "kiosk_journal.jsonl", fsync_every: int = 32, fsync_interval: float = 1.0) -> None:
+        self.path = path
+        self.offset_path = path + ".offset"
+        self.quarantine_path = path + ".quarantine"
+        # Salinan daftar karyawan untuk dipakai saat database pusat tidak tersedia
+        self.employee_cache_path = path + ".employees"
+        # Melindungi file jurnal dan jumlah backlog dari append dan replay yang bersamaan
+        self._lock = threading.RLock()
+        # fsync dilakukan setelah sejumlah swipe atau setelah interval tertentu
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._pending_fsync = 0
+        self._last_fsync = time.monotonic()
+        self._file = open(self.path, "ab")
+        self._terminate_torn_tail()
+        self._backlog = self._count_backlog()
+
+    def _terminate_torn_tail(self) -> None:
+        """
+        Menutup baris terakhir yang terpotong (mis. listrik padam sebelum fsync) dengan newline,
+        agar swipe berikutnya tidak tersambung ke baris tersebut. Baris terpotong itu
+        kemudian dikarantina saat replay.
+        """
+        size = os.path.getsize(self.path)
+        if size == 0:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+        self._file.write(b"\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _quarantine(self, lines: list[bytes]) -> None:
+        """
+        Menyimpan baris jurnal yang rusak ke file karantina untuk diperiksa manual.
+        """
+        with open(self.quarantine_path, "ab") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read_offset(self) -> int:
+        try:
+            with open(self.offset_path, "r") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_offset(self, offset: int) -> None:
+        # Ditulis ke file sementara lalu diganti agar offset tidak pernah setengah tertulis
+        tmp_path = self.offset_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.offset_path)
+
+    def _count_backlog(self) -> int:
+        count = 0
+        with open(self.path, "rb") as f:
+            f.seek(self._read_offset())
+            for line in f:
+                if line.endswith(b"\n"):
+                    count += 1
+        return count
+
+    def backlog_size(self) -> int:
+        """
+        Mengembalikan jumlah swipe yang belum di-replay ke database pusat.
+        """
+        return self._backlog
+
+    def append(self, employee_id: int, action: str, timestamp: str, date: str) -> str:
+        """
+        Menambahkan satu swipe ke jurnal.
+
+        Args:
+            employee_id: ID karyawan
+            action: 'in' untuk check-in, 'out' untuk check-out
+            timestamp: Waktu swipe dalam format ISO
+            date: Tanggal dalam format 'YYYY-MM-DD'
+
+        Returns:
+            Kunci idempotensi swipe
+        """
+        if action not in ("in", "out"):
+            raise ValueError(f"Aksi swipe tidak dikenal: {action}")
+        key = uuid.uuid4().hex
+        entry = {"key": key, "employee_id": employee_id, "action": action, "time": timestamp, "date": date}
+        with self._lock:
+            self._file.write(json.dumps(entry, separators=(",", ":")).encode() + b"\n")
+            self._file.flush()
+            self._backlog += 1
+            self._pending_fsync += 1
+            if self._pending_fsync >= self.fsync_every or time.monotonic() - self._last_fsync >= self.fsync_interval:
+                self.sync()
+        return key
+
+    def sync(self) -> None:
+        """
+        Memaksa isi jurnal ditulis ke disk (fsync).
+        """
+        with self._lock:
+            if self._pending_fsync:
+                os.fsync(self._file.fileno())
+                self._pending_fsync = 0
+            self._last_fsync = time.monotonic()
+
+    def close(self) -> None:
+        """
+        Menulis sisa jurnal ke disk dan menutup file.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self.sync()
+                self._file.close()
+
+    def replay(self, connect: Callable[[], Optional[StorageBackend]] = replay_backend,
+               batch_size: int = 500) -> ReplayResult:
+        """
+        Mengirim swipe yang belum di-replay ke database pusat dalam transaksi per batch.
+        Swipe yang kunci idempotensinya sudah tercatat di database dilewati, sehingga
+        replay aman diulang setelah gagal di tengah jalan.
+
+        Args:
+            connect: Fungsi pembuka backend database pusat
+            batch_size: Jumlah swipe per transaksi
+
+        Returns:
+            ReplayResult berisi jumlah swipe yang diproses dan durasinya
+        """
+        result = ReplayResult()
+        if self._backlog == 0:
+            return result
+        self.sync()
+
+        start = time.perf_counter()
+        backend = connect()
+        if backend is None:
+            result.error = "Database tidak tersedia"
+            return result
+
+        try:
+            with open(self.path, "rb") as f:
+                offset = self._read_offset()
+                f.seek(offset)
+                while True:
+                    batch: list[dict] = []
+                    broken: list[bytes] = []
+                    batch_end = offset
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            # Baris terakhir belum lengkap, dibaca lagi pada replay berikutnya
+                            break
+                        batch_end += len(line)
+                        swipe = _parse_swipe(line)
+                        if swipe is None:
+                            broken.append(line)
+                        else:
+                            batch.append(swipe)
+                        if len(batch) + len(broken) >= batch_size:
+                            break
+                    if batch_end == offset:
+                        break
+
+                    rejected_lines: list[bytes] = []
+                    if batch:
+                        rejected_swipes: list[dict] = []
+                        applied, duplicates, rejected = backend.apply_journal_swipes(batch, rejected_swipes)
+                        if applied:
+                            result.dates.update(swipe["date"] for swipe in batch)
+                        result.applied += applied
+                        result.duplicates += duplicates
+                        result.rejected += rejected
+                        # Swipe yang ditolak disimpan untuk diperiksa manual, bukan hilang diam-diam
+                        rejected_lines = [json.dumps(swipe, separators=(",", ":")).encode() + b"\n"
+                                          for swipe in rejected_swipes]
+                    if broken or rejected_lines:
+                        self._quarantine(broken + rejected_lines)
+                        result.quarantined += len(broken)
+                    offset = batch_end
+                    self._write_offset(offset)
+                    with self._lock:
+                        self._backlog -= len(batch) + len(broken)
+            self._compact_if_drained()
+        except backend.Error as e:
+            result.error = str(e)
+        finally:
+            backend.close()
+            result.seconds = time.perf_counter() - start
+        return result
+
+    def _compact_if_drained(self) -> None:
+        """
+        Mengosongkan jurnal jika semua swipe sudah di-replay. Dijalankan dengan kunci
+        agar tidak ada swipe baru yang ditambahkan di antara pemeriksaan dan truncate.
+        """
+        with self._lock:
+            if self._backlog != 0:
+                return
+            self.sync()
+            if os.path.getsize(self.path) == self._read_offset():
+                # Offset direset lebih dulu; jika terhenti sebelum truncate, replay ulang
+                # hanya menghasilkan duplikat yang dilewati oleh kunci idempotensi
+                self._write_offset(0)
+                self._file.truncate(0)
@@ -1,9 +1,15 @@
+import argparse
 import sys
+from typing import Optional
 from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QTabWidget, QVBoxLayout
-import database
+import storage
+from audit_log import AuditLog, default_audit_path
 from employee_management import EmployeeManagementWidget
 from attendance_tracking import AttendanceTrackingWidget
 from absence_management import AbsenceManagementWidget
+from attendance_heatmap import AttendanceHeatmapWidget
+from employee_selector import enable_employee_cache, shared_employee_model
+from kiosk_journal import SwipeJournal
 
 # Kelas utama aplikasi untuk jendela utama
 class MainWindow(QMainWindow):
@@ -11,15 +17,21 @@ class MainWindow(QMainWindow):
     Jendela utama aplikasi Sistem Manajemen Kehadiran Karyawan.
     Mengatur layout dengan tab untuk berbagai fitur.
     """
-    def __init__(self) -> None:
+    def __init__(self, kiosk_journal: Optional[SwipeJournal] = None) -> None:
         super().__init__()
 
         # Pengaturan jendela utama
         self.setWindowTitle("Sistem Manajemen Kehadiran Karyawan")
         self.setGeometry(100, 100, 800, 600)
 
-        # Setup database - membuat tabel jika belum ada
-        database.setup_database()
+        # Setup database - membuat tabel jika belum ada. Kiosk hanya klien database pusat
+        # yang skemanya disiapkan oleh aplikasi admin, sehingga tetap dapat dibuka saat offline
+        backend = storage.app_backend() if kiosk_journal is None else None
+        if backend:
+            try:
+                backend.setup()
+            except backend.Error as e:
+                print(e)
 
         # Membuat interface dengan tab
         self.tabs = QTabWidget()
@@ -30,31 +42,77 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(self.employee_management_tab, "Manajemen Karyawan")
 
         # Menambahkan Tab Pelacakan Kehadiran
-        self.attendance_tracking_tab = AttendanceTrackingWidget()
+        self.attendance_tracking_tab = AttendanceTrackingWidget(kiosk_journal=kiosk_journal)
         self.tabs.addTab(self.attendance_tracking_tab, "Pelacakan Kehadiran")
 
         # Menambahkan Tab Manajemen Ketidakhadiran
         self.absence_management_tab = AbsenceManagementWidget()
         self.tabs.addTab(self.absence_management_tab, "Manajemen Ketidakhadiran")
 
+        # Menambahkan Tab Kalender Kehadiran
+        self.attendance_heatmap_tab = AttendanceHeatmapWidget()
+        self.tabs.addTab(self.attendance_heatmap_tab, "Kalender Kehadiran")
+
         # Menghubungkan signal antar tab
+        # Model karyawan bersama diperbarui inkremental sebelum status dropdown disesuaikan
+        employee_model = shared_employee_model()
+        self.employee_management_tab.employee_upserted.connect(employee_model.upsert_employee)
+        self.employee_management_tab.employee_removed.connect(employee_model.remove_employee)
         self.employee_management_tab.employees_changed.connect(self.attendance_tracking_tab.load_employees_into_combobox)
         self.employee_management_tab.employees_changed.connect(self.absence_management_tab.load_employees_into_combobox)
+        self.employee_management_tab.employees_changed.connect(self.attendance_heatmap_tab.load_departments)
+        self.employee_management_tab.employees_changed.connect(self.attendance_heatmap_tab.load_heatmap)
+        # Kolom heatmap untuk tanggal yang ditulis dimuat ulang setelah check-in, check-out, dan ketidakhadiran
+        self.attendance_tracking_tab.attendance_changed.connect(self.attendance_heatmap_tab.invalidate_date)
+        self.absence_management_tab.attendance_changed.connect(self.attendance_heatmap_tab.invalidate_date)
+
+    def closeEvent(self, event) -> None:
+        # Replay jurnal yang sedang berjalan diselesaikan sebelum jurnal ditutup
+        self.attendance_tracking_tab.stop_journal_sync()
+        super().closeEvent(event)
 
 def main() -> None:
     """
     Fungsi utama untuk menjalankan aplikasi.
     Membuat instance QApplication dan menampilkan jendela utama.
+    Argumen --kiosk mengaktifkan mode kiosk dengan jurnal swipe lokal, dan --db memilih
+    file SQLite atau server PostgreSQL (postgresql://...).
     """
+    parser = argparse.ArgumentParser(description="Sistem Manajemen Kehadiran Karyawan")
+    parser.add_argument("--db", default="attendance.db",
+                        help="Lokasi file SQLite atau URL postgresql://... (default: attendance.db)")
+    parser.add_argument("--kiosk", action="store_true", help="Mode kiosk dengan jurnal swipe lokal")
+    # Argumen lain diteruskan ke Qt
+    args, qt_args = parser.parse_known_args()
+
     # Membuat instance aplikasi PyQt6
-    app = QApplication(sys.argv)
-    
-    # Membuat dan menampilkan jendela utama
-    window = MainWindow()
-    window.show()
+    app = QApplication(sys.argv[:1] + qt_args)
+
+    # Mode kiosk: swipe dicatat ke jurnal lokal sebelum dikirim ke database pusat
+    kiosk_journal = SwipeJournal() if args.kiosk else None
+    if kiosk_journal is not None:
+        # Daftar karyawan disalin ke samping jurnal agar kiosk dapat dibuka saat offline
+        enable_employee_cache(kiosk_journal.employee_cache_path)
+
+    # Semua perubahan data karyawan dan kehadiran dicatat ke database audit terpisah
+    audit_log = AuditLog(default_audit_path(args.db))
+    storage.configure_app_backend(args.db, audit_log)
     
-    # Menjalankan loop aplikasi dan keluar dengan kode exit yang sesuai
-    sys.exit(app.exec())
+    try:
+        # Membuat dan menampilkan jendela utama
+        window = MainWindow(kiosk_journal)
+        window.show()
+
+        # Menjalankan loop aplikasi
+        exit_code = app.exec()
+    finally:
+        # Sisa buffer log audit tetap ditulis meskipun jendela utama gagal dibuat
+        if kiosk_journal is not None:
+            kiosk_journal.close()
+        storage.close_app_backend()
+        audit_log.close()
+    # Keluar dengan kode exit yang sesuai
+    sys.exit(exit_code)
 
 # Blok untuk menjalankan aplikasi jika file ini dijalankan langsung
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date as date_type, timedelta
+from typing import Optional
+import storage
+from storage import StorageBackend
+
+# Agregat parsial per karyawan: [total_jam, jumlah_hadir, jumlah_tidak_hadir]
+Aggregate = dict[int, list]
+
+def partition_by_month(start_date: str, end_date: str) -> list[tuple[str, str]]:
+    """
+    Membagi rentang tanggal (inklusif) menjadi partisi per bulan kalender.
+
+    Returns:
+        List tuple berisi (tanggal_awal, tanggal_akhir) untuk setiap partisi
+    """
+    start = date_type.fromisoformat(start_date)
+    end = date_type.fromisoformat(end_date)
+    partitions = []
+    while start <= end:
+        next_month = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        partition_end = min(end, next_month - timedelta(days=1))
+        partitions.append((start.isoformat(), partition_end.isoformat()))
+        start = next_month
+    return partitions
+
+def _open_read_only(url: str) -> StorageBackend:
+    # SQLite dibuka hanya-baca agar banyak proses dapat membaca tanpa saling mengunci;
+    # PostgreSQL cukup satu koneksi per proses worker
+    if storage.is_postgres_url(url):
+        return storage.open_backend(url, setup=False, min_size=1, max_size=1)
+    return storage.open_backend(url, setup=False, read_only=True)
+
+def _aggregate_partition(url: str, start_date: str, end_date: str,
+                         department_id: Optional[int], unassigned: bool) -> Aggregate:
+    """
+    Menghitung agregat satu partisi. Dijalankan di proses worker dengan backend sendiri.
+    """
+    with _open_read_only(url) as backend:
+        rows = backend.get_hours_aggregate(start_date, end_date, department_id, unassigned)
+        return {employee_id: [hours, present, absent] for employee_id, hours, present, absent in rows}
+
+def merge_aggregates(partials: list[Aggregate]) -> Aggregate:
+    """
+    Menjumlahkan agregat parsial dari beberapa partisi.
+    """
+    merged: Aggregate = {}
+    for partial in partials:
+        for employee_id, values in partial.items():
+            total = merged.get(employee_id)
+            if total is None:
+                merged[employee_id] = list(values)
+            else:
+                total[0] += values[0]
+                total[1] += values[1]
+                total[2] += values[2]
+    return merged
+
+def hours_report(url: str, start_date: str, end_date: str, partition: str = "month",
+                 workers: Optional[int] = None) -> list[tuple]:
+    """
+    Membuat laporan jam kerja semua karyawan untuk rentang tanggal secara paralel.
+    Rentang dibagi per bulan atau per departemen, setiap partisi dihitung di proses
+    terpisah dengan backend sendiri (SQLite hanya-baca), lalu agregat parsialnya digabungkan.
+
+    Args:
+        url: Lokasi file SQLite atau URL postgresql://...
+        start_date: Tanggal awal dalam format 'YYYY-MM-DD'
+        end_date: Tanggal akhir dalam format 'YYYY-MM-DD' (inklusif)
+        partition: 'month' untuk partisi per bulan, 'department' untuk per departemen
+        workers: Jumlah proses worker, None untuk jumlah CPU; 1 berarti dihitung di proses ini
+
+    Returns:
+        List tuple berisi (employee_id, nama_lengkap, departemen, total_jam, jumlah_hadir,
+        jumlah_tidak_hadir) diurutkan berdasarkan ID karyawan
+    """
+    if partition == "month":
+        tasks = [(url, start, end, None, False) for start, end in partition_by_month(start_date, end_date)]
+    elif partition == "department":
+        with _open_read_only(url) as backend:
+            department_ids = [row[0] for row in backend.get_all_departments()]
+        tasks = [(url, start_date, end_date, department_id, False) for department_id in department_ids]
+        # Partisi tambahan untuk karyawan tanpa departemen
+        tasks.append((url, start_date, end_date, None, True))
+    else:
+        raise ValueError(f"Partisi tidak dikenal: {partition}")
+
+    if workers == 1 or len(tasks) <= 1:
+        partials = [_aggregate_partition(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(_aggregate_partition, *zip(*tasks)))
+    merged = merge_aggregates(partials)
+
+    # Nama dan departemen digabungkan di akhir, sekali untuk semua partisi
+    with _open_read_only(url) as backend:
+        names = {employee[0]: (employee[1], employee[3])
+                 for employee in backend.get_all_employees(include_inactive=True)}
+
+    report = []
+    for employee_id in sorted(merged):
+        hours, present, absent = merged[employee_id]
+        full_name, department = names.get(employee_id, (None, None))
+        report.append((employee_id, full_name, department, round(hours, 2), present, absent))
+    return report
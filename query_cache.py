@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date as date_type
+from typing import Hashable, Iterable, Optional
+
+# Status ketidakhadiran; query yang hanya bergantung pada status ini tidak perlu
+# di-invalidate oleh check-in/check-out biasa
+ABSENCE_STATUSES = frozenset({"Sakit", "Izin", "Cuti"})
+
+class _Entry:
+    __slots__ = ("rows", "dates", "absence_only", "expires_at")
+
+    def __init__(self, rows: list, dates: Optional[frozenset], absence_only: bool, expires_at: Optional[float]) -> None:
+        self.rows = rows
+        self.dates = dates
+        self.absence_only = absence_only
+        self.expires_at = expires_at
+
+# cache hasil query dengan eviction LRU dan invalidasi berdasarkan tanggal
+class QueryCache:
+    """
+    Cache hasil query dengan eviction LRU, dibatasi jumlah entri dan total baris.
+
+    Setiap entri ditandai dengan tanggal-tanggal yang menjadi sumber datanya
+    (None berarti bergantung pada semua tanggal). Penulisan ke attendance_records
+    hanya meng-invalidate entri untuk tanggal yang ditulis, sehingga hasil untuk hari
+    yang sudah lewat tetap tersimpan. Entri hari ini juga kedaluwarsa setelah today_ttl
+    detik agar perubahan dari proses lain (mis. CLI) tetap terlihat.
+
+    Penulisan dari koneksi atau proses lain ke tanggal mana pun (replay jurnal kiosk,
+    impor badge, penutupan sesi otomatis) dideteksi lewat nomor versi database per
+    koneksi, lihat check_version().
+    """
+    def __init__(self, max_entries: int = 256, max_rows: int = 200_000, today_ttl: Optional[float] = 30.0) -> None:
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.today_ttl = today_ttl
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._row_count = 0
+        # Versi database terakhir yang diketahui per (lingkup, koneksi sumber)
+        self._versions: dict[tuple[Hashable, Hashable], int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[list]:
+        """
+        Mengambil hasil dari cache, None jika tidak ada atau sudah kedaluwarsa.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and time.monotonic() >= entry.expires_at:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.rows
+
+    def put(self, key: Hashable, rows: list, dates: Optional[Iterable[str]] = None, absence_only: bool = False) -> None:
+        """
+        Menyimpan hasil query ke cache.
+
+        Args:
+            key: Kunci cache (nama query dan parameternya)
+            rows: Hasil query
+            dates: Tanggal-tanggal sumber data, None jika bergantung pada semua tanggal
+            absence_only: True jika hasil hanya bergantung pada catatan ketidakhadiran
+        """
+        if len(rows) > self.max_rows:
+            return
+        dates = frozenset(dates) if dates is not None else None
+        today = date_type.today().isoformat()
+        # Hasil yang mencakup hari ini masih bisa berubah dari proses lain
+        is_open = dates is None or any(d >= today for d in dates)
+        expires_at = time.monotonic() + self.today_ttl if is_open and self.today_ttl is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(rows, dates, absence_only, expires_at)
+            self._row_count += len(rows)
+            while len(self._entries) > self.max_entries or self._row_count > self.max_rows:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._row_count -= len(entry.rows)
+
+    def invalidate_date(self, scope: Hashable, date: str, status: Optional[str] = None) -> None:
+        """
+        Meng-invalidate entri yang bergantung pada tanggal tertentu setelah penulisan.
+
+        Args:
+            scope: Lingkup database (bagian pertama kunci cache)
+            date: Tanggal catatan yang ditulis
+            status: Status catatan yang ditulis, None jika tidak diketahui
+        """
+        affects_absences = status is None or status in ABSENCE_STATUSES
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if key[0] == scope
+                     and (entry.dates is None or date in entry.dates)
+                     and (affects_absences or not entry.absence_only)]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+
+    def invalidate_scope(self, scope: Hashable) -> None:
+        """
+        Meng-invalidate semua entri untuk satu database (mis. setelah data karyawan berubah).
+        """
+        with self._lock:
+            self._invalidate_scope(scope)
+
+    def _invalidate_scope(self, scope: Hashable) -> None:
+        stale = [key for key in self._entries if key[0] == scope]
+        for key in stale:
+            self._remove(key)
+        self.invalidations += len(stale)
+
+    def check_version(self, scope: Hashable, version: Optional[int], source: Hashable = None) -> None:
+        """
+        Membandingkan versi database yang dibaca lewat satu koneksi dengan versi terakhir yang
+        diketahui untuk koneksi itu. Versi (PRAGMA data_version) hanya berubah jika koneksi lain
+        melakukan commit, sehingga setiap perubahan meng-invalidate semua entri lingkup tersebut.
+        Koneksi yang baru pertama kali terlihat juga meng-invalidate lingkupnya, karena belum
+        dapat memastikan entri yang disimpan koneksi lain masih berlaku.
+
+        Args:
+            scope: Lingkup database (bagian pertama kunci cache)
+            version: Nomor versi dari koneksi sumber, None jika tidak diketahui
+            source: Penanda koneksi sumber versi
+        """
+        if version is None:
+            return
+        with self._lock:
+            if self._versions.get((scope, source)) != version:
+                self._invalidate_scope(scope)
+            self._versions[(scope, source)] = version
+
+    def forget_source(self, scope: Hashable, source: Hashable = None) -> None:
+        """
+        Menghapus versi yang tercatat untuk satu koneksi sumber (mis. saat koneksi ditutup).
+        """
+        with self._lock:
+            self._versions.pop((scope, source), None)
+
+    def clear(self) -> None:
+        """
+        Mengosongkan cache dan mereset statistik.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._row_count = 0
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> dict:
+        """
+        Mengembalikan statistik cache: hits, misses, hit_rate, evictions, invalidations, entries, rows.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "rows": self._row_count,
+            }
+
+# Cache bersama untuk query di modul database
+default_cache = QueryCache()
+
+def cache_stats() -> dict:
+    """
+    Mengembalikan statistik cache query bersama.
+    """
+    return default_cache.stats()
@@ -0,0 +1,156 @@
+from datetime import date as date_type, datetime, timedelta
+from typing import Optional
+from storage import StorageBackend
+
+# Label klasifikasi kehadiran terhadap jadwal shift
+ON_TIME = "on-time"
+LATE = "late"
+EARLY_LEAVE = "early-leave"
+OVERTIME = "overtime"
+UNSCHEDULED = "unscheduled"
+
+# Kerja setelah jam selesai shift baru dihitung lembur jika minimal sekian menit
+OVERTIME_THRESHOLD_MINUTES = 30
+
+# Jadwal satu karyawan pada satu hari: (shift_id, waktu_mulai, waktu_selesai, toleransi_menit)
+ShiftWindow = tuple[int, datetime, datetime, int]
+
+def build_day_schedule(backend: StorageBackend, date: str) -> dict[int, ShiftWindow]:
+    """
+    Membuat tabel lookup jadwal shift per karyawan untuk satu tanggal.
+    Jadwal diambil dengan satu query, dan waktu mulai/selesai setiap shift hanya
+    dihitung sekali meskipun dipakai oleh banyak karyawan.
+
+    Args:
+        backend: Backend penyimpanan
+        date: Tanggal dalam format 'YYYY-MM-DD'
+
+    Returns:
+        Dict berisi employee_id -> (shift_id, waktu_mulai, waktu_selesai, toleransi_menit)
+    """
+    day = date_type.fromisoformat(date)
+    windows: dict[int, ShiftWindow] = {}
+    schedule: dict[int, ShiftWindow] = {}
+    for employee_id, shift_id, start_time, end_time, grace_minutes in backend.get_day_schedule(date):
+        window = windows.get(shift_id)
+        if window is None:
+            start = datetime.combine(day, datetime.strptime(start_time, "%H:%M").time())
+            end = datetime.combine(day, datetime.strptime(end_time, "%H:%M").time())
+            if end <= start:
+                # Shift malam selesai keesokan harinya
+                end += timedelta(days=1)
+            window = (shift_id, start, end, grace_minutes)
+            windows[shift_id] = window
+        schedule[employee_id] = window
+    return schedule
+
+def _parse_time(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    # Waktu dengan zona waktu (mis. akhiran 'Z') dibandingkan sebagai waktu lokal apa adanya
+    return parsed.replace(tzinfo=None) if parsed.tzinfo is not None else parsed
+
+def classify_record(check_in_time: str, check_out_time: Optional[str],
+                    window: Optional[ShiftWindow]) -> tuple[str, int, int, int]:
+    """
+    Mengklasifikasikan satu catatan kehadiran terhadap jadwal shift.
+
+    Args:
+        check_in_time: Waktu masuk dalam format ISO
+        check_out_time: Waktu keluar dalam format ISO, None jika belum check-out
+        window: Jadwal shift karyawan pada hari itu, None jika tidak dijadwalkan
+
+    Returns:
+        Tuple berisi (klasifikasi, menit_terlambat, menit_pulang_cepat, menit_lembur).
+        Klasifikasi berisi satu atau lebih label dipisahkan koma, misalnya 'late,overtime'.
+    """
+    if window is None:
+        return UNSCHEDULED, 0, 0, 0
+    _, start, end, grace_minutes = window
+
+    labels = []
+    early_leave_minutes = overtime_minutes = 0
+
+    late_minutes = max(0, int((_parse_time(check_in_time) - start).total_seconds() // 60))
+    if late_minutes > grace_minutes:
+        labels.append(LATE)
+    else:
+        late_minutes = 0
+
+    if check_out_time:
+        difference = int((_parse_time(check_out_time) - end).total_seconds() // 60)
+        if difference < 0:
+            early_leave_minutes = -difference
+            labels.append(EARLY_LEAVE)
+        elif difference >= OVERTIME_THRESHOLD_MINUTES:
+            overtime_minutes = difference
+
+    if not labels:
+        labels.append(ON_TIME)
+    if overtime_minutes:
+        labels.append(OVERTIME)
+    return ",".join(labels), late_minutes, early_leave_minutes, overtime_minutes
+
+def select_window(check_in_time: str, window: Optional[ShiftWindow],
+                  previous_window: Optional[ShiftWindow]) -> Optional[ShiftWindow]:
+    """
+    Memilih shift yang berlaku untuk satu check-in. Check-in setelah tengah malam yang
+    masih sebelum shift malam hari sebelumnya selesai milik shift malam itu, kecuali
+    shift hari ini dimulai lebih dekat dengan waktu check-in.
+
+    Args:
+        check_in_time: Waktu masuk dalam format ISO
+        window: Jadwal shift karyawan pada tanggal catatan, None jika tidak dijadwalkan
+        previous_window: Jadwal shift malam karyawan pada hari sebelumnya, None jika tidak ada
+
+    Returns:
+        Jadwal shift yang dipakai untuk klasifikasi, None jika tidak dijadwalkan
+    """
+    if previous_window is None:
+        return window
+    check_in = _parse_time(check_in_time)
+    if check_in >= previous_window[2]:
+        return window
+    if window is not None and window[1] - check_in < check_in - previous_window[1]:
+        return window
+    return previous_window
+
+def classify_day(backend: StorageBackend, date: str) -> int:
+    """
+    Mengklasifikasikan semua catatan kehadiran pada satu tanggal dan menyimpannya
+    ke tabel attendance_classifications dalam satu transaksi. Klasifikasi sebelumnya
+    untuk tanggal itu diganti seluruhnya.
+
+    Args:
+        backend: Backend penyimpanan
+        date: Tanggal dalam format 'YYYY-MM-DD'
+
+    Returns:
+        Jumlah catatan yang diklasifikasikan
+    """
+    schedule = build_day_schedule(backend, date)
+    previous_date = (date_type.fromisoformat(date) - timedelta(days=1)).isoformat()
+    # Shift malam hari sebelumnya yang berakhir pada tanggal ini
+    overnight = {employee_id: window for employee_id, window in build_day_schedule(backend, previous_date).items()
+                 if window[2].date() > window[1].date()}
+    classifications = []
+    for record_id, employee_id, check_in_time, check_out_time in backend.get_presence_records(date):
+        window = select_window(check_in_time, schedule.get(employee_id), overnight.get(employee_id))
+        result = classify_record(check_in_time, check_out_time, window)
+        classifications.append((record_id, window[0] if window else None) + result)
+    backend.save_attendance_classifications(date, classifications)
+    return len(classifications)
+
+def classify_range(backend: StorageBackend, start_date: str, end_date: str) -> int:
+    """
+    Mengklasifikasikan catatan kehadiran untuk rentang tanggal (inklusif), satu hari per batch.
+
+    Returns:
+        Jumlah catatan yang diklasifikasikan
+    """
+    total = 0
+    current = date_type.fromisoformat(start_date)
+    last = date_type.fromisoformat(end_date)
+    while current <= last:
+        total += classify_day(backend, current.isoformat())
+        current += timedelta(days=1)
+    return total
@@ -0,0 +1,63 @@
+from datetime import datetime
+import pytest
+import attendance_validation
+from attendance_validation import OPEN_SESSION, OVERLAP, AUTO_CLOSE_REASON, scan_anomalies, validate_range
+from storage import SQLiteBackend
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "attendance.db"))
+    yield backend
+    backend.close()
+
+def _session(backend, employee_id: int, check_in: str, check_out=None) -> int:
+    record_id = backend.add_attendance_record((employee_id, check_in, "Hadir", check_in[:10]))
+    if check_out is not None:
+        backend.check_out(record_id, check_out)
+    return record_id
+
+def _check_out(backend, record_id: int) -> str:
+    return backend.conn.execute("SELECT check_out_time FROM attendance_records WHERE id = ?", (record_id,)).fetchone()[0]
+
+def test_overlap_uses_running_max_check_out(backend):
+    budi = backend.add_employee(("Budi", None, None))
+    _session(backend, budi, "2024-01-15T08:00:00", "2024-01-15T17:00:00")
+    inner = _session(backend, budi, "2024-01-15T09:00:00", "2024-01-15T10:00:00")
+    # Sesi tepat sebelumnya selesai 10:00, tetapi sesi pertama masih berjalan sampai 17:00
+    later = _session(backend, budi, "2024-01-15T11:00:00", "2024-01-15T12:00:00")
+    after = _session(backend, budi, "2024-01-15T18:00:00", "2024-01-15T19:00:00")
+
+    report = scan_anomalies(backend, "2024-01-15", "2024-01-15", now=datetime(2024, 1, 16, 12))
+    assert sorted(anomaly.record_id for anomaly in report.anomalies if anomaly.kind == OVERLAP) == [inner, later]
+    assert after not in {anomaly.record_id for anomaly in report.anomalies}
+
+def test_auto_close_uses_shift_end_fallback_and_next_check_in(backend):
+    budi = backend.add_employee(("Budi", None, None))
+    dewi = backend.add_employee(("Dewi", None, None))
+    andi = backend.add_employee(("Andi", None, None))
+    morning = backend.add_shift(("Pagi", "08:00", "16:00", 10))
+    backend.assign_shift(budi, "2024-01-01", shift_id=morning)
+    scheduled = _session(backend, budi, "2024-01-15T08:00:00")
+    unscheduled = _session(backend, dewi, "2024-01-15T09:00:00")
+    forgotten = _session(backend, andi, "2024-01-15T08:00:00")
+    _session(backend, andi, "2024-01-15T13:00:00", "2024-01-15T17:00:00")
+
+    report = validate_range(backend, "2024-01-15", "2024-01-15", auto_close=True, now=datetime(2024, 1, 16, 12))
+    assert report.count(OPEN_SESSION) == 3 and report.closed_sessions == 3
+    assert _check_out(backend, scheduled) == "2024-01-15T16:00:00"
+    assert _check_out(backend, unscheduled) == f"2024-01-15T{9 + attendance_validation.AUTO_CLOSE_HOURS:02d}:00:00"
+    assert _check_out(backend, forgotten) == "2024-01-15T13:00:00"
+    assert backend.conn.execute("SELECT reason FROM attendance_records WHERE id = ?", (scheduled,)).fetchone() == (
+        AUTO_CLOSE_REASON,)
+
+def test_auto_close_never_closes_in_the_future(backend):
+    budi = backend.add_employee(("Budi", None, None))
+    # Shift panjang yang baru selesai pukul 02:00 keesokan harinya
+    long_shift = backend.add_shift(("Panjang", "08:00", "02:00", 0))
+    backend.assign_shift(budi, "2024-01-01", shift_id=long_shift)
+    record_id = _session(backend, budi, "2024-01-15T08:00:00")
+
+    now = datetime(2024, 1, 16, 1, 0)
+    report = validate_range(backend, "2024-01-15", "2024-01-15", auto_close=True, now=now)
+    assert report.closed_sessions == 1
+    assert _check_out(backend, record_id) == "2024-01-16T01:00:00"
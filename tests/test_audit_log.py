@@ -0,0 +1,67 @@
+import sqlite3
+import time
+import pytest
+import database
+from audit_log import AuditLog, ATTENDANCE
+
+@pytest.fixture
+def audit(tmp_path):
+    audit = AuditLog(str(tmp_path / "attendance_audit.db"), actor="test", flush_every=1000, flush_interval=3600)
+    yield audit
+    audit.close()
+
+def _break_audit_table(audit, broken: bool) -> None:
+    # Koneksi lain mengganti nama tabel sehingga penulisan audit gagal seperti saat database rusak
+    other = sqlite3.connect(audit.path)
+    if broken:
+        other.execute("ALTER TABLE audit_events RENAME TO audit_events_moved")
+    else:
+        other.execute("ALTER TABLE audit_events_moved RENAME TO audit_events")
+    other.commit()
+    other.close()
+
+def test_failed_flush_keeps_events_for_retry(audit):
+    audit.record(ATTENDANCE, 1, 1, "check-in", None, {"check_in_time": "2024-01-15T08:00:00"})
+    _break_audit_table(audit, True)
+    with pytest.raises(sqlite3.Error):
+        audit.flush()
+
+    _break_audit_table(audit, False)
+    audit.record(ATTENDANCE, 1, 1, "check-out", {"check_out_time": None}, {"check_out_time": "2024-01-15T17:00:00"})
+    assert audit.flush() == 2
+    assert [event[4] for event in audit.history(1)] == ["check-in", "check-out"]
+
+def test_audit_failure_does_not_fail_committed_write(tmp_path, audit, capsys):
+    db_file = str(tmp_path / "attendance.db")
+    database.setup_database(db_file)
+    conn = sqlite3.connect(db_file)
+    budi = database.add_employee(conn, ("Budi", None, None))
+    _break_audit_table(audit, True)
+    audit.flush_every = 1
+    database.set_audit_log(audit)
+    try:
+        record_id = database.add_attendance_record(conn, (budi, "2024-01-15T08:00:00", "Hadir", "2024-01-15"))
+    finally:
+        database.set_audit_log(None)
+    assert "audit_events" in capsys.readouterr().err
+    assert conn.execute("SELECT id FROM attendance_records").fetchall() == [(record_id,)]
+    conn.close()
+
+    _break_audit_table(audit, False)
+    assert audit.flush() == 1
+    assert audit.history(budi)[0][3:5] == (record_id, "check-in")
+
+def test_buffer_is_flushed_by_timer_without_new_events(tmp_path):
+    audit = AuditLog(str(tmp_path / "attendance_audit.db"), actor="test", flush_every=1000, flush_interval=0.05)
+    try:
+        audit.record(ATTENDANCE, 1, 1, "check-in", None, {"check_in_time": "2024-01-15T08:00:00"})
+        other = sqlite3.connect(audit.path)
+        deadline = time.monotonic() + 5
+        while other.execute("SELECT COUNT(*) FROM audit_events").fetchone()[0] == 0:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        other.close()
+    finally:
+        audit.close()
+    # Pemanggilan close() berikutnya (mis. dari atexit) diabaikan
+    audit.close()
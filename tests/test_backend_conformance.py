@@ -0,0 +1,292 @@
+"""
+Uji kesesuaian yang sama untuk setiap backend penyimpanan. Setiap uji mendapat database kosong.
+
+Backend SQLite selalu diuji pada file sementara. PostgreSQL ikut diuji jika variabel
+lingkungan ATTENDANCE_PG_URL berisi URL server (mis. postgresql://postgres@localhost/postgres);
+setiap uji berjalan di skema sementara yang dihapus kembali.
+"""
+import contextlib
+import inspect
+import io
+import os
+import sys
+import uuid
+import pytest
+from storage import StorageBackend, SQLiteBackend
+
+PG_URL = os.environ.get("ATTENDANCE_PG_URL")
+
+# log audit di memori yang mencatat event tanpa waktu dan pelaku
+class _AuditRecorder:
+    def __init__(self) -> None:
+        self.events: list[tuple] = []
+        self.failing = False
+
+    def record(self, entity, entity_id, employee_id, action, before, after) -> None:
+        if self.failing:
+            raise OSError("database audit tidak dapat ditulis")
+        self.events.append((entity, entity_id, employee_id, action, before, after))
+
+@pytest.fixture(params=["sqlite", pytest.param("postgresql", marks=pytest.mark.skipif(
+    PG_URL is None, reason="ATTENDANCE_PG_URL tidak diatur"))])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        with contextlib.redirect_stdout(io.StringIO()):
+            backend = SQLiteBackend(str(tmp_path / "conformance.db"))
+        yield backend
+        backend.close()
+        return
+
+    import psycopg
+    from storage_postgres import PostgresBackend
+    schema = f"conformance_{uuid.uuid4().hex[:12]}"
+    with contextlib.redirect_stdout(io.StringIO()):
+        backend = PostgresBackend(PG_URL, max_size=4, schema=schema)
+    try:
+        yield backend
+    finally:
+        backend.close()
+        with psycopg.connect(PG_URL, autocommit=True) as conn:
+            conn.execute(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+
+def test_lookups(backend):
+    finance = backend.get_or_create_department("  Keuangan   Pusat ")
+    assert finance is not None
+    assert backend.get_or_create_department("keuangan pusat") == finance
+    # Huruf lebar penuh (NFKC) dan casefold di luar ASCII
+    assert backend.get_or_create_department("ＫＥＵＡＮＧＡＮ\u3000PUSAT") == finance
+    assert backend.get_or_create_department("   ") is None
+    backend.get_or_create_department("bagian Umum")
+    backend.get_or_create_department("Akuntansi")
+    assert [name for _, name in backend.get_all_departments()] == ["Akuntansi", "bagian Umum", "Keuangan Pusat"]
+
+    staff = backend.get_or_create_position("Staf")
+    assert backend.get_or_create_position("STAF") == staff
+    assert backend.get_or_create_position("Staf Straße") == backend.get_or_create_position("STAF STRASSE")
+    backend.get_or_create_position("analis")
+    assert [name for _, name in backend.get_all_positions()] == ["analis", "Staf", "Staf Straße"]
+
+def test_employees(backend):
+    budi = backend.add_employee(("Budi Santoso", "Staf", "Keuangan"))
+    dewi = backend.add_employee(("Dewi Lestari", "Analis", "keuangan"))
+    rudi = backend.add_employee(("Rudi Hartono", None, None))
+    assert len({budi, dewi, rudi}) == 3
+    assert backend.get_employee(dewi) == (dewi, "Dewi Lestari", "Analis", "Keuangan")
+    assert backend.get_employee(rudi) == (rudi, "Rudi Hartono", None, None)
+
+    backend.update_employee(("Rudi H.", "Teknisi", "Produksi", rudi))
+    assert backend.get_employee(rudi) == (rudi, "Rudi H.", "Teknisi", "Produksi")
+
+    assert {row[0] for row in backend.search_employees("budi")} == {budi}
+    assert {row[0] for row in backend.search_employees(str(dewi))} == {dewi}
+    assert backend.search_employees("tidak ada") == []
+    finance = backend.get_or_create_department("Keuangan")
+    assert {row[0] for row in backend.search_employees("i", finance)} == {budi, dewi}
+    assert {row[0] for row in backend.get_employees_by_department(finance)} == {budi, dewi}
+
+    backend.delete_employee(dewi, "2024-01-31T17:00:00")
+    assert backend.get_employee(dewi) is None
+    assert backend.get_employee(dewi, include_inactive=True) is not None
+    assert {row[0] for row in backend.get_all_employees()} == {budi, rudi}
+    assert {row[0] for row in backend.get_all_employees(include_inactive=True)} == {budi, dewi, rudi}
+    assert backend.search_employees("dewi") == []
+    assert [(name, count) for _, name, count in backend.get_department_headcounts()] == [("Keuangan", 1), ("Produksi", 1)]
+
+def test_attendance(backend):
+    budi = backend.add_employee(("Budi", "Staf", "Keuangan"))
+    dewi = backend.add_employee(("Dewi", "Staf", "Keuangan"))
+    finance = backend.get_or_create_department("Keuangan")
+
+    record_id = backend.add_attendance_record((budi, "2024-01-15T08:00:00", "Hadir", "2024-01-15"))
+    assert backend.get_last_check_in_for_employee(budi, "2024-01-15") == (record_id,)
+    backend.check_out(record_id, "2024-01-15T16:30:00")
+    assert backend.get_last_check_in_for_employee(budi, "2024-01-15") is None
+
+    backend.add_absence_record((dewi, None, None, "Sakit", "2024-01-15", "Demam"))
+    backend.add_absence_record((dewi, None, None, "Izin", "2024-01-16", "Keluarga"))
+    assert sorted(backend.get_todays_records("2024-01-15"), key=str) == sorted(
+        [("Budi", "2024-01-15T08:00:00", "2024-01-15T16:30:00", "Hadir"), ("Dewi", None, None, "Sakit", )], key=str)
+    assert backend.get_all_absences() == [("Dewi", "2024-01-16", "Izin", "Keluarga"), ("Dewi", "2024-01-15", "Sakit", "Demam")]
+    assert sorted(backend.get_department_attendance(finance, "2024-01-15", "2024-01-16")) == [
+        ("2024-01-15", "Hadir", 1), ("2024-01-15", "Sakit", 1), ("2024-01-16", "Izin", 1)]
+
+    hours = {row[0]: row[1:] for row in backend.get_hours_aggregate("2024-01-01", "2024-01-31")}
+    assert abs(hours[budi][0] - 8.5) < 1e-6 and tuple(hours[budi][1:]) == (1, 0)
+    assert hours[dewi][0] == 0 and tuple(hours[dewi][1:]) == (0, 2)
+    assert {row[0] for row in backend.get_hours_aggregate("2024-01-01", "2024-01-31", finance)} == {budi, dewi}
+    assert list(backend.get_hours_aggregate("2024-01-01", "2024-01-31", unassigned=True)) == []
+    assert backend.cleanup_orphan_records() == 0
+
+def test_journal_swipes(backend):
+    budi = backend.add_employee(("Budi", None, None))
+    swipes = [
+        {"key": "a", "employee_id": budi, "action": "in", "time": "2024-01-15T08:00:00", "date": "2024-01-15"},
+        {"key": "a", "employee_id": budi, "action": "in", "time": "2024-01-15T08:00:00", "date": "2024-01-15"},
+        {"key": "b", "employee_id": budi, "action": "out", "time": "2024-01-15T17:00:00", "date": "2024-01-15"},
+        {"key": "c", "employee_id": budi, "action": "out", "time": "2024-01-16T17:00:00", "date": "2024-01-16"},
+        {"key": "d", "employee_id": 999_999, "action": "in", "time": "2024-01-15T08:00:00", "date": "2024-01-15"},
+    ]
+    rejected: list[dict] = []
+    assert backend.apply_journal_swipes(swipes, rejected) == (2, 1, 2)
+    # Check-out tanpa check-in dan karyawan yang tidak ada dikembalikan untuk dikarantina
+    assert sorted(swipe["key"] for swipe in rejected) == ["c", "d"]
+    assert backend.apply_journal_swipes(swipes[:3]) == (0, 3, 0)
+    # Check-out pada batch berikutnya menutup check-in terbuka terakhir hari itu yang tidak
+    # lebih lambat dari waktu check-out, sehingga durasi sesi tidak pernah negatif
+    backend.apply_journal_swipes([
+        {"key": "e", "employee_id": budi, "action": "in", "time": "2024-01-17T08:00:00", "date": "2024-01-17"},
+        {"key": "f", "employee_id": budi, "action": "in", "time": "2024-01-17T13:00:00", "date": "2024-01-17"}])
+    assert backend.apply_journal_swipes([
+        {"key": "g", "employee_id": budi, "action": "out", "time": "2024-01-17T12:00:00", "date": "2024-01-17"},
+        {"key": "h", "employee_id": budi, "action": "in", "time": "2024-01-17T18:00:00", "date": "2024-01-17"},
+        {"key": "i", "employee_id": budi, "action": "out", "time": "2024-01-17T19:00:00", "date": "2024-01-17"}]) == (3, 0, 0)
+    assert sorted(backend.get_todays_records("2024-01-17")) == [
+        ("Budi", "2024-01-17T08:00:00", "2024-01-17T12:00:00", "Hadir"),
+        ("Budi", "2024-01-17T13:00:00", None, "Hadir"),
+        ("Budi", "2024-01-17T18:00:00", "2024-01-17T19:00:00", "Hadir")]
+    assert backend.get_todays_records("2024-01-15") == [("Budi", "2024-01-15T08:00:00", "2024-01-15T17:00:00", "Hadir")]
+
+def test_badges(backend):
+    budi = backend.add_employee(("Budi", None, None))
+    dewi = backend.add_employee(("Dewi", None, None))
+    backend.set_employee_badge(budi, "B001")
+    backend.set_employee_badge(dewi, "B002")
+    backend.delete_employee(dewi)
+    assert backend.get_badge_map() == {"B001": budi}
+
+    sessions = [(f"badge:{budi}:2024-01-15T08:00:00", budi, "2024-01-15T08:00:00", None, "2024-01-15")]
+    assert backend.save_badge_sessions(sessions, []) == (1, 0, 0)
+    assert backend.save_badge_sessions(sessions, []) == (0, 1, 0)
+    [(record_id, employee_id, check_in, check_out)] = list(backend.get_latest_sessions("2024-01-14"))
+    assert (employee_id, check_in, check_out) == (budi, "2024-01-15T08:00:00", None)
+    closing = ("2024-01-15T17:00:00", record_id, "2024-01-15")
+    assert backend.save_badge_sessions([], [closing]) == (0, 0, 1)
+    # Catatan yang sudah ditutup tidak dihitung lagi
+    assert backend.save_badge_sessions([], [closing]) == (0, 0, 0)
+    assert list(backend.get_latest_sessions("2024-01-14")) == [(record_id, budi, "2024-01-15T08:00:00", "2024-01-15T17:00:00")]
+    assert list(backend.get_latest_sessions("2024-01-16")) == []
+
+def test_shifts(backend):
+    budi = backend.add_employee(("Budi", None, None))
+    dewi = backend.add_employee(("Dewi", None, None))
+    morning = backend.add_shift(("Pagi", "08:00", "16:00", 10))
+    night = backend.add_shift(("Malam", "22:00", "06:00", 0))
+    assert backend.get_all_shifts() == [(morning, "Pagi", "08:00", "16:00", 10), (night, "Malam", "22:00", "06:00", 0)]
+
+    rotation = backend.add_rotation("Pagi-Malam-Libur", [morning, night, None])
+    backend.assign_shift(budi, "2024-01-01", shift_id=morning)
+    backend.assign_shift(dewi, "2024-01-01", rotation_id=rotation)
+    # 2024-01-02 adalah hari kedua siklus rotasi (malam), 2024-01-03 libur
+    assert sorted(backend.get_day_schedule("2024-01-02")) == sorted(
+        [(budi, morning, "08:00", "16:00", 10), (dewi, night, "22:00", "06:00", 0)])
+    assert backend.get_day_schedule("2024-01-03") == [(budi, morning, "08:00", "16:00", 10)]
+    # Penugasan rotasi yang lebih baru berlaku juga pada hari liburnya (2024-01-06)
+    backend.assign_shift(budi, "2024-01-04", rotation_id=rotation)
+    assert backend.get_day_schedule("2024-01-06") == []
+
+    record_id = backend.add_attendance_record((budi, "2024-01-02T08:20:00", "Hadir", "2024-01-02"))
+    backend.add_absence_record((dewi, None, None, "Cuti", "2024-01-02", "-"))
+    assert backend.get_presence_records("2024-01-02") == [(record_id, budi, "2024-01-02T08:20:00", None)]
+    backend.save_attendance_classifications("2024-01-02", [(record_id, morning, "late", 20, 0, 0)])
+    backend.save_attendance_classifications("2024-01-02", [(record_id, morning, "late,overtime", 20, 0, 45)])
+    assert backend.get_attendance_classifications("2024-01-02") == [("Budi", "late,overtime", 20, 0, 45)]
+    # Menyimpan ulang satu tanggal menghapus klasifikasi yang tidak lagi dihasilkan
+    backend.save_attendance_classifications("2024-01-02", [])
+    assert backend.get_attendance_classifications("2024-01-02") == []
+
+def test_scans(backend):
+    budi = backend.add_employee(("Budi", None, None))
+    dewi = backend.add_employee(("Dewi", None, None))
+    stale = backend.add_attendance_record((budi, "2024-01-15T08:00:00", "Hadir", "2024-01-15"))
+    backend.add_attendance_record((budi, "2024-01-16T08:00:00", "Hadir", "2024-01-16"))
+    presence = backend.add_attendance_record((dewi, "2024-01-15T08:00:00", "Hadir", "2024-01-15"))
+    backend.check_out(presence, "2024-01-15T07:00:00")
+    absence = backend.add_absence_record((dewi, None, None, "Sakit", "2024-01-15", "-"))
+
+    assert sorted(backend.get_daily_status_codes([budi, dewi], "2024-01-15", "2024-01-16")) == [
+        (budi, "2024-01-15", 1), (budi, "2024-01-16", 1), (dewi, "2024-01-15", 3)]
+    assert list(backend.get_daily_status_codes([], "2024-01-15", "2024-01-16")) == []
+
+    candidates = list(backend.get_attendance_anomaly_candidates("2024-01-01", "2024-01-31", "2024-01-16T00:00:00"))
+    assert [row[0] for row in candidates] == [stale, presence, absence]
+    assert candidates[0][7] == "2024-01-16T08:00:00"
+    assert tuple(candidates[2][8:]) == (1, 1)
+
+    closings = [("2024-01-15T16:00:00", "Check-out otomatis", stale, "2024-01-15")]
+    assert backend.close_open_sessions(closings) == 1
+    assert backend.close_open_sessions(closings) == 0
+    assert backend.get_last_check_in_for_employee(budi, "2024-01-15") is None
+
+    # Sesi di dalam sesi panjang tumpang tindih walaupun sesi tepat sebelumnya sudah selesai
+    long_session = backend.add_attendance_record((dewi, "2024-01-20T08:00:00", "Hadir", "2024-01-20"))
+    backend.check_out(long_session, "2024-01-20T17:00:00")
+    nested = []
+    for check_in, check_out in (("2024-01-20T09:00:00", "2024-01-20T10:00:00"),
+                                ("2024-01-20T11:00:00", "2024-01-20T12:00:00")):
+        nested.append(backend.add_attendance_record((dewi, check_in, "Hadir", "2024-01-20")))
+        backend.check_out(nested[-1], check_out)
+    candidates = list(backend.get_attendance_anomaly_candidates("2024-01-20", "2024-01-20", "2024-01-01T00:00:00"))
+    assert [(row[0], row[6]) for row in candidates] == [(record_id, "2024-01-20T17:00:00") for record_id in nested]
+
+def test_audit(backend):
+    audit = _AuditRecorder()
+    backend.set_audit_log(audit)
+    try:
+        budi = backend.add_employee(("Budi", "Staf", None))
+        backend.update_employee(("Budi", "Analis", None, budi))
+        backend.set_employee_badge(budi, "B001")
+        record_id = backend.add_attendance_record((budi, "2024-01-15T08:00:00", "Hadir", "2024-01-15"))
+        backend.check_out(record_id, "2024-01-15T17:00:00")
+        backend.apply_journal_swipes([
+            {"key": "k1", "employee_id": budi, "action": "in", "time": "2024-01-16T08:00:00", "date": "2024-01-16"},
+            {"key": "k2", "employee_id": budi, "action": "out", "time": "2024-01-16T17:00:00", "date": "2024-01-16"}])
+        stale = backend.add_attendance_record((budi, "2024-01-17T08:00:00", "Hadir", "2024-01-17"))
+        backend.close_open_sessions([("2024-01-17T16:00:00", "Check-out otomatis", stale, "2024-01-17")])
+        backend.delete_employee(budi, "2024-01-31T17:00:00")
+        assert [(event[0], event[3]) for event in audit.events] == [
+            ("employee", "create"), ("employee", "update"), ("employee", "badge"),
+            ("attendance", "check-in"), ("attendance", "check-out"),
+            ("attendance", "check-in"), ("attendance", "check-out"),
+            ("attendance", "check-in"), ("attendance", "auto-close"), ("employee", "deactivate")]
+        assert audit.events[1][4:] == ({"position": "Staf"}, {"position": "Analis"})
+        assert audit.events[4] == ("attendance", record_id, budi, "check-out",
+                                   {"check_out_time": None}, {"check_out_time": "2024-01-15T17:00:00"})
+        assert audit.events[5][1] == audit.events[6][1] and audit.events[5][1] not in (record_id, stale)
+
+        # Kegagalan log audit tidak menggagalkan perubahan yang sudah tersimpan
+        audit.failing = True
+        with contextlib.redirect_stdout(io.StringIO()):
+            dewi = backend.add_employee(("Dewi", None, None))
+        assert backend.get_employee(dewi) == (dewi, "Dewi", None, None)
+    finally:
+        backend.set_audit_log(None)
+
+def test_audit_shifts(backend):
+    audit = _AuditRecorder()
+    backend.set_audit_log(audit)
+    try:
+        budi = backend.add_employee(("Budi", None, None))
+        morning = backend.add_shift(("Pagi", "08:00", "16:00", 10))
+        rotation = backend.add_rotation("Pagi-Libur", [morning, None])
+        assignment = backend.assign_shift(budi, "2024-01-01", rotation_id=rotation)
+        record_id = backend.add_attendance_record((budi, "2024-01-01T08:20:00", "Hadir", "2024-01-01"))
+        backend.save_attendance_classifications("2024-01-01", [(record_id, morning, "late", 10, 0, 0)])
+        backend.save_attendance_classifications("2024-01-01", [])
+        assert audit.events[1:3] == [
+            ("rotation", rotation, None, "create", None, {"name": "Pagi-Libur", "shift_ids": [morning, None]}),
+            ("shift_assignment", assignment, budi, "assign", None,
+             {"shift_id": None, "rotation_id": rotation, "start_date": "2024-01-01", "end_date": None})]
+        assert audit.events[4:] == [
+            ("classification", record_id, budi, "classify", None,
+             {"shift_id": morning, "classification": "late", "late_minutes": 10,
+              "early_leave_minutes": 0, "overtime_minutes": 0}),
+            ("classification", record_id, budi, "unclassify", None, None)]
+    finally:
+        backend.set_audit_log(None)
+
+def test_every_interface_method_is_covered():
+    # Setiap metode antarmuka harus dipanggil oleh minimal satu uji di modul ini
+    source = inspect.getsource(sys.modules[__name__])
+    uncovered = sorted(name for name in StorageBackend.__abstractmethods__ - {"setup", "close"}
+                       if f"backend.{name}(" not in source)
+    assert uncovered == []
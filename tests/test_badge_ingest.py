@@ -0,0 +1,73 @@
+import pytest
+import badge_ingest
+from badge_ingest import IngestResult, ingest_punches, parse_punch_log
+from storage import SQLiteBackend
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "attendance.db"))
+    yield backend
+    backend.close()
+
+def _employee_with_badge(backend, name: str, badge_id: str) -> int:
+    employee_id = backend.add_employee((name, None, None))
+    backend.set_employee_badge(employee_id, badge_id)
+    return employee_id
+
+def _ingest(backend, lines: list[str]) -> IngestResult:
+    result = IngestResult()
+    return ingest_punches(backend, parse_punch_log(lines, result), result)
+
+def _sessions(backend, employee_id: int) -> list[tuple]:
+    return backend.conn.execute("SELECT check_in_time, check_out_time FROM attendance_records "
+                                "WHERE employee_id = ? ORDER BY check_in_time", (employee_id,)).fetchall()
+
+def test_pairs_punches_and_closes_open_session(backend):
+    budi = _employee_with_badge(backend, "Budi", "B1")
+    dewi = _employee_with_badge(backend, "Dewi", "B2")
+    # Sesi Dewi yang masih terbuka di database ditutup oleh punch keluar pertamanya
+    backend.add_attendance_record((dewi, "2024-01-15T07:00:00", "Hadir", "2024-01-15"))
+
+    lines = ["B1,2024-01-15 08:00:00", "B2,2024-01-15 15:00:00,O", "B1,2024-01-15 17:00:00",
+             "B1,2024-01-16 08:00:00,I", "B1,2024-01-16 09:00:00,I", "B2,2024-01-16 09:00:00,O"]
+    result = _ingest(backend, lines)
+
+    assert (result.punches, result.sessions, result.closed_existing, result.unpaired_out) == (6, 3, 1, 1)
+    # Punch masuk berulang membiarkan sesi sebelumnya terbuka (lupa check-out)
+    assert _sessions(backend, budi) == [("2024-01-15T08:00:00", "2024-01-15T17:00:00"),
+                                        ("2024-01-16T08:00:00", None), ("2024-01-16T09:00:00", None)]
+    assert _sessions(backend, dewi) == [("2024-01-15T07:00:00", "2024-01-15T15:00:00")]
+    assert backend.get_last_check_in_for_employee(dewi, "2024-01-15") is None
+
+    # Impor ulang log yang sama tidak menambah atau menutup catatan
+    again = _ingest(backend, lines)
+    assert (again.sessions, again.closed_existing) == (0, 0)
+    assert len(_sessions(backend, budi)) == 3
+
+def test_repeated_punches_inside_dedupe_window_are_duplicates(backend):
+    budi = _employee_with_badge(backend, "Budi", "B1")
+    assert badge_ingest.DEDUPE_SECONDS == 120
+    # Punch sampai tepat 120 detik setelah punch terakhir yang diterima dianggap duplikat
+    lines = ["B1,2024-01-15T08:00:00", "B1,2024-01-15T08:01:30", "B1,2024-01-15T08:02:00",
+             "B1,2024-01-15T08:02:01"]
+    result = _ingest(backend, lines)
+
+    assert (result.duplicates, result.sessions) == (2, 1)
+    assert _sessions(backend, budi) == [("2024-01-15T08:00:00", "2024-01-15T08:02:01")]
+
+def test_malformed_lines_are_counted_and_skipped(backend, tmp_path):
+    budi = _employee_with_badge(backend, "Budi", "B1")
+    log_file = tmp_path / "punches.csv"
+    log_file.write_text("badge_id,timestamp\n"
+                        "# terminal lobi\n"
+                        "\n"
+                        "B1\n"
+                        "B1,bukan-waktu\n"
+                        "B1,2024-01-15 08:00:00\n"
+                        "B9,2024-01-15 08:05:00\n"
+                        "B1,2024-01-15 17:00:00\n", encoding="utf-8")
+    result = badge_ingest.ingest_log_file(backend, str(log_file))
+
+    # Header, baris tanpa waktu, dan waktu rusak dihitung invalid; komentar dan baris kosong dilewati
+    assert (result.invalid_lines, result.unknown_badges, result.punches, result.sessions) == (3, 1, 3, 1)
+    assert _sessions(backend, budi) == [("2024-01-15T08:00:00", "2024-01-15T17:00:00")]
@@ -0,0 +1,71 @@
+import io
+import json
+import pytest
+import cli
+
+@pytest.fixture
+def run(tmp_path, monkeypatch, capsys):
+    db = str(tmp_path / "attendance.db")
+    audit_db = str(tmp_path / "audit.db")
+
+    def run(*argv: str, stdin: str = "") -> tuple[int, list[dict]]:
+        monkeypatch.setattr("sys.stdin", io.StringIO(stdin))
+        code = 0
+        try:
+            cli.main(["--db", db, "--audit-db", audit_db, *argv])
+        except SystemExit as e:
+            code = e.code
+        out = capsys.readouterr().out
+        # Setiap baris stdout harus JSON yang valid
+        return code, [json.loads(line) for line in out.splitlines()]
+
+    return run
+
+def test_commands_emit_json_lines(run):
+    assert run("init")[1][0]["initialized"] is True
+    code, rows = run("employee", "add", "--name", "Budi", "--department", "Gudang")
+    assert code == 0
+    employee_id = rows[0]["id"]
+    code, rows = run("check-in", str(employee_id), "--time", "2024-01-15T08:00:00")
+    assert code == 0 and rows[0]["check_in_time"] == "2024-01-15T08:00:00"
+    code, rows = run("absence", str(employee_id), "--type", "Sakit", "--date", "2024-01-16")
+    assert code == 0 and rows[0]["date"] == "2024-01-16"
+    code, rows = run("employee", "list")
+    assert [row["full_name"] for row in rows] == ["Budi"]
+
+def test_missing_database_is_reported_as_json(run):
+    code, rows = run("employee", "list")
+    assert code == 1
+    assert rows[0]["op"] == "error" and "init" in rows[0]["error"]
+
+@pytest.mark.parametrize("argv, message", [
+    (("absence", "{id}", "--type", "Sakit", "--date", "xx"), "'YYYY-MM-DD' mis. 2024-01-15"),
+    (("check-in", "{id}", "--time", "kemarin"), "2024-01-15T08:00:00"),
+    (("report", "anomalies", "--end", "31-01-2024"), "'YYYY-MM-DD' mis. 2024-01-15"),
+    (("audit", "state", "{id}", "--at", "xx"), "2024-01-15T08:00:00"),
+    (("audit", "history", "{id}", "--start", "xx"), "2024-01-15T08:00:00"),
+])
+def test_invalid_arguments_fail_with_json_error(run, argv, message):
+    run("init")
+    employee_id = run("employee", "add", "--name", "Budi")[1][0]["id"]
+    code, rows = run(*(arg.format(id=employee_id) for arg in argv))
+    assert code == 1
+    assert len(rows) == 1 and rows[0]["op"] == "error"
+    assert rows[0]["error"].endswith(message)
+
+def test_bulk_validates_absences_like_single_command(run):
+    run("init")
+    employee_id = run("employee", "add", "--name", "Budi")[1][0]["id"]
+    lines = [
+        {"op": "absence", "employee_id": employee_id, "type": "Liburan", "date": "2024-01-15"},
+        {"op": "absence", "employee_id": employee_id, "type": "Sakit", "date": "xx"},
+        {"op": "absence", "employee_id": employee_id, "type": "Izin", "date": "2024-01-15"},
+        {"op": "check-in", "employee_id": employee_id, "time": "2024-01-16T08:00:00", "key": "k1"},
+    ]
+    code, rows = run("bulk", stdin="\n".join(json.dumps(line) for line in lines))
+    assert code == 1
+    errors = [row for row in rows if row["op"] == "error"]
+    assert [row["line"] for row in errors] == [1, 2]
+    assert "Liburan" in errors[0]["error"] and "YYYY-MM-DD" in errors[1]["error"]
+    assert {"op": "absence", "line": 3, "record_id": rows[2]["record_id"]} in rows
+    assert rows[-1] == {"op": "swipes", "applied": 1, "duplicates": 0, "rejected": 0}
@@ -0,0 +1,57 @@
+from employee_index import EmployeePrefixIndex
+
+def _index() -> EmployeePrefixIndex:
+    index = EmployeePrefixIndex()
+    index.build([(1, "Budi Santoso", "Gudang"), (2, "Budi", "Keuangan"),
+                 (3, "Dewi Lestari", "Gudang"), (12, "Andi", None)])
+    return index
+
+def test_search_matches_name_words_id_and_department():
+    index = _index()
+    assert len(index) == 4
+    assert sorted(index.search("bud")) == [1, 2]
+    assert index.search("lest") == [3]
+    assert sorted(index.search("gudang")) == [1, 3]
+    assert index.search("12") == [12]
+    # Setiap kata harus cocok dengan karyawan yang sama, urutan kata bebas
+    assert index.search("gud bud") == [1]
+    assert index.search("santoso budi") == [1]
+    assert sorted(index.search("budi budi")) == [1, 2]
+    assert index.search("keu santoso") == []
+    assert index.search("   ") == []
+    assert len(index.search("b", limit=1)) == 1
+
+def test_add_updates_existing_employee_and_remove_drops_it():
+    index = _index()
+    index.add(3, "Dewi Anggraini", "Keuangan")
+    assert len(index) == 4
+    assert index.search("lest") == []
+    assert index.search("angg") == [3]
+    assert sorted(index.search("keu")) == [2, 3]
+
+    index.add(4, "Citra", "Gudang")
+    assert sorted(index.search("gudang")) == [1, 4]
+
+    index.remove(1)
+    index.remove(99)
+    assert len(index) == 4
+    assert index.search("santoso") == []
+    assert index.search("budi") == [2]
+
+def test_resolve_prefers_exact_full_name():
+    index = _index()
+    # "Budi" juga prefiks dari "Budi Santoso", tetapi nama lengkap yang sama persis menang
+    assert index.resolve("budi") == 2
+    assert index.resolve("  BUDI  santoso ") == 1
+    assert index.resolve("12") == 12
+    assert index.resolve("dew") == 3
+    # Prefiks yang cocok dengan lebih dari satu karyawan tidak diterima
+    assert index.resolve("gudang") is None
+    assert index.resolve("xyz") is None
+    assert index.resolve("") is None
+
+def test_resolve_rejects_duplicate_full_names():
+    index = _index()
+    index.add(5, "Budi", "Gudang")
+    assert index.resolve("Budi") is None
+    assert index.resolve("budi keu") == 2
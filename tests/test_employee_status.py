@@ -0,0 +1,78 @@
+import sqlite3
+import pytest
+import database
+from audit_log import AuditLog
+from storage import SQLiteBackend
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "attendance.db"))
+    yield backend
+    backend.close()
+
+def _orphan_record(backend, employee_id: int) -> int:
+    # Catatan yatim hanya bisa muncul dari database lama sebelum foreign key ditegakkan
+    backend.conn.execute("PRAGMA foreign_keys = OFF")
+    cur = backend.conn.execute("INSERT INTO attendance_records(employee_id, check_in_time, status, date) "
+                               "VALUES(?, '2024-01-15T08:00:00', 'Hadir', '2024-01-15')", (employee_id,))
+    backend.conn.commit()
+    backend.conn.execute("PRAGMA foreign_keys = ON")
+    return cur.lastrowid
+
+def test_soft_delete_hides_employee_from_active_queries(backend):
+    finance = backend.get_or_create_department("Keuangan")
+    budi = backend.add_employee(("Budi", None, "Keuangan"))
+    dewi = backend.add_employee(("Dewi", None, "Keuangan"))
+    backend.add_attendance_record((budi, "2024-01-15T08:00:00", "Hadir", "2024-01-15"))
+    backend.add_attendance_record((dewi, "2024-01-15T08:05:00", "Hadir", "2024-01-15"))
+
+    backend.delete_employee(dewi, "2024-01-20T00:00:00")
+    assert [row[0] for row in backend.get_all_employees()] == [budi]
+    assert backend.get_employee(dewi) is None
+    assert backend.get_employee(dewi, include_inactive=True)[1] == "Dewi"
+    assert {row[0] for row in backend.get_all_employees(include_inactive=True)} == {budi, dewi}
+    assert backend.get_department_headcounts() == [(finance, "Keuangan", 1)]
+    assert backend.get_department_attendance(finance, "2024-01-15", "2024-01-15") == [("2024-01-15", "Hadir", 1)]
+    # Catatan kehadiran karyawan nonaktif tetap disimpan untuk riwayat
+    assert backend.conn.execute("SELECT COUNT(*) FROM attendance_records WHERE employee_id = ?", (dewi,)).fetchone() == (1,)
+
+def test_foreign_keys_are_enforced(backend):
+    with pytest.raises(sqlite3.IntegrityError):
+        backend.add_attendance_record((999, "2024-01-15T08:00:00", "Hadir", "2024-01-15"))
+    budi = backend.add_employee(("Budi", None, None))
+    backend.add_attendance_record((budi, "2024-01-15T08:00:00", "Hadir", "2024-01-15"))
+    with pytest.raises(sqlite3.IntegrityError):
+        backend.conn.execute("DELETE FROM employees WHERE id = ?", (budi,))
+
+def test_orphan_cleanup_is_explicit_and_audited(backend, tmp_path):
+    budi = backend.add_employee(("Budi", None, None))
+    orphan = _orphan_record(backend, 999)
+
+    # Menyiapkan ulang database tidak menghapus data apa pun
+    database.setup_database(backend.db_file)
+    assert backend.conn.execute("SELECT COUNT(*) FROM attendance_records").fetchone() == (1,)
+
+    audit = AuditLog(str(tmp_path / "audit.db"), actor="test")
+    backend.set_audit_log(audit)
+    try:
+        assert backend.cleanup_orphan_records() == 1
+        assert backend.cleanup_orphan_records() == 0
+        [event] = audit.history(999)
+    finally:
+        backend.set_audit_log(None)
+        audit.close()
+    _, _, _, entity_id, action, before, after = event
+    assert (entity_id, action, after) == (orphan, "cleanup-orphan", None)
+    assert before["check_in_time"] == "2024-01-15T08:00:00" and before["status"] == "Hadir"
+    assert backend.get_employee(budi)[1] == "Budi"
+
+def test_active_employee_list_is_read_in_name_order_from_partial_index(backend):
+    for name in ("Dewi", "Andi", "Citra", "Budi"):
+        backend.add_employee((name, None, None))
+    backend.delete_employee(backend.get_all_employees()[0][0])
+    assert [row[1] for row in backend.get_all_employees()] == ["Budi", "Citra", "Dewi"]
+
+    plan = " ".join(row[3] for row in backend.conn.execute(
+        "EXPLAIN QUERY PLAN " + database._ACTIVE_EMPLOYEE_COLUMNS + " ORDER BY e.full_name"))
+    assert "USING INDEX idx_employees_active_name" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,61 @@
+import pytest
+from heatmap_data import (BLOCK_DAYS, BLOCK_ROWS, HeatmapGrid, LEAVE, NO_RECORD, NOT_LOADED, PERMISSION, PRESENT,
+                          SICK)
+from storage import SQLiteBackend
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "attendance.db"))
+    yield backend
+    backend.close()
+
+def _employees(backend, count: int) -> list[int]:
+    return [backend.add_employee((f"Karyawan {i}", None, None)) for i in range(count)]
+
+def test_cells_are_one_byte_each_and_start_unloaded():
+    grid = HeatmapGrid([10, 20, 30], "2024-01-01", 366)
+    assert isinstance(grid._cells, bytearray)
+    assert grid.memory_bytes() == 3 * 366
+    assert grid.status_at(2, 365) == NOT_LOADED
+    assert grid.date_at(59).isoformat() == "2024-02-29"
+
+def test_viewport_is_loaded_with_one_aggregate_query(backend):
+    employee_ids = _employees(backend, BLOCK_ROWS + 5)
+    budi, dewi = employee_ids[0], employee_ids[-1]
+    backend.add_attendance_record((budi, "2024-01-02T08:00:00", "Hadir", "2024-01-02"))
+    backend.add_absence_record((budi, None, None, "Izin", "2024-01-03", "-"))
+    # Ketidakhadiran didahulukan dari kehadiran pada hari yang sama
+    backend.add_attendance_record((dewi, "2024-02-05T08:00:00", "Hadir", "2024-02-05"))
+    backend.add_absence_record((dewi, None, None, "Sakit", "2024-02-05", "-"))
+    backend.add_absence_record((dewi, None, None, "Cuti", "2024-02-06", "-"))
+
+    grid = HeatmapGrid(employee_ids, "2024-01-01", 366)
+    # Viewport melintasi dua blok baris dan dua blok hari
+    assert grid.ensure_loaded(backend, 0, len(employee_ids) - 1, 0, BLOCK_DAYS + 10)
+    assert grid.queries == 1
+    assert grid.status_at(0, 1) == PRESENT
+    assert grid.status_at(0, 2) == PERMISSION
+    assert grid.status_at(0, 0) == NO_RECORD
+    assert grid.status_at(len(employee_ids) - 1, 35) == SICK
+    assert grid.status_at(len(employee_ids) - 1, 36) == LEAVE
+    # Di luar blok yang dimuat masih kosong
+    assert grid.status_at(0, 2 * BLOCK_DAYS) == NOT_LOADED
+
+    # Viewport yang sudah dimuat tidak menjalankan query lagi
+    assert not grid.ensure_loaded(backend, 3, 10, 5, 20)
+    assert not grid.ensure_loaded(backend, 50, 60, 400, 500)
+    assert grid.queries == 1
+
+def test_invalidate_date_reloads_only_that_column_block(backend):
+    [budi] = _employees(backend, 1)
+    grid = HeatmapGrid([budi], "2024-01-01", 366)
+    grid.ensure_loaded(backend, 0, 0, 0, 3 * BLOCK_DAYS - 1)
+    assert grid.queries == 1 and grid.status_at(0, 40) == NO_RECORD
+
+    backend.add_attendance_record((budi, "2024-02-10T08:00:00", "Hadir", "2024-02-10"))
+    grid.invalidate_date("2024-02-10")
+    grid.invalidate_date("2023-12-31")
+    assert not grid.ensure_loaded(backend, 0, 0, 0, BLOCK_DAYS - 1)
+    assert grid.ensure_loaded(backend, 0, 0, 0, 3 * BLOCK_DAYS - 1)
+    assert grid.queries == 2
+    assert grid.status_at(0, 40) == PRESENT
@@ -0,0 +1,92 @@
+import json
+import sqlite3
+import database
+from kiosk_journal import SwipeJournal, load_employee_cache, replay_backend, save_employee_cache
+from storage import SQLiteBackend
+
+def _central_database(tmp_path) -> str:
+    db_file = str(tmp_path / "central.db")
+    database.setup_database(db_file)
+    conn = sqlite3.connect(db_file)
+    database.add_employee(conn, ("Budi", "Staf", "Keuangan"))
+    conn.close()
+    return db_file
+
+def test_replay_quarantines_torn_tail_and_applies_later_swipes(tmp_path):
+    db_file = _central_database(tmp_path)
+    journal_path = str(tmp_path / "kiosk.jsonl")
+
+    # Satu swipe utuh, lalu baris terakhir terpotong karena listrik padam sebelum fsync
+    swipe = {"key": "a1", "employee_id": 1, "action": "in", "time": "2024-01-15T08:00:00", "date": "2024-01-15"}
+    with open(journal_path, "wb") as f:
+        f.write(json.dumps(swipe).encode() + b"\n")
+        f.write(b'{"key":"b2","employee_id":1,"act')
+
+    journal = SwipeJournal(journal_path)
+    journal.append(1, "out", "2024-01-15T17:00:00", "2024-01-15")
+    result = journal.replay(lambda: SQLiteBackend(db_file, setup=False))
+    journal.close()
+
+    assert result.error is None
+    assert (result.applied, result.quarantined) == (2, 1)
+    assert journal.backlog_size() == 0
+    with open(journal.quarantine_path, "rb") as f:
+        assert f.read() == b'{"key":"b2","employee_id":1,"act\n'
+
+    conn = sqlite3.connect(db_file)
+    rows = conn.execute("SELECT check_in_time, check_out_time FROM attendance_records").fetchall()
+    conn.close()
+    assert rows == [("2024-01-15T08:00:00", "2024-01-15T17:00:00")]
+
+def test_replay_skips_invalid_lines_inside_batch(tmp_path):
+    db_file = _central_database(tmp_path)
+    journal_path = str(tmp_path / "kiosk.jsonl")
+    swipes = [{"key": "a1", "employee_id": 1, "action": "in", "time": "2024-01-15T08:00:00", "date": "2024-01-15"},
+              {"key": "x"},
+              {"key": "c3", "employee_id": 1, "action": "out", "time": "2024-01-15T17:00:00", "date": "2024-01-15"}]
+    with open(journal_path, "wb") as f:
+        f.writelines(json.dumps(swipe).encode() + b"\n" for swipe in swipes)
+
+    journal = SwipeJournal(journal_path)
+    result = journal.replay(lambda: SQLiteBackend(db_file, setup=False), batch_size=2)
+    journal.close()
+
+    assert result.error is None
+    assert (result.applied, result.quarantined) == (2, 1)
+
+def test_replay_quarantines_rejected_swipes(tmp_path):
+    db_file = _central_database(tmp_path)
+    journal = SwipeJournal(str(tmp_path / "kiosk.jsonl"))
+    # Karyawan yang tidak ada dan check-out tanpa check-in ditolak database
+    journal.append(99, "in", "2024-01-15T08:00:00", "2024-01-15")
+    journal.append(1, "out", "2024-01-15T17:00:00", "2024-01-15")
+    journal.append(1, "in", "2024-01-16T08:00:00", "2024-01-16")
+    result = journal.replay(lambda: SQLiteBackend(db_file, setup=False))
+    journal.close()
+
+    assert (result.applied, result.rejected, result.quarantined) == (1, 2, 0)
+    assert journal.backlog_size() == 0
+    with open(journal.quarantine_path, "rb") as f:
+        quarantined = [json.loads(line) for line in f]
+    assert [(swipe["employee_id"], swipe["action"]) for swipe in quarantined] == [(99, "in"), (1, "out")]
+
+def test_replay_reports_missing_database_without_creating_it(tmp_path):
+    db_file = str(tmp_path / "central.db")
+    journal = SwipeJournal(str(tmp_path / "kiosk.jsonl"))
+    journal.append(1, "in", "2024-01-15T08:00:00", "2024-01-15")
+    result = journal.replay(lambda: replay_backend(db_file))
+    journal.close()
+
+    assert result.error is not None
+    assert journal.backlog_size() == 1
+    assert not (tmp_path / "central.db").exists()
+
+def test_employee_cache_round_trip(tmp_path):
+    path = str(tmp_path / "kiosk.jsonl.employees")
+    assert load_employee_cache(path) is None
+    save_employee_cache(path, [(1, "Budi Santoso", "Keuangan"), (2, "Dewi", "")])
+    assert load_employee_cache(path) == [(1, "Budi Santoso", "Keuangan"), (2, "Dewi", "")]
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('[[1, "Budi"')
+    assert load_employee_cache(path) is None
@@ -0,0 +1,99 @@
+import contextlib
+import io
+import json
+import sqlite3
+import pytest
+import cli
+import database
+from storage import SQLiteBackend
+
+def _setup(db_file: str) -> SQLiteBackend:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return SQLiteBackend(db_file)
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = _setup(str(tmp_path / "attendance.db"))
+    yield backend
+    backend.close()
+
+@pytest.mark.parametrize("name, expected", [
+    ("  Keuangan   Pusat ", "Keuangan Pusat"),
+    ("Ｋｅｕａｎｇａｎ", "Keuangan"),
+    ("ﬁnance", "finance"),
+    ("   ", None),
+    (None, None),
+])
+def test_normalize_lookup_name(name, expected):
+    assert database.normalize_lookup_name(name) == expected
+
+def test_lookup_key_ignores_unicode_case():
+    assert database.lookup_key("Straße") == database.lookup_key("STRASSE") == "strasse"
+    assert database.lookup_key("ÉDITION") == database.lookup_key("édition")
+    assert database.lookup_key("Keuangan") != database.lookup_key("Keuangan Pusat")
+
+def test_get_or_create_department_is_idempotent(backend):
+    finance = backend.get_or_create_department("Keuangan")
+    for variant in ("keuangan", " KEUANGAN ", "Ｋｅｕａｎｇａｎ", "Keuangan"):
+        assert backend.get_or_create_department(variant) == finance
+    assert backend.get_or_create_department("ÉDITION") == backend.get_or_create_department("édition")
+    assert [name for _, name in backend.get_all_departments()] == ["Keuangan", "ÉDITION"]
+    assert backend.get_or_create_department("") is None
+
+def test_legacy_text_columns_are_migrated(tmp_path):
+    db_file = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_file)
+    conn.execute("CREATE TABLE employees (id INTEGER PRIMARY KEY AUTOINCREMENT, full_name TEXT NOT NULL, "
+                 "position TEXT, department TEXT)")
+    conn.executemany("INSERT INTO employees(full_name, position, department) VALUES(?,?,?)", [
+        ("Budi", "Staf", "Keuangan"),
+        ("Dewi", "staf ", "Keuangan"),
+        ("Andi", "STAF", " keuangan"),
+        ("Citra", None, "Ｋｅｕａｎｇａｎ"),
+        ("Eko", "Kepala  Gudang", "Gudang"),
+        ("Fajar", "Staf", None),
+    ])
+    conn.commit()
+    conn.close()
+
+    backend = _setup(db_file)
+    try:
+        # Ejaan yang paling sering dipakai menjadi nama resmi
+        assert [name for _, name in backend.get_all_departments()] == ["Gudang", "Keuangan"]
+        assert [name for _, name in backend.get_all_positions()] == ["Kepala Gudang", "Staf"]
+        employees = {row[1]: row[2:] for row in backend.get_all_employees()}
+        assert employees == {"Andi": ("Staf", "Keuangan"), "Budi": ("Staf", "Keuangan"), "Citra": (None, "Keuangan"),
+                             "Dewi": ("Staf", "Keuangan"), "Eko": ("Kepala Gudang", "Gudang"), "Fajar": ("Staf", None)}
+    finally:
+        backend.close()
+
+def test_departments_without_key_are_merged(backend):
+    # Database sebelum kolom name_key: 'Straße' dan 'STRASSE' tersimpan sebagai dua departemen
+    conn = backend.conn
+    conn.execute("DROP INDEX idx_departments_key")
+    conn.execute("ALTER TABLE departments DROP COLUMN name_key")
+    conn.executemany("INSERT INTO departments(name) VALUES(?)", [("Straße",), ("STRASSE",), ("Gudang",)])
+    ids = dict(conn.execute("SELECT name, id FROM departments").fetchall())
+    conn.executemany("INSERT INTO employees(full_name, department_id) VALUES(?,?)",
+                     [("Budi", ids["Straße"]), ("Dewi", ids["STRASSE"])])
+    conn.commit()
+
+    reopened = _setup(backend.db_file)
+    try:
+        assert [name for _, name in reopened.get_all_departments()] == ["Gudang", "Straße"]
+        assert {row[3] for row in reopened.get_all_employees()} == {"Straße"}
+        assert reopened.get_or_create_department("strasse") == ids["Straße"]
+    finally:
+        reopened.close()
+
+def test_cli_department_filter_uses_lookup_key(tmp_path, capsys):
+    db_file = str(tmp_path / "attendance.db")
+    argv = ["--db", db_file, "--audit-db", str(tmp_path / "audit.db")]
+    cli.main(argv + ["init"])
+    cli.main(argv + ["employee", "add", "--name", "Budi", "--department", "Straße"])
+    cli.main(argv + ["employee", "add", "--name", "Dewi", "--department", "Gudang"])
+    capsys.readouterr()
+
+    cli.main(argv + ["employee", "list", "--department", "  STRASSE "])
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [row["full_name"] for row in rows] == ["Budi"]
@@ -0,0 +1,46 @@
+import pytest
+import parallel_report
+from storage import SQLiteBackend
+
+@pytest.fixture
+def db_file(tmp_path):
+    db_file = str(tmp_path / "attendance.db")
+    backend = SQLiteBackend(db_file)
+    employees = [backend.add_employee(("Budi", None, "Keuangan")), backend.add_employee(("Dewi", None, "Gudang")),
+                 backend.add_employee(("Andi", None, "Gudang")), backend.add_employee(("Citra", None, None))]
+    for day in range(1, 91, 3):
+        date = f"2024-{1 + (day - 1) // 30:02d}-{1 + (day - 1) % 30:02d}"
+        for i, employee_id in enumerate(employees):
+            if (day + i) % 4 == 0:
+                backend.add_absence_record((employee_id, None, None, "Sakit", date, "-"))
+                continue
+            record_id = backend.add_attendance_record((employee_id, f"{date}T08:{i:02d}:00", "Hadir", date))
+            backend.check_out(record_id, f"{date}T{16 + i}:30:00")
+    backend.delete_employee(employees[2])
+    backend.close()
+    return db_file
+
+def _serial(db_file: str, start_date: str, end_date: str) -> list[tuple]:
+    backend = SQLiteBackend(db_file, setup=False)
+    try:
+        names = {employee[0]: (employee[1], employee[3]) for employee in backend.get_all_employees(include_inactive=True)}
+        rows = backend.get_hours_aggregate(start_date, end_date)
+        return [(employee_id, *names[employee_id], round(hours, 2), present, absent)
+                for employee_id, hours, present, absent in sorted(rows)]
+    finally:
+        backend.close()
+
+def test_partition_by_month_covers_range():
+    assert parallel_report.partition_by_month("2024-01-15", "2024-03-10") == [
+        ("2024-01-15", "2024-01-31"), ("2024-02-01", "2024-02-29"), ("2024-03-01", "2024-03-10")]
+
+@pytest.mark.parametrize("partition", ["month", "department"])
+def test_parallel_report_equals_serial_aggregate(db_file, partition):
+    expected = _serial(db_file, "2024-01-01", "2024-03-31")
+    assert len(expected) == 4
+    assert parallel_report.hours_report(db_file, "2024-01-01", "2024-03-31", partition, workers=2) == expected
+    assert parallel_report.hours_report(db_file, "2024-01-01", "2024-03-31", partition, workers=1) == expected
+
+def test_unknown_partition_is_rejected(db_file):
+    with pytest.raises(ValueError):
+        parallel_report.hours_report(db_file, "2024-01-01", "2024-03-31", "week")
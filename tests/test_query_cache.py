@@ -0,0 +1,115 @@
+import sqlite3
+import pytest
+import database
+import query_cache
+from query_cache import QueryCache, default_cache
+from storage import SQLiteBackend
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(query_cache.time, "monotonic", clock)
+    return clock
+
+@pytest.fixture
+def backend(tmp_path):
+    default_cache.clear()
+    backend = SQLiteBackend(str(tmp_path / "attendance.db"))
+    # Mode WAL: commit tidak memperbarui change counter di header file database
+    backend.conn.execute("PRAGMA journal_mode = WAL")
+    yield backend
+    backend.close()
+    default_cache.clear()
+
+def test_entries_touching_today_expire_after_ttl(clock):
+    cache = QueryCache(today_ttl=30.0)
+    cache.put(("db", "today"), [1], dates=["9999-12-31"])
+    cache.put(("db", "all"), [2])
+    cache.put(("db", "past"), [3], dates=["2024-01-15"])
+    clock.now += 29
+    assert cache.get(("db", "today")) == [1] and cache.get(("db", "all")) == [2]
+    clock.now += 1
+    assert cache.get(("db", "today")) is None and cache.get(("db", "all")) is None
+    # Hari yang sudah lewat tidak kedaluwarsa
+    assert cache.get(("db", "past")) == [3]
+
+def test_lru_eviction_by_entries_and_rows():
+    cache = QueryCache(max_entries=2, max_rows=5, today_ttl=None)
+    cache.put(("db", "a"), [1])
+    cache.put(("db", "b"), [2])
+    assert cache.get(("db", "a")) == [1]
+    cache.put(("db", "c"), [3])
+    # "b" paling lama tidak dipakai
+    assert cache.get(("db", "b")) is None
+    assert cache.get(("db", "a")) == [1] and cache.get(("db", "c")) == [3]
+
+    cache = QueryCache(max_entries=10, max_rows=5, today_ttl=None)
+    cache.put(("db", "a"), [1, 2])
+    cache.put(("db", "b"), [3, 4])
+    cache.get(("db", "a"))
+    # Batas total baris: "b" dikeluarkan untuk memberi tempat "c"
+    cache.put(("db", "c"), [5, 6])
+    assert cache.get(("db", "b")) is None
+    assert cache.get(("db", "a")) == [1, 2] and cache.get(("db", "c")) == [5, 6]
+    assert cache.stats()["rows"] == 4
+    # Hasil yang melebihi batas baris tidak disimpan sama sekali
+    cache.put(("db", "too-big"), list(range(6)))
+    assert cache.get(("db", "too-big")) is None
+
+def test_invalidate_date_keeps_other_dates_and_absences():
+    cache = QueryCache(today_ttl=None)
+    cache.put(("db", "day1"), [1], dates=["2024-01-15"])
+    cache.put(("db", "day2"), [2], dates=["2024-01-16"])
+    cache.put(("db", "absences"), [3], absence_only=True)
+    cache.put(("other", "day1"), [4], dates=["2024-01-15"])
+    cache.invalidate_date("db", "2024-01-15", "Hadir")
+    assert cache.get(("db", "day1")) is None
+    assert cache.get(("db", "day2")) == [2]
+    assert cache.get(("db", "absences")) == [3]
+    assert cache.get(("other", "day1")) == [4]
+    cache.invalidate_date("db", "2024-01-16", "Sakit")
+    assert cache.get(("db", "absences")) is None
+
+def test_own_write_invalidates_only_its_date(backend):
+    budi = backend.add_employee(("Budi", None, None))
+    backend.add_attendance_record((budi, "2024-01-15T08:00:00", "Hadir", "2024-01-15"))
+    assert len(backend.get_todays_records("2024-01-15")) == 1
+    backend.add_attendance_record((budi, "2024-01-16T08:00:00", "Hadir", "2024-01-16"))
+    hits = default_cache.hits
+    assert len(backend.get_todays_records("2024-01-15")) == 1
+    assert default_cache.hits == hits + 1
+
+def test_write_from_second_connection_invalidates_cache(backend):
+    budi = backend.add_employee(("Budi", None, None))
+    backend.add_attendance_record((budi, "2024-01-15T08:00:00", "Hadir", "2024-01-15"))
+    backend.add_absence_record((budi, None, None, "Sakit", "2024-01-10", "Demam"))
+    assert len(backend.get_todays_records("2024-01-15")) == 1
+    assert len(backend.get_all_absences()) == 1
+    assert len(backend.get_todays_records("2024-01-15")) == 1
+
+    other = sqlite3.connect(backend.db_file)
+    assert other.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    other.execute("INSERT INTO attendance_records(employee_id, check_in_time, status, date) "
+                  "VALUES(?, '2024-01-15T09:00:00', 'Hadir', '2024-01-15')", (budi,))
+    other.execute("INSERT INTO attendance_records(employee_id, status, date, reason) "
+                  "VALUES(?, 'Izin', '2024-01-11', '-')", (budi,))
+    other.commit()
+    other.close()
+
+    assert len(backend.get_todays_records("2024-01-15")) == 2
+    assert len(backend.get_all_absences()) == 2
+
+def test_closed_connection_is_forgotten(backend):
+    backend.get_todays_records("2024-01-15")
+    scope = database._cache_scope(backend.conn)
+    source = id(backend.conn)
+    assert (scope, source) in default_cache._versions
+    backend.close()
+    assert (scope, source) not in default_cache._versions
@@ -0,0 +1,95 @@
+import pytest
+import shift_schedule
+from storage import SQLiteBackend
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "attendance.db"))
+    yield backend
+    backend.close()
+
+def test_rotation_day_off_overrides_older_fixed_assignment(backend):
+    budi = backend.add_employee(("Budi", None, None))
+    morning = backend.add_shift(("Pagi", "08:00", "16:00", 10))
+    rotation = backend.add_rotation("Pagi-Libur", [morning, None])
+    backend.assign_shift(budi, "2024-01-01", shift_id=morning)
+    backend.assign_shift(budi, "2024-01-08", rotation_id=rotation)
+
+    # 2024-01-09 adalah hari kedua siklus rotasi (libur)
+    assert shift_schedule.build_day_schedule(backend, "2024-01-08")[budi][0] == morning
+    assert budi not in shift_schedule.build_day_schedule(backend, "2024-01-09")
+
+    backend.add_attendance_record((budi, "2024-01-09T10:00:00", "Hadir", "2024-01-09"))
+    assert shift_schedule.classify_day(backend, "2024-01-09") == 1
+    [(_, classification, late_minutes, _, _)] = backend.get_attendance_classifications("2024-01-09")
+    assert (classification, late_minutes) == (shift_schedule.UNSCHEDULED, 0)
+
+def test_latest_fixed_assignment_wins(backend):
+    budi = backend.add_employee(("Budi", None, None))
+    morning = backend.add_shift(("Pagi", "08:00", "16:00", 10))
+    night = backend.add_shift(("Malam", "22:00", "06:00", 0))
+    backend.assign_shift(budi, "2024-01-01", shift_id=morning)
+    backend.assign_shift(budi, "2024-01-05", shift_id=night)
+
+    assert backend.get_day_schedule("2024-01-04") == [(budi, morning, "08:00", "16:00", 10)]
+    assert backend.get_day_schedule("2024-01-05") == [(budi, night, "22:00", "06:00", 0)]
+
+def _classification(backend, date: str) -> tuple:
+    [(_, classification, late_minutes, early_leave_minutes, overtime_minutes)] = \
+        backend.get_attendance_classifications(date)
+    return classification, late_minutes, early_leave_minutes, overtime_minutes
+
+def test_overnight_shift_on_time(backend):
+    budi = backend.add_employee(("Budi", None, None))
+    night = backend.add_shift(("Malam", "22:00", "06:00", 10))
+    backend.assign_shift(budi, "2024-01-01", shift_id=night)
+    record_id = backend.add_attendance_record((budi, "2024-01-15T21:55:00", "Hadir", "2024-01-15"))
+    backend.check_out(record_id, "2024-01-16T06:00:00")
+
+    assert shift_schedule.classify_day(backend, "2024-01-15") == 1
+    assert _classification(backend, "2024-01-15") == (shift_schedule.ON_TIME, 0, 0, 0)
+
+def test_check_in_after_midnight_belongs_to_previous_night_shift(backend):
+    budi = backend.add_employee(("Budi", None, None))
+    night = backend.add_shift(("Malam", "22:00", "06:00", 10))
+    backend.assign_shift(budi, "2024-01-15", shift_id=night, end_date="2024-01-15")
+    # Tercatat pada 2024-01-16 (tanpa jadwal), tetapi masih dalam shift malam 2024-01-15
+    record_id = backend.add_attendance_record((budi, "2024-01-16T00:30:00", "Hadir", "2024-01-16"))
+    backend.check_out(record_id, "2024-01-16T06:00:00")
+
+    shift_schedule.classify_day(backend, "2024-01-16")
+    assert _classification(backend, "2024-01-16") == (shift_schedule.LATE, 150, 0, 0)
+
+    # Setelah shift malam selesai, check-in berikutnya tidak lagi milik shift itu
+    backend.add_attendance_record((budi, "2024-01-16T07:00:00", "Hadir", "2024-01-16"))
+    shift_schedule.classify_day(backend, "2024-01-16")
+    assert sorted(row[1] for row in backend.get_attendance_classifications("2024-01-16")) == [
+        shift_schedule.LATE, shift_schedule.UNSCHEDULED]
+
+def test_check_in_closer_to_todays_shift_uses_todays_shift(backend):
+    budi = backend.add_employee(("Budi", None, None))
+    night = backend.add_shift(("Malam", "22:00", "06:00", 0))
+    early = backend.add_shift(("Subuh", "06:00", "14:00", 10))
+    backend.assign_shift(budi, "2024-01-15", shift_id=night, end_date="2024-01-15")
+    backend.assign_shift(budi, "2024-01-16", shift_id=early)
+    backend.add_attendance_record((budi, "2024-01-16T05:50:00", "Hadir", "2024-01-16"))
+
+    shift_schedule.classify_day(backend, "2024-01-16")
+    assert _classification(backend, "2024-01-16") == (shift_schedule.ON_TIME, 0, 0, 0)
+
+def test_rotation_wraps_around_cycle(backend):
+    budi = backend.add_employee(("Budi", None, None))
+    morning = backend.add_shift(("Pagi", "08:00", "16:00", 10))
+    night = backend.add_shift(("Malam", "22:00", "06:00", 0))
+    rotation = backend.add_rotation("Pagi-Malam-Libur", [morning, night, None])
+    backend.assign_shift(budi, "2024-01-01", rotation_id=rotation)
+
+    expected = [morning, night, None] * 3
+    for offset, shift_id in enumerate(expected):
+        date = f"2024-01-{offset + 1:02d}"
+        assert shift_schedule.build_day_schedule(backend, date).get(budi, (None,))[0] == shift_id
+
+    # Hari libur setelah shift malam pada siklus kedua: check-in dini hari milik shift malam 2024-01-05
+    backend.add_attendance_record((budi, "2024-01-06T00:15:00", "Hadir", "2024-01-06"))
+    shift_schedule.classify_day(backend, "2024-01-06")
+    assert _classification(backend, "2024-01-06") == (shift_schedule.LATE, 135, 0, 0)